@@ -8,7 +8,8 @@ _FuncT = TypeVar("_FuncT")
 class Group(AbcGroup):
     def _build_config_tree(self, root: dict):
         tree = ConfigTree(group=self)
-        treed_obj = set()
+        treed_obj = dict()
+        self.config_aliases = dict()
         for attr_name, value in root.items():
             if self.is_obj_to_config(value) and self.is_obj_of_group(value):
                 tree[attr_name] = self._build_local_config_tree(attr_name, value, treed_obj=treed_obj)
@@ -21,15 +22,22 @@ class Group(AbcGroup):
                 pass
 
     def _build_local_config_tree(self, cls_name: str, _cls: Any, check_if_to_config: bool = True,
-                                 treed_obj: (list, set) = None) -> (ConfigTree, None):
+                                 treed_obj: (list, set, dict) = None) -> (ConfigTree, None):
         """
         Build LocalTree.
+        If treed_obj is a dict, it memoizes the built trees: a class reached from several parents is built once,
+        keeps its first path, and its other paths share the subtree and are recorded in config_aliases.
         :param check_if_to_config:
+        :param treed_obj: Objects already treed, a dict maps them to their trees, None while being built.
         :return: ConfigTree or None.
         """
         if check_if_to_config:
             if not self.is_obj_to_config(_cls) or not self.is_obj_of_group(_cls):
                 return None
+        if isinstance(treed_obj, dict) and _cls in treed_obj:
+            if treed_obj[_cls] is None:
+                raise ValueError(f"cyclic config reference: {cls_name} refers to {self.get_config_path(_cls)}")
+            return treed_obj[_cls]
         if self.get_config_name(_cls) is not None:
             cls_name = self.get_config_name(_cls)
         if self.get_config_path(_cls) is None:
@@ -48,6 +56,8 @@ class Group(AbcGroup):
                 treed_obj.append(_cls)
             elif isinstance(treed_obj, set):
                 treed_obj.add(_cls)
+            elif isinstance(treed_obj, dict):
+                treed_obj[_cls] = None
         # for attr_name in getattr(_cls, "__config_include__", dir(_cls)):
         for attr_name in self.get_included_attr(_cls):
             # if attr_name in getattr(_cls, "__config_exclude__", []) or self.is_excluded_attr_name(attr_name):
@@ -55,10 +65,17 @@ class Group(AbcGroup):
                 continue
             attr_value = getattr(_cls, attr_name, None)
             if self.is_obj_to_config(_cls) and self.is_obj_of_group(attr_value):
-                self.set_config_path(attr_value, ConfigTree.config_path_join(cls_path, attr_name))  # NB
+                attr_path = ConfigTree.config_path_join(cls_path, attr_name)
+                if isinstance(treed_obj, dict) and attr_value in treed_obj:
+                    if treed_obj[attr_value] is not None:
+                        self.config_aliases[attr_path] = self.get_config_path(attr_value)
+                else:
+                    self.set_config_path(attr_value, attr_path)
                 tree[attr_name] = self._build_local_config_tree(attr_name, attr_value, check_if_to_config, treed_obj)
             else:
                 tree[attr_name] = attr_value
+        if isinstance(treed_obj, dict):
+            treed_obj[_cls] = tree
         return tree
 
     def save_to_dict(self) -> None:
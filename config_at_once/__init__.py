@@ -1,101 +1,32 @@
+import os
 import warnings
+import weakref
 from typing import Callable, Iterable, TypeVar, Type
 
-_T = TypeVar('_T')
-
-
-class ConfigTree(dict):
-    """
-    Represents a configuration tree derived from the dictionary class.
-
-    This tree structure aids in managing configuration parameters, providing functionality
-    to manipulate, serialize, and deserialize configurations. The class offers methods
-    to remove unserializable objects, making it easy to convert the configuration into
-    formats such as JSON, INI, XML, or YAML.
-
-    Attributes:
-        group: An optional attribute representing the group associated with this ConfigTree.
-    """
-
-    def __init__(self, __d=None, group=None):
-        """
-        Initialize the ConfigTree.
-        :param __d: Initial dictionary for the ConfigTree.
-        :param group: The group associated with the ConfigTree.
-        """
-        super().__init__()
-        self.group = group
-        if __d is not None:
-            self.update(__d)
-
-    def remove_by_func(self, check_remove: Callable, name: bool = True, value: bool = True,
-                       copy: bool = True):
-        """
-        Remove objects by check serializable function.
-        :param check_remove: a function used to check if the object should be removed, return bool, if return True, remove.
-        :param name: args of check_serializable contains attr_name or not. If True, call check_serializable(attr_name).
-        :param value: args of check_serializable contains attr_value or not.
-        If value is True, call check_serializable(attr_value).
-        If name is also True, call check_serializable(attr_name, attr_value).
-        When both name and value are False, raise ValueError.
-        :param copy: copy or not.
-        :return: ConfigTree.
-        """
-        if copy:
-            tree = self.copy()
-        else:
-            tree = self
-        if name is value is False:
-            raise ValueError("both name and value cannot be False")
-
-        for k, v in dict.copy(tree).items():
-            if isinstance(v, ConfigTree):
-                v.remove_by_func(check_remove, name=name, value=value, copy=False)
-            if name is value is True:
-                if check_remove(k, v):
-                    tree.pop(k)
-            elif name:
-                if check_remove(k):
-                    tree.pop(k)
-            elif value:
-                if check_remove(v):
-                    tree.pop(k)
-        return tree
+from .config_tree import ConfigTree, ConfigPatch
+from .arrays import ARRAY_MARKER, extract_arrays, restore_arrays
+from .bulk import ApplyPlan, apply_many, is_config_leaf
+from .codegen import compile_group, import_compiled, load_static
+from .filters import AttrFilter, AttrRule, class_attr_names
+from .encoders import Encoder, register_encoder, unregister_encoder, encode_tree, decode_data
+from .env import ENV_SEPARATOR, build_env_index, coerce_env_value, collect_env
+from .serializers import Codec, register_format, unregister_format, register_backend, register_compression, \
+    get_codec, load_file, dump_file
+from .lazy import PendingClass, can_defer
+from .layers import LayeredConfig, DEFAULTS_LAYER, FILE_LAYER, ENV_LAYER, OVERRIDES_LAYER
+from .interning import Interner
+from .memory import allocation_report
+from .sharding import ShardedStore
+from .snapshot import FrozenConfigTree, freeze, evolve
+from .subscriptions import SubscriptionTrie
+from .tracing import AccessTracer, TracedValue
+from .tree_cache import load_tree_cache, dump_tree_cache
+from .utils import json_serializable_objects
+
+__version__ = "0.2.0"
 
-    def remove_by_objects(self, allowed_objects: Iterable[type] = (object,),
-                          ignored_objects: Iterable[type] = None, copy: bool = True):
-        """
-        Remove objects.
-        :param allowed_objects: serializable objects.
-        :param ignored_objects: objects not serializable.
-        :param copy: copy or not.
-        :return: ConfigTree.
-        """
-        if not isinstance(allowed_objects, tuple):
-            allowed_objects = tuple(allowed_objects)
-        if ignored_objects is None:
-            ignored_objects = tuple()
-        else:
-            ignored_objects = tuple(ignored_objects)
-        if copy:
-            tree = self.copy()
-        else:
-            tree = self
-
-        for k, v in dict.copy(tree).items():
-            if isinstance(v, ConfigTree):
-                v.remove_by_objects(allowed_objects, copy=False)
-            elif not isinstance(v, allowed_objects) or isinstance(v, ignored_objects):
-                tree.pop(k)
-        return tree
-
-    def copy(self, group=None):
-        """
-        Create a copy of the current ConfigTree, but will not copy the elements.
-        :param group: Group of copied ConfigTree.
-        :return: A new ConfigTree instance.
-        """
-        return self.__class__({k: v.copy() if isinstance(v, ConfigTree) else v for k, v in self.items()}, group=group)
+_T = TypeVar('_T')
+_MISSING = object()
 
 
 class TREE:
@@ -119,102 +50,654 @@ class Group:
     Attributes:
         name: A string representing the name of the group.
         tree: A ConfigTree object that holds the configurations of the group.
-        registered: A set that keeps track of the classes added to this group.
+        registered: A set that keeps track of the classes added to this group, a WeakSet in weak mode.
+        layers: A LayeredConfig that resolves defaults < file < env < overrides.
+        root: The config root used by the last init_config or load_config.
+        config_aliases: A dict mapping the other paths of classes reached from several parents to their config path.
+        subscriptions: A SubscriptionTrie of the callbacks notified when config paths change.
+        snapshot_mode: If True, readers can get a consistent immutable tree with snapshot().
+        interner: The Interner of loaded trees, None if interning is disabled.
+        weak: If True, classes are weakly referenced and the subtrees of collected classes are pruned.
+        attr_filter: The AttrFilter of the group level include and exclude rules.
     """
     WARNING = True
 
-    def __init__(self, name):
+    def __init__(self, name, snapshot: bool = False, intern: bool = False, weak: bool = False,
+                 include: Iterable[str] = None, exclude: Iterable[str] = ()):
         """
         Initialize the Group with a name.
         :param name: Name of the group.
+        :param snapshot: Publish an immutable snapshot of the tree after each change, see snapshot().
+        :param intern: Share structurally identical subtrees and leaf values of loaded trees, see Interner.
+        :param weak: Keep classes created and discarded at runtime from being kept alive by the group,
+            their subtrees are pruned on the next init_config or load_config, see prune_collected().
+            Methods and other descriptors are left out of the tree, since they may reference their class.
+        :param include: Names and patterns of the attributes configured in every class, None for all, see AttrFilter.
+        :param exclude: Names and patterns of the attributes never configured, e.g. ["*_cache"].
         """
         super().__init__()
         self.name = name
-        self.registered: set = set()
+        self.weak: bool = weak
+        self.registered: set = weakref.WeakSet() if weak else set()
+        self._class_refs: dict = dict()
+        self._collected: list = list()
+        self.attr_filter: AttrFilter = AttrFilter(include, exclude)
+        self._attr_names = weakref.WeakKeyDictionary()
+        self._shard_stores: dict = dict()
+        self._pending = weakref.WeakKeyDictionary()
         self.tree: ConfigTree = ConfigTree(group=self)
-
-    def init_config(self, root: dict, mode: (TREE, SCAN) = TREE) -> (ConfigTree, None):
+        self.layers: LayeredConfig = LayeredConfig(group=self)
+        self.root: (dict, None) = None
+        self.config_aliases: dict = dict()
+        self._loaded_trees: dict = dict()
+        self._env_indexes: dict = dict()
+        self.subscriptions: SubscriptionTrie = SubscriptionTrie()
+        self.snapshot_mode: bool = snapshot
+        self._snapshot: (FrozenConfigTree, None) = freeze(self.tree) if snapshot else None
+        self.interner: (Interner, None) = Interner() if intern else None
+
+    def init_config(self, root: dict, mode: (TREE, SCAN) = TREE, cache_dir: str = None) -> (ConfigTree, None):
         """
-        Initialize config.
+        Initialize config, the built tree becomes the defaults layer and the other layers are cleared.
         :param root: root of config, usually be globals() or __dict__.
         :param mode: TREE or SCAN.
+        :param cache_dir: If given, the built tree is cached in this directory and reused while the source
+            of the root and defining modules and the namespaces of the classes do not change, see tree_cache.
+            Classes added to the root at runtime before init_config are not seen by the cache.
         :return: ConfigTree or None.
         """
         self.tree = ConfigTree(group=self)
         if mode == TREE:
-            for attr_name, value in root.items():
-                if getattr(value, "__config__", False) and getattr(value, "__config_group__", self) == self:
-                    root[attr_name].__config_path__ = f"{self.name}.{attr_name}"
-                    self.tree[attr_name] = self.build_local_tree(value, root[attr_name].__config_path__)
+            self._collected.clear()
+            cached = load_tree_cache(self, root, cache_dir) if cache_dir is not None else None
+            if cached is not None:
+                self.tree = cached
+            else:
+                built = dict()
+                self.config_aliases = dict()
+                for attr_name, value in root.items():
+                    if getattr(value, "__config__", False) and getattr(value, "__config_group__", self) == self:
+                        if value in built:
+                            self.tree[attr_name] = self._alias_local_tree(value, f"{self.name}.{attr_name}", built)
+                            continue
+                        root[attr_name].__config_path__ = f"{self.name}.{attr_name}"
+                        self.tree[attr_name] = self.build_local_tree(value, root[attr_name].__config_path__, built)
+                if cache_dir is not None:
+                    dump_tree_cache(self, root, self.tree, cache_dir)
+            self.root = root
+            self.layers = LayeredConfig(self.layers.layer_names, group=self)
+            self._loaded_trees.clear()
+            self.layers.set_layer(DEFAULTS_LAYER, self.tree)
+            self._env_indexes.clear()
+            if self.snapshot_mode:
+                self._snapshot = freeze(self.tree)
             return self.tree
         elif mode == SCAN:
             pass
         else:
             raise ValueError(f"unknown mode: {mode}")
 
-    def build_local_tree(self, cls: type, check_config: bool = True) -> (ConfigTree, None):
+    def build_local_tree(self, cls: type, check_config: bool = True, built: dict = None) -> (ConfigTree, None):
         """
         Build local tree.
+        A class reached from several parents is built once, its first path is kept as "__config_path__"
+        and its other paths share the same subtree and are recorded in config_aliases.
         :param cls:
         :param check_config:
+        :param built: classes already built in this build, mapped to their trees, None while being built.
         :return: ConfigTree or None.
         """
         if check_config:
             if not getattr(cls, "__config__", False) or not self.is_element_of_group(cls):
                 return None
+        if built is None:
+            built = dict()
         if getattr(cls, "__config_path__", None) is None:
             cls_path: str = f"{self.name}.{cls.__name__}"
             cls.__config_path__ = cls_path
         else:
             cls_path: str = str(getattr(cls, "__config_path__"))
+        built[cls] = None
+        self._track_class(cls, cls_path)
         tree = ConfigTree(group=self)
-        for attr_name in getattr(cls, "__config_include__", dir(cls)):
-            if attr_name not in getattr(cls, "__config_exclude__", []) and not self.attr_exclude(attr_name):
-                attr_value = getattr(cls, attr_name)
-                if getattr(cls, "__config__", False) and self.is_element_of_group(attr_value):
-                    attr_value.__config_path__ = f"{cls_path}.{attr_name}"
-                    tree[attr_name] = self.build_local_tree(cls=attr_value, check_config=check_config)
-                else:
-                    tree[attr_name] = attr_value
-
+        for attr_name in self.config_attr_names(cls):
+            attr_value = getattr(cls, attr_name)
+            if getattr(cls, "__config__", False) and self.is_element_of_group(attr_value):
+                attr_path = f"{cls_path}.{attr_name}"
+                if attr_value in built:
+                    tree[attr_name] = self._alias_local_tree(attr_value, attr_path, built)
+                    continue
+                attr_value.__config_path__ = attr_path
+                tree[attr_name] = self.build_local_tree(attr_value, check_config, built)
+            elif self.weak and not is_config_leaf(attr_value):
+                # methods may hold their class, e.g. bound classmethods, so they would keep it from being collected
+                continue
+            else:
+                tree[attr_name] = attr_value
+        built[cls] = tree
         return tree
 
-    def load_config(self, config_dict: dict, root: dict, mode: (TREE, SCAN) = TREE) -> (ConfigTree, None):
+    def config_attr_names(self, cls: type) -> list:
+        """
+        Get the configured attribute names of a class, the result is cached per class.
+        The cache is checked against the attribute names defined by the class and its bases,
+        after editing the "__config_include__" or "__config_exclude__" list of a class in place,
+        call invalidate_attr_names.
+        :param cls: Class.
+        :return: list of attribute names.
+        """
+        cached = self._attr_names.get(cls)
+        bases = cls.__mro__[:-1]
+        if cached is not None and len(cached[0]) == len(bases) \
+                and all(vars(base).keys() == keys for base, keys in zip(bases, cached[0])):
+            return cached[1]
+        names = class_attr_names(cls, self.attr_filter, self.attr_exclude)
+        # only the names are kept, the cached value must not hold the weakly keyed class
+        self._attr_names[cls] = ([frozenset(vars(base)) for base in bases], names)
+        return names
+
+    def invalidate_attr_names(self, cls: type = None):
+        """
+        Forget the cached attribute names, see config_attr_names.
+        :param cls: Class, default is every class.
+        """
+        if cls is None:
+            self._attr_names.clear()
+        else:
+            self._attr_names.pop(cls, None)
+
+    def set_attr_rules(self, include: Iterable[str] = None, exclude: Iterable[str] = ()):
+        """
+        Replace the group level include and exclude rules, they apply from the next init_config.
+        :param include: Names and patterns of the attributes configured in every class, None for all.
+        :param exclude: Names and patterns of the attributes never configured.
+        """
+        self.attr_filter = AttrFilter(include, exclude)
+        self.invalidate_attr_names()
+
+    def _alias_local_tree(self, cls: type, alias_path: str, built: dict) -> (ConfigTree, None):
+        if built[cls] is None:
+            raise ValueError(f"cyclic config reference: {alias_path} refers to {cls.__config_path__}")
+        self.config_aliases[alias_path] = cls.__config_path__
+        return built[cls]
+
+    def _track_class(self, cls: type, cls_path: str):
+        if self.weak:
+            self._class_refs[weakref.ref(cls, self._on_collected)] = cls_path
+
+    def _on_collected(self, ref: weakref.ref):
+        path = self._class_refs.pop(ref, None)
+        if path is not None:
+            self._collected.append(path)
+
+    def prune_collected(self) -> set:
+        """
+        Remove the subtrees of the classes collected since the last build from the tree, the layers and the aliases.
+        Only classes built while the group is in weak mode are tracked.
+        :return: set of the removed dotted paths.
+        """
+        collected, self._collected = self._collected, list()
+        changed = set()
+        for cls_path in collected:
+            full_paths = [cls_path]
+            full_paths.extend(alias for alias, target in self.config_aliases.items() if target == cls_path)
+            for full_path in full_paths:
+                self.config_aliases.pop(full_path, None)
+                names = ConfigTree.config_path_split(full_path)
+                if names[0] != self.name or len(names) < 2:
+                    continue
+                path = ConfigTree.config_path_join(*names[1:])
+                changed.update(self.layers.remove_subtree(path))
+                self.tree.pop_by_path(path, None)
+        if collected:
+            self._env_indexes.clear()
+            self.commit_paths(changed)
+        return changed
+
+    def load_config(self, config_dict: dict, root: dict, mode: (TREE, SCAN) = TREE,
+                    layer: str = FILE_LAYER, incremental: bool = False, lazy: bool = False) -> (ConfigTree, None):
         """
         Load config from dict.
         :param config_dict: config dict.
         :param root: config root, usually be globals() or __dict__.
         :param mode: TREE or SCAN.
+        :param layer: the layer replaced by config_dict, values of higher layers still take precedence.
+        :param incremental: if True, only apply the diff against the current content of the layer.
+        :param lazy: if True, the values of each class are applied on the first read of one of them, see defer_path.
         :return: ConfigTree or None.
         """
         if mode == TREE:
-            self.tree = self.rebuild_tree(config_dict)
-            for attr_name, attr_value in self.tree.items():
-                if attr_name not in root:
-                    warnings.warn(f"{attr_name} no found in {root}", RuntimeWarning)
-                    root[attr_name] = attr_value
-                if isinstance(attr_value, ConfigTree):
-                    self.config_tree_local_apply(attr_value, root[attr_name])
-                else:
-                    root[attr_name] = attr_value
+            self.root = root
+            if self._collected:
+                self.prune_collected()
+            loaded_tree = self.rebuild_tree(config_dict)
+            if incremental:
+                previous_tree = self._previous_tree(layer)
+                if previous_tree is not None:
+                    self.apply_patch(previous_tree.diff(loaded_tree), layer, root, lazy)
+                    self._loaded_trees[layer] = (self.layers.revision(layer), loaded_tree)
+                    return self.tree
+            loaded = loaded_tree.flatten()
+            changed = self.layers.set_layer(layer, loaded)
+            self._loaded_trees[layer] = (self.layers.revision(layer), loaded_tree)
+            self.tree = self.layers.tree(group=self)
+            if self.interner is not None:
+                self.tree = self.interner.intern_tree(self.tree)
+            if self.snapshot_mode:
+                self._snapshot = freeze(self.tree)
+            apply_path = self.defer_path if lazy else self.apply_path
+            for path in loaded:
+                apply_path(path, self.layers.resolve(path), root)
+            self.refresh_paths(changed.difference(loaded), root)
+            self.notify(changed)
+            return self.tree
         elif mode == SCAN:
             pass
         else:
             raise ValueError(f"unknown mode: {mode}")
 
+    def save_to_file(self, path: str, arrays: bool = True):
+        """
+        Save the serializable values of the tree, the format is chosen by the file extension.
+        Values of the types with a registered encoder, e.g. datetime, Enum or Path, are encoded, see encoders.
+        :param path: File path.
+        :param arrays: If True, numpy arrays are saved to .npy sidecar files referenced from the file, see arrays.
+        """
+        tree = extract_arrays(self.tree, path) if arrays else self.tree
+        dump_file(encode_tree(tree), path)
+
+    def load_from_file(self, path: str, root: dict = None, layer: str = FILE_LAYER,
+                       mmap_mode: (str, None) = "r") -> ConfigTree:
+        """
+        Load config from a file, the format is chosen by the file extension.
+        :param path: File path.
+        :param root: config root, default is the root of the last init_config or load_config.
+        :param layer: the layer replaced by the file.
+        :param mmap_mode: mmap_mode of the arrays of .npy sidecar files, None to read them into memory.
+        :return: ConfigTree.
+        """
+        if root is None:
+            root = self.root
+        if root is None:
+            raise ValueError(f"no config root for group {self.name}, call init_config first or pass root")
+        config_dict = decode_data(restore_arrays(load_file(path), path, mmap_mode))
+        return self.load_config(config_dict, root, mode=TREE, layer=layer)
+
+    def _shard_store(self, directory: str, extension: str = None) -> ShardedStore:
+        store = self._shard_stores.get(os.path.abspath(directory))
+        if store is None:
+            store = ShardedStore(self, directory, extension or ".json")
+            self._shard_stores[os.path.abspath(directory)] = store
+        elif extension is not None:
+            store.extension = extension
+        return store
+
+    def save_to_directory(self, directory: str, extension: str = None) -> list:
+        """
+        Save the tree as a sharded directory, one file per top-level class plus a manifest, see ShardedStore.
+        Only the shards whose content changed are rewritten.
+        :param directory: Directory path.
+        :param extension: Filename extension of new shards, which chooses their format, default is ".json".
+        :return: list of the names of the written and removed shards.
+        """
+        return self._shard_store(directory, extension).save()
+
+    def load_from_directory(self, directory: str, root: dict = None, lazy: bool = True) -> ShardedStore:
+        """
+        Load a sharded directory, only the manifest is read, each shard is loaded when its class is first read.
+        :param directory: Directory path.
+        :param root: config root, default is the root of the last init_config or load_config.
+        :param lazy: If False, load every shard now.
+        :return: ShardedStore, call its load_shard or load_all method to load shards explicitly.
+        """
+        return self._shard_store(directory).load(root, lazy)
+
+    def compile_to_module(self, path: str, sources: Iterable[str] = ()) -> str:
+        """
+        Generate a Python module of frozen slotted classes mirroring the resolved tree, see codegen.
+        :param path: Path of the generated module.
+        :param sources: Paths of the config files the tree is loaded from, fingerprinted in the module.
+        :return: Fingerprint of the module.
+        """
+        return compile_group(self, path, sources)
+
+    def load_static(self, path: str, root: dict, sources: Iterable[str] = ()):
+        """
+        Import the generated module of the group, so a static config costs hashing its sources and an import
+        at startup, no config file is parsed and no default is built. If the module is missing, or the config files
+        or the modules defining the classes changed, the config is loaded normally and the module regenerated.
+        :param path: Path of the generated module.
+        :param root: config root, usually be globals() or __dict__.
+        :param sources: Paths of the config files, the later files take precedence.
+        :return: Module.
+        """
+        return load_static(self, path, root, sources)
+
     def rebuild_tree(self, config_dict: dict) -> ConfigTree:
         """
         Rebuild the ConfigTree from a dictionary.
         :param config_dict: Dictionary from which the ConfigTree needs to be rebuilt.
         :return: A new ConfigTree instance.
         """
+        tree = self._rebuild_tree(config_dict)
+        if self.interner is not None:
+            tree = self.interner.intern_tree(tree)
+        return tree
+
+    def _rebuild_tree(self, config_dict: dict) -> ConfigTree:
         tree = ConfigTree(group=self)
         for k, v in config_dict.items():
             if isinstance(v, dict):
-                v = self.rebuild_tree(v)
+                v = self._rebuild_tree(v)
             tree[k] = v
         return tree
 
+    def resolve(self, path: str, default=_MISSING):
+        """
+        Resolve the value of a dotted config path through the layers.
+        :param path: Dotted path relative to the tree, e.g. "Db.Pool.size".
+        :param default: Returned if the path does not exist, if not given, raise KeyError.
+        :return: Resolved value.
+        """
+        if default is _MISSING:
+            return self.layers.resolve(path)
+        return self.layers.resolve(path, default)
+
+    def set_override(self, path: str, value):
+        """
+        Override the value of a dotted config path at runtime, only this path is reapplied.
+        :param path: Dotted path relative to the tree.
+        :param value: New value.
+        """
+        self.commit_paths(self.layers.update_layer(OVERRIDES_LAYER, {path: value}))
+
+    def clear_override(self, path: str = None):
+        """
+        Remove a runtime override, the path falls back to the lower layers.
+        :param path: Dotted path relative to the tree, if None, remove all overrides.
+        """
+        if path is None:
+            changed = self.layers.clear_layer(OVERRIDES_LAYER)
+        else:
+            changed = self.layers.remove_from_layer(OVERRIDES_LAYER, [path])
+        self.commit_paths(changed)
+
+    def load_env(self, prefix: str, environ: dict = None, separator: str = ENV_SEPARATOR) -> dict:
+        """
+        Load the env layer from environment variables, e.g. MYAPP__DB__POOL__SIZE overrides Db.Pool.size.
+        Variable names are matched against an index of the default paths built once per prefix,
+        and values are coerced to the type of the default value.
+        :param prefix: Prefix of the environment variables.
+        :param environ: Environment variables, default is os.environ.
+        :param separator: Separator between the prefix and the path nodes.
+        :return: dict of the coerced values keyed by dotted path.
+        """
+        defaults = self.layers.layers[DEFAULTS_LAYER] or self.tree.flatten()
+        index = self._env_indexes.get((prefix, separator))
+        if index is None:
+            allowed_objects = tuple(json_serializable_objects)
+            index = build_env_index([path for path, value in defaults.items() if isinstance(value, allowed_objects)],
+                                    prefix, separator)
+            self._env_indexes[(prefix, separator)] = index
+        values = dict()
+        for path, raw in collect_env(index, environ).items():
+            try:
+                values[path] = coerce_env_value(raw, defaults.get(path))
+            except (ValueError, TypeError) as e:
+                if self.WARNING:
+                    warnings.warn(f"invalid environment value for {path}: {e}", RuntimeWarning)
+                else:
+                    raise e
+        self.commit_paths(self.layers.set_layer(ENV_LAYER, values))
+        return values
+
+    def _previous_tree(self, layer: str) -> (ConfigTree, None):
+        """
+        Get the tree an incremental load of a layer is diffed against: the tree of the previous load
+        if the layer did not change since, else a tree built from the layer, None if the layer is empty.
+        """
+        revision = self.layers.revision(layer)
+        previous = self._loaded_trees.get(layer)
+        if previous is not None and previous[0] == revision:
+            return previous[1]
+        if not self.layers.layers[layer]:
+            return None
+        return ConfigTree.from_flat(self.layers.layers[layer], group=self)
+
+    def apply_patch(self, patch: ConfigPatch, layer: str = FILE_LAYER, root: dict = None, lazy: bool = False) -> set:
+        """
+        Apply a patch returned by ConfigTree.diff to a layer, only the paths of the patch are touched.
+        :param patch: ConfigPatch.
+        :param layer: Layer name.
+        :param root: config root, default is the root of the last init_config or load_config.
+        :param lazy: if True, the changed values are applied on the first read of their class, see defer_path.
+        :return: set of paths whose resolved value changed.
+        """
+        changed = self.layers.update_layer(layer, patch.values())
+        changed.update(self.layers.remove_from_layer(layer, patch.removed))
+        self.commit_paths(changed, root, lazy)
+        return changed
+
+    def update_layer(self, layer: str, values: dict, removed: Iterable[str] = (), replace: bool = False):
+        """
+        Change the values of a layer and apply the paths whose resolved value changed.
+        :param layer: Layer name.
+        :param values: A ConfigTree, or a dict of values keyed by dotted path.
+        :param removed: Dotted paths removed from the layer.
+        :param replace: If True, values replace the whole layer and removed is ignored.
+        """
+        if replace:
+            changed = self.layers.set_layer(layer, values)
+        else:
+            changed = self.layers.update_layer(layer, values)
+            changed.update(self.layers.remove_from_layer(layer, removed))
+        self.commit_paths(changed)
+
+    def subscribe(self, path: str, callback: Callable) -> Callable:
+        """
+        Subscribe to the changes of a config path and everything below it.
+        After each load or override, the callback is called once with all its changed paths.
+        :param path: Dotted path relative to the tree, e.g. "Db.Pool", an empty path subscribes to every change.
+        :param callback: Called as callback(changed_paths).
+        :return: A function that removes the subscription.
+        """
+        return self.subscriptions.subscribe(path, callback)
+
+    def unsubscribe(self, path: str, callback: Callable) -> bool:
+        """
+        Remove a subscription.
+        :param path: Dotted path given to subscribe.
+        :param callback: Callback given to subscribe.
+        :return: True if the subscription existed, False otherwise.
+        """
+        return self.subscriptions.unsubscribe(path, callback)
+
+    def notify(self, paths: Iterable[str]):
+        """
+        Notify the subscribers of the changed paths, each matching subscriber is called once.
+        :param paths: Changed dotted paths relative to the tree.
+        """
+        for (_, callback), changed_paths in self.subscriptions.match(sorted(paths)).items():
+            try:
+                callback(changed_paths)
+            except Exception as e:
+                if self.WARNING:
+                    warnings.warn(f"subscriber {callback} error: {e}", RuntimeWarning)
+                else:
+                    raise e
+
+    def commit_paths(self, paths: Iterable[str], root: dict = None, lazy: bool = False):
+        """
+        Refresh the paths whose resolved value changed, then notify their subscribers.
+        :param paths: Changed dotted paths relative to the tree.
+        :param root: config root, default is the root of the last init_config or load_config.
+        :param lazy: if True, the values are applied on the first read of their class, see defer_path.
+        """
+        paths = set(paths)
+        if self.snapshot_mode:
+            self.publish_snapshot(paths)
+        self.refresh_paths(paths, root, lazy)
+        self.notify(paths)
+
+    def snapshot(self) -> FrozenConfigTree:
+        """
+        Get the current immutable snapshot of the tree.
+        It is replaced by a single reference swap on each change, so readers never block
+        and never see a half applied config.
+        :return: FrozenConfigTree.
+        """
+        if not self.snapshot_mode:
+            raise ValueError(f"snapshot mode is not enabled for group {self.name}")
+        return self._snapshot
+
+    def publish_snapshot(self, paths: Iterable[str] = None):
+        """
+        Build the next snapshot off to the side and publish it.
+        :param paths: Changed dotted paths, only their nodes are copied, if None, freeze the whole tree.
+        """
+        if paths is None or self._snapshot is None:
+            self._snapshot = freeze(self.tree)
+            return
+        changes, removed = dict(), list()
+        for path in paths:
+            value = self.layers.resolve(path, _MISSING)
+            if value is _MISSING:
+                removed.append(path)
+            else:
+                changes[path] = value
+        self._snapshot = evolve(self._snapshot, changes, removed)
+
+    def refresh_paths(self, paths: Iterable[str], root: dict = None, lazy: bool = False):
+        """
+        Update the tree and the config objects for paths whose resolved value changed.
+        :param paths: Dotted paths relative to the tree.
+        :param root: config root, default is the root of the last init_config or load_config.
+        :param lazy: if True, the values are applied on the first read of their class, see defer_path.
+        """
+        apply_path = self.defer_path if lazy else self.apply_path
+        for path in paths:
+            value = self.layers.resolve(path, _MISSING)
+            if value is _MISSING:
+                self.tree.pop_by_path(path, None)
+            else:
+                self.tree.set_by_path(path, value)
+                apply_path(path, value, root)
+
+    def apply_path(self, path: str, value, root: dict = None):
+        """
+        Apply a value to the attribute at a dotted config path.
+        :param path: Dotted path relative to the tree.
+        :param value: The value to apply.
+        :param root: config root, default is the root of the last init_config or load_config.
+        """
+        if root is None:
+            root = self.root
+        if root is None:
+            return
+        names = ConfigTree.config_path_split(path)
+        if len(names) == 1:
+            root[names[0]] = value
+            return
+        if names[0] not in root:
+            warnings.warn(f"{names[0]} no found in {root}", RuntimeWarning)
+            return
+        obj = root[names[0]]
+        for attr_name in names[1:-1]:
+            obj = getattr(obj, attr_name)
+        traced = getattr(obj, "__dict__", {}).get(names[-1])
+        if isinstance(traced, TracedValue):
+            traced.value = value
+            return
+        if not hasattr(obj, names[-1]):
+            warnings.warn(f"{names[-1]} not in {obj}", RuntimeWarning)
+        setattr(obj, names[-1], value)
+
+    def bulk_apply(self, tree: (ConfigTree, str), targets: Iterable, max_workers: int = None,
+                   chunk_size: int = 256) -> list:
+        """
+        Apply a subtree to many targets, e.g. the instances of a configured class.
+        The attribute assignments are compiled once into an ApplyPlan, failures of a target do not stop the others.
+        :param tree: ConfigTree, or a dotted path of the tree of the group.
+        :param targets: Classes or instances.
+        :param max_workers: If given, apply the targets in chunks on a thread pool of this size.
+        :param chunk_size: Number of targets per task of the thread pool.
+        :return: list of (target, exception) of the failed targets.
+        """
+        if isinstance(tree, str):
+            tree = self.tree.get_by_path(tree)
+            if not isinstance(tree, ConfigTree):
+                raise TypeError(f"the path must be a subtree, not {type(tree)}")
+        failures = apply_many(ApplyPlan(tree), targets, max_workers, chunk_size)
+        if failures:
+            if self.WARNING:
+                warnings.warn(f"bulk apply failed on {len(failures)} targets, first error: {failures[0][1]}",
+                              RuntimeWarning)
+            else:
+                raise failures[0][1]
+        return failures
+
+    def memory_report(self, top: int = 10, config_dict: dict = None, root: dict = None) -> dict:
+        """
+        Report the heaviest paths of the tree, the class attributes hold the same objects as the tree.
+        :param top: Number of paths.
+        :param config_dict: If given, load it with tracemalloc and report the memory allocated by the load instead,
+            the config is really loaded into the group and applied to the classes, as by load_config.
+        :param root: config root of the load, default is the root of the last init_config or load_config.
+        :return: {"total": size, "top": list of (path, size) by decreasing size}.
+        """
+        if config_dict is None:
+            return self.tree.memory_report(top)
+        if root is None:
+            root = self.root
+        return allocation_report(lambda: self.load_config(config_dict, root, mode=TREE), top)
+
+    def trace_access(self, root: dict = None) -> AccessTracer:
+        """
+        Start counting the reads of the config values, see AccessTracer.
+        :param root: config root, default is the root of the last init_config or load_config.
+        :return: The installed AccessTracer, call its uninstall method to stop tracing.
+        """
+        return AccessTracer(self).install(root)
+
+    def defer_path(self, path: str, value, root: dict = None):
+        """
+        Apply a value to the attribute at a dotted config path when an attribute of its class is first read.
+        Until then the attribute holds a PendingValue descriptor, afterwards it is a plain attribute again,
+        so reads have no extra cost. Paths that cannot be deferred are applied now with apply_path.
+        :param path: Dotted path relative to the tree.
+        :param value: The value to apply.
+        :param root: config root, default is the root of the last init_config or load_config.
+        """
+        if root is None:
+            root = self.root
+        names = ConfigTree.config_path_split(path)
+        if root is None or len(names) < 2 or names[0] not in root:
+            return self.apply_path(path, value, root)
+        obj = root[names[0]]
+        try:
+            for attr_name in names[1:-1]:
+                obj = getattr(obj, attr_name)
+        except AttributeError:
+            return self.apply_path(path, value, root)
+        if not can_defer(obj, names[-1]):
+            return self.apply_path(path, value, root)
+        pending = self._pending.get(obj)
+        if pending is None:
+            pending = self._pending[obj] = PendingClass(obj, self._on_applied)
+        pending.defer(names[-1], value)
+
+    def _on_applied(self, pending: PendingClass):
+        cls = pending.cls
+        if cls is not None and self._pending.get(cls) is pending and not pending:
+            del self._pending[cls]
+
+    def apply_pending(self):
+        """
+        Apply every value deferred by a lazy load now.
+        """
+        for pending in list(self._pending.values()):
+            pending.apply()
+
     def config_tree_local_apply(self, tree: ConfigTree, root: object):
         """
         Locally apply the given ConfigTree to the root object.
@@ -273,6 +756,7 @@ class Group:
         if not hasattr(cls, "__config_exclude__"):
             cls.__config_exclude__ = list()
         self.registered.add(cls)
+        self.invalidate_attr_names(cls)
         return cls
 
     def force_add(self, cls: Type[_T]) -> _T:
@@ -292,6 +776,7 @@ class Group:
         if not hasattr(cls, "__config_exclude__"):
             cls.__config_exclude__ = list()
         self.registered.add(cls)
+        self.invalidate_attr_names(cls)
         return cls
 
     def __call__(self, cls: Type[_T]) -> _T:
@@ -301,5 +786,3 @@ class Group:
         """
         return self.add(cls)
 
-
-json_serializable_objects: list = [bool, int, float, str, dict, list, tuple, type(None)]
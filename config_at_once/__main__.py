@@ -0,0 +1,268 @@
+import argparse
+import importlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from . import Group, TREE
+from .encoders import decode_data
+from .layers import DEFAULTS_LAYER
+from .serializers import load_file, dump_file, split_compression
+from .utils import *
+
+
+def import_group(spec: str) -> tuple:
+    """
+    Import a group and initialize its config, unless it is already initialized for the module globals.
+    :param spec: "module:attribute", e.g. "myapp.settings:group", the module globals are the config root.
+    :return: (Group, config root).
+    """
+    module_name, _, attr_name = spec.partition(":")
+    if not attr_name:
+        raise ValueError(f"invalid group spec {spec!r}, expected module:attribute")
+    module = importlib.import_module(module_name)
+    group = getattr(module, attr_name)
+    if not isinstance(group, Group):
+        raise TypeError(f"{spec} is not a Group, but {type(group)}")
+    root = vars(module)
+    if group.root is not root or not group.layers.layers[DEFAULTS_LAYER]:
+        group.init_config(root, mode=TREE)
+    return group, root
+
+
+def output_path(path: str, extension: str, output_dir: str = None) -> str:
+    """
+    Get the path of a converted file: same name, new extension, e.g. "a.json.gz" to "a.yaml".
+    :param path: Source file path.
+    :param extension: Extension of the converted file, a compression extension may be included, e.g. ".toml.gz".
+    :param output_dir: Directory of the converted file, default is the directory of the source file.
+    :return: str.
+    """
+    stem = os.path.splitext(split_compression(path)[0])[0]
+    if output_dir is not None:
+        stem = os.path.join(output_dir, os.path.basename(stem))
+    return stem + extension
+
+
+def convert_file(path: str, extension: str, output_dir: str = None) -> str:
+    """
+    Convert a config file to another format.
+    :param path: Source file path.
+    :param extension: Extension of the converted file.
+    :param output_dir: Directory of the converted file.
+    :return: Path of the converted file.
+    """
+    target = output_path(path, extension, output_dir)
+    if os.path.abspath(target) == os.path.abspath(path):
+        raise ValueError(f"{path} is already a {extension} file")
+    dump_file(load_file(path), target)
+    return target
+
+
+def snapshot_file(path: str, output_dir: str = None) -> str:
+    """
+    Convert a config file to a .marshal snapshot, see load_snapshot.
+    :param path: Source file path.
+    :param output_dir: Directory of the snapshot, default is the directory of the source file.
+    :return: Path of the snapshot.
+    """
+    target = output_path(path, MARSHAL_FILENAME_EXTENSIONS[0], output_dir)
+    dump_file(load_file(path), target, "marshal")
+    return target
+
+
+def load_snapshot(path: str) -> dict:
+    """
+    Read a .marshal snapshot written by the snapshot command.
+    Only read snapshots you wrote: marshal is unsafe on erroneous or malicious data,
+    and a snapshot is only readable by the Python version that wrote it.
+    :param path: Snapshot path.
+    :return: dict.
+    """
+    return load_file(path, "marshal")
+
+
+def validate_data(group: Group, data: dict) -> list:
+    """
+    Check a loaded config dict against the defaults of a group, without applying it.
+    :param group: Group, its config should be initialized.
+    :param data: Loaded config dict.
+    :return: list of error messages.
+    """
+    defaults = group.layers.layers[DEFAULTS_LAYER]
+    errors = []
+    for path, value in group.rebuild_tree(decode_data(data)).flatten().items():
+        if path not in defaults:
+            errors.append(f"{path}: unknown key")
+            continue
+        default = defaults[path]
+        if default is None or value is None or type(value) is type(default):
+            continue
+        if isinstance(default, float) and type(value) is int:
+            continue
+        if isinstance(default, (list, tuple)) and isinstance(value, (list, tuple)):
+            continue
+        errors.append(f"{path}: expected {type(default).__name__}, got {type(value).__name__}")
+    return errors
+
+
+def validate_file(spec: str, path: str) -> list:
+    """
+    Check a config file against a group.
+    :param spec: Group spec, see import_group.
+    :param path: Config file path.
+    :return: list of error messages.
+    """
+    group, _ = import_group(spec)
+    try:
+        data = load_file(path)
+    except Exception as e:
+        return [f"cannot load: {e}"]
+    return validate_data(group, data)
+
+
+def bench_file(path: str, spec: str = None, repeat: int = 10) -> dict:
+    """
+    Time the parse and the apply of a config file.
+    :param path: Config file path.
+    :param spec: Group spec, see import_group, if None, only the parse is timed.
+    :param repeat: Number of runs.
+    :return: {"parse": list of seconds, "apply": list of seconds}.
+    """
+    group, root = import_group(spec) if spec is not None else (None, None)
+    timings = {"parse": [], "apply": []}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = load_file(path)
+        timings["parse"].append(time.perf_counter() - start)
+        if group is not None:
+            start = time.perf_counter()
+            group.load_config(decode_data(data), root, mode=TREE)
+            timings["apply"].append(time.perf_counter() - start)
+    return timings
+
+
+def _run_batch(func: Callable, items: list, jobs: int, initializer: Callable = None, initargs: tuple = ()) -> list:
+    """
+    Run func(*item) for every item, on a process pool if there are several items and jobs is not 1.
+    initializer(*initargs) runs once per worker process, or once before the items if they run in this process.
+    :return: list of (item, result or exception), in the order of items.
+    """
+    if jobs == 1 or len(items) < 2:
+        if initializer is not None:
+            initializer(*initargs)
+        results = []
+        for item in items:
+            try:
+                results.append((item, func(*item)))
+            except Exception as e:
+                results.append((item, e))
+        return results
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initializer, initargs=initargs) as executor:
+        futures = [executor.submit(func, *item) for item in items]
+        results = []
+        for item, future in zip(items, futures):
+            try:
+                results.append((item, future.result()))
+            except Exception as e:
+                results.append((item, e))
+        return results
+
+
+def _print_conversions(results: list) -> int:
+    failed = 0
+    for (path, *_), result in results:
+        if isinstance(result, Exception):
+            failed += 1
+            print(f"{path}: {result}", file=sys.stderr)
+        else:
+            print(f"{path} -> {result}")
+    return 1 if failed else 0
+
+
+def _convert(args) -> int:
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+    return _print_conversions(_run_batch(convert_file, [(path, args.to, args.output_dir) for path in args.files],
+                                         args.jobs))
+
+
+def _validate(args) -> int:
+    failed = 0
+    for (_, path), result in _run_batch(validate_file, [(args.group, path) for path in args.files], args.jobs,
+                                        import_group, (args.group,)):
+        if isinstance(result, Exception):
+            result = [str(result)]
+        if result:
+            failed += 1
+            for error in result:
+                print(f"{path}: {error}", file=sys.stderr)
+        else:
+            print(f"{path}: ok")
+    return 1 if failed else 0
+
+
+def _snapshot(args) -> int:
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+    return _print_conversions(_run_batch(snapshot_file, [(path, args.output_dir) for path in args.files], args.jobs))
+
+
+def _bench(args) -> int:
+    timings = bench_file(args.file, args.group, args.repeat)
+    for name, values in timings.items():
+        if values:
+            print(f"{name}: min {min(values) * 1000:.3f} ms, mean {sum(values) / len(values) * 1000:.3f} ms "
+                  f"({len(values)} runs)")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the parser of the command line.
+    :return: ArgumentParser.
+    """
+    parser = argparse.ArgumentParser(prog="python -m config_at_once", description="Config file tools.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    convert = subparsers.add_parser("convert", help="convert config files to another format")
+    convert.add_argument("files", nargs="+")
+    convert.add_argument("--to", required=True, help="extension of the converted files, e.g. .yaml or .json.gz")
+    convert.add_argument("--output-dir", help="directory of the converted files, default is next to the sources")
+    convert.add_argument("--jobs", type=int, default=None, help="number of processes, default is the CPU count")
+    convert.set_defaults(func=_convert)
+
+    validate = subparsers.add_parser("validate", help="check config files against a group")
+    validate.add_argument("files", nargs="+")
+    validate.add_argument("--group", required=True, help="module:attribute of the group")
+    validate.add_argument("--jobs", type=int, default=None, help="number of processes, default is the CPU count")
+    validate.set_defaults(func=_validate)
+
+    snapshot = subparsers.add_parser("snapshot", help="convert config files to fast binary .marshal snapshots, "
+                                                     "only readable by the same Python version")
+    snapshot.add_argument("files", nargs="+")
+    snapshot.add_argument("--output-dir", help="directory of the snapshots, default is next to the sources")
+    snapshot.add_argument("--jobs", type=int, default=None, help="number of processes, default is the CPU count")
+    snapshot.set_defaults(func=_snapshot)
+
+    bench = subparsers.add_parser("bench", help="time the parse and the apply of a config file")
+    bench.add_argument("file")
+    bench.add_argument("--group", help="module:attribute of the group, if omitted, only the parse is timed")
+    bench.add_argument("--repeat", type=int, default=10)
+    bench.set_defaults(func=_bench)
+    return parser
+
+
+def main(argv: list = None) -> int:
+    """
+    Run the command line.
+    :param argv: Arguments, default is sys.argv[1:].
+    :return: Exit status.
+    """
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
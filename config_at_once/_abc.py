@@ -2,12 +2,13 @@ import abc
 import os.path
 
 from .config_tree import ConfigTree
+from .serializers import dump_file, load_file
 from .utils import *
 
 _FuncT = TypeVar("_FuncT")
 
 
-class AbcGroup(abc):
+class AbcGroup(abc.ABC):
     """
     Abstract method:
         _build_local_config_tree
@@ -38,6 +39,7 @@ class AbcGroup(abc):
         self.name = name
         self.registered: set = set()
         self.tree: ConfigTree = ConfigTree(group=self)
+        self.config_aliases: dict = dict()
         self._Template = type("Template", (self._Template,), {"group": self})
 
     @abc.abstractmethod
@@ -93,129 +95,42 @@ class AbcGroup(abc):
     def save_to_file(self, path: str = None):
         if path is None:
             path = self.filepath
-        filename_extension = os.path.splitext(path)[1]
-        if filename_extension in [".ini", ".cfg", ".cg", ".conf", ".cnf", ".properties"]:
-            self.save_to_ini(path)
-        elif filename_extension in JSON_FILENAME_EXTENSIONS:
-            self.save_to_json(path)
-        elif filename_extension in YAML_FILENAME_EXTENSIONS:
-            self.save_to_yaml(path)
-        elif filename_extension in TOML_FILENAME_EXTENSIONS:
-            self.save_to_toml(path)
-        elif filename_extension in XML_FILENAME_EXTENSIONS:
-            self.save_to_xml(path)
-        else:
-            raise ValueError(f"Unexpected file extension: {filename_extension}")
+        dump_file(self.tree, path)
 
     def save_to_ini(self, path: str = None):
-        try:
-            import configparser
-            config = configparser.ConfigParser()
-            config.read_dict(self.tree)
-            with open(path, "w") as config_file:
-                config.write(config_file)
-        except ImportError:
-            raise ImportError("The module configparser is not installed")
+        dump_file(self.tree, path or self.filepath, "ini")
 
     def save_to_json(self, path: str = None):
-        try:
-            import json
-            with open(path, "w") as f:
-                json.dump(self.tree, f)
-        except ImportError:
-            raise ImportError("The module json is not installed")
+        dump_file(self.tree, path or self.filepath, "json")
 
     def save_to_yaml(self, path: str = None):
-        try:
-            import yaml
-            with open(path, "w") as f:
-                yaml.dump(self.tree, f)
-        except ImportError:
-            raise ImportError("The module yaml is not installed")
+        dump_file(self.tree, path or self.filepath, "yaml")
 
     def save_to_toml(self, path: str = None):
-        try:
-            import toml
-            with open(path, "w") as f:
-                toml.dump(self.tree, f)
-        except ImportError:
-            raise ImportError("The module toml is not installed")
+        dump_file(self.tree, path or self.filepath, "toml")
 
     def save_to_xml(self, path: str = None):
-        try:
-            import xmltodict
-            with open(path, "w") as f:
-                xmltodict.unparse(self.tree, f)
-        except ImportError:
-            raise ImportError("The module xmltodict is not installed")
+        dump_file(self.tree, path or self.filepath, "xml")
 
     def load_from_file(self, path: str = None):
         if path is None:
             path = self.filepath
-        filename_extension = os.path.splitext(path)[1]
-        if filename_extension in INI_FILENAME_EXTENSIONS:
-            self.load_from_ini(path)
-        elif filename_extension in JSON_FILENAME_EXTENSIONS:
-            self.load_from_json(path)
-        elif filename_extension in YAML_FILENAME_EXTENSIONS:
-            self.load_from_yaml(path)
-        elif filename_extension in TOML_FILENAME_EXTENSIONS:
-            self.load_from_toml(path)
-        elif filename_extension in XML_FILENAME_EXTENSIONS:
-            self.load_from_xml(path)
-        else:
-            raise ValueError(f"Unexpected file extension: {filename_extension}")
+        self.load_from_dict(load_file(path), globals())
 
     def load_from_ini(self, path: str = None):
-        if path is None:
-            path = self.filepath
-        try:
-            import configparser
-            config = configparser.ConfigParser()
-            config.read(path)
-            self.load_from_dict(config, globals())
-        except ImportError:
-            raise ImportError("The module configparser is not installed")
+        self.load_from_dict(load_file(path or self.filepath, "ini"), globals())
 
     def load_from_json(self, path: str = None):
-        if path is None:
-            path = self.filepath
-        try:
-            import json
-            with open(path, "r") as f:
-                self.load_from_dict(json.load(f), globals())
-        except ImportError:
-            raise ImportError("The module json is not installed")
+        self.load_from_dict(load_file(path or self.filepath, "json"), globals())
 
     def load_from_yaml(self, path: str = None):
-        if path is None:
-            path = self.filepath
-        try:
-            import yaml
-            with open(path, "r") as f:
-                self.load_from_dict(yaml.load(f, Loader=yaml.FullLoader), globals())
-        except ImportError:
-            raise ImportError("The module yaml is not installed")
+        self.load_from_dict(load_file(path or self.filepath, "yaml"), globals())
 
     def load_from_toml(self, path: str = None):
-        if path is None:
-            path = self.filepath
-        try:
-            import toml
-            with open(path, "r") as f:
-                self.load_from_dict(toml.load(f), globals())
-        except ImportError:
-            raise ImportError("The module toml is not installed")
+        self.load_from_dict(load_file(path or self.filepath, "toml"), globals())
 
     def load_from_xml(self, path: str = None):
-        if path is None:
-            path = self.filepath
-        try:
-            import xmltodict
-            with open(path, "r") as f:
-                self.load_from_dict(xmltodict.parse(f), globals())
-        except ImportError:
-            raise ImportError("The module xmltodict is not installed")
+        self.load_from_dict(load_file(path or self.filepath, "xml"), globals())
 
     def rebuild_tree(self, config_dict: dict) -> ConfigTree:
         """
@@ -342,7 +257,7 @@ class AbcGroup(abc):
         if _obj is None:
             return fixer
         else:
-            return fixer(__obj=_obj)
+            return fixer(_obj)
 
     def __call__(self, cls: Type[_FuncT]) -> _FuncT:
         """
@@ -0,0 +1,70 @@
+import os
+import sys
+from urllib.parse import quote
+
+from .config_tree import ConfigTree
+from .serializers import import_module
+from .utils import *
+
+# Key of the dict replacing an array leaf in the main config file, its value is the sidecar file path
+ARRAY_MARKER = "__ndarray__"
+SIDECAR_SUFFIX = ".arrays"
+
+
+def sidecar_directory(path: str) -> str:
+    """
+    Get the directory of the array sidecar files of a config file, e.g. "config.arrays" for "config.json".
+    :param path: Path of the config file.
+    :return: str.
+    """
+    return os.path.splitext(path)[0] + SIDECAR_SUFFIX
+
+
+def _is_ndarray(value) -> bool:
+    # numpy is never imported here, if it is not imported yet, no array can exist
+    np = sys.modules.get("numpy")
+    return np is not None and isinstance(value, np.ndarray)
+
+
+def extract_arrays(tree: ConfigTree, path: str) -> ConfigTree:
+    """
+    Save the array leaves of a tree to .npy sidecar files and replace them by {ARRAY_MARKER: relative file path}.
+    :param tree: ConfigTree.
+    :param path: Path of the config file the tree is saved to.
+    :return: A copy of tree, or tree itself if it has no array leaf.
+    """
+    flat = tree.flatten()
+    arrays = {leaf_path: value for leaf_path, value in flat.items() if _is_ndarray(value)}
+    if not arrays:
+        return tree
+    np = import_module("numpy")
+    directory = sidecar_directory(path)
+    os.makedirs(directory, exist_ok=True)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    result = tree.copy(group=tree.group)
+    for leaf_path, array in arrays.items():
+        array_path = os.path.join(directory, quote(leaf_path, safe="") + ".npy")
+        np.save(array_path, array, allow_pickle=False)
+        result.set_by_path(leaf_path, {ARRAY_MARKER: os.path.relpath(array_path, base_dir).replace(os.sep, "/")})
+    return result
+
+
+def restore_arrays(data: dict, path: str, mmap_mode: (str, None) = "r") -> dict:
+    """
+    Replace the array markers of a loaded config dict by the arrays of the sidecar files.
+    Arrays are memory mapped by default, so they are only read from disk when accessed.
+    :param data: Loaded config dict, modified in place.
+    :param path: Path of the loaded config file.
+    :param mmap_mode: mmap_mode of numpy.load, None to read the arrays into memory.
+    :return: data.
+    """
+    base_dir = os.path.dirname(os.path.abspath(path))
+    for k, v in data.items():
+        if not isinstance(v, dict):
+            continue
+        if len(v) == 1 and isinstance(v.get(ARRAY_MARKER), str):
+            np = import_module("numpy")
+            data[k] = np.load(os.path.join(base_dir, v[ARRAY_MARKER]), mmap_mode=mmap_mode, allow_pickle=False)
+        else:
+            restore_arrays(v, path, mmap_mode)
+    return data
@@ -0,0 +1,98 @@
+import operator
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from .config_tree import ConfigTree
+from .utils import *
+
+DEFAULT_CHUNK_SIZE = 256
+
+
+def is_config_leaf(value) -> bool:
+    """
+    Check if a leaf of a class tree is a config value rather than a method, a descriptor or a nested class.
+    :param value: Leaf value.
+    :return: bool.
+    """
+    return not callable(value) and not hasattr(type(value), "__get__")
+
+
+class ApplyPlan:
+    """
+    The attribute assignments of a config subtree, compiled once and applied to any number of targets.
+
+    Only the config leaves are assigned, see is_config_leaf, so the methods of a class tree are never set on a target.
+
+    Attributes:
+        steps: A list of (getter of the parent object or None, attribute name, value).
+    """
+
+    def __init__(self, tree: ConfigTree):
+        """
+        Compile the plan of a subtree.
+        :param tree: ConfigTree, nested trees are applied to the attributes of the same name.
+        """
+        self.steps: list = list()
+        for path, value in ConfigTree(tree).flatten().items():
+            if not is_config_leaf(value):
+                continue
+            names = ConfigTree.config_path_split(path)
+            getter = operator.attrgetter(".".join(names[:-1])) if len(names) > 1 else None
+            self.steps.append((getter, names[-1], value))
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def apply(self, target):
+        """
+        Apply the plan to a target.
+        :param target: A class or an instance.
+        """
+        for getter, name, value in self.steps:
+            setattr(target if getter is None else getter(target), name, value)
+
+    def apply_chunk(self, targets: Iterable) -> list:
+        """
+        Apply the plan to several targets, a failing target does not stop the others.
+        :param targets: Classes or instances.
+        :return: list of (target, exception) of the failed targets.
+        """
+        failures = []
+        for target in targets:
+            try:
+                self.apply(target)
+            except Exception as e:
+                failures.append((target, e))
+        return failures
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterable[list]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def apply_many(plan: (ApplyPlan, ConfigTree), targets: Iterable, max_workers: int = None,
+               chunk_size: int = DEFAULT_CHUNK_SIZE) -> list:
+    """
+    Apply a subtree to many targets.
+    :param plan: ApplyPlan, or a ConfigTree compiled into one.
+    :param targets: Classes or instances.
+    :param max_workers: If given, apply the chunks on a thread pool of this size, useful for slow property setters.
+    :param chunk_size: Number of targets per task of the thread pool.
+    :return: list of (target, exception) of the failed targets, in the order of targets.
+    """
+    if not isinstance(plan, ApplyPlan):
+        plan = ApplyPlan(plan)
+    if max_workers is None:
+        return plan.apply_chunk(targets)
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, not {chunk_size}")
+    failures = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for chunk_failures in executor.map(plan.apply_chunk, _chunks(targets, chunk_size)):
+            failures.extend(chunk_failures)
+    return failures
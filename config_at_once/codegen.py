@@ -0,0 +1,296 @@
+import hashlib
+import importlib.util
+import keyword
+import math
+import os
+import py_compile
+import sys
+import tempfile
+
+from .config_tree import ConfigTree
+from .layers import DEFAULTS_LAYER
+from .serializers import load_file
+from .tree_cache import module_hash
+from .utils import *
+
+# Bumped when the generated source changes, so modules of an older generator are regenerated
+CODEGEN_VERSION = 1
+
+_FINGERPRINT_HEADER = "# config_at_once fingerprint: "
+
+# Leaf types written in the generated modules, the other leaves, e.g. methods and descriptors, are not config
+_GENERATED_TYPES = (bool, int, float, complex, str, bytes, type(None), dict, list, tuple, set, frozenset)
+
+_PRELUDE = '''
+
+class _FrozenConfig(type):
+    def __setattr__(cls, name, value):
+        raise AttributeError(f"{cls.__qualname__} is a frozen config")
+
+    def __delattr__(cls, name):
+        raise AttributeError(f"{cls.__qualname__} is a frozen config")
+
+'''
+
+
+def config_view(tree: ConfigTree) -> ConfigTree:
+    """
+    Get the leaves of a tree that are written in the generated modules.
+    :param tree: ConfigTree.
+    :return: A new ConfigTree instance, without the methods, descriptors and other objects.
+    """
+    return tree.remove_by_objects(_GENERATED_TYPES)
+
+
+def defaults_tree(group) -> ConfigTree:
+    """
+    Get the defaults of a group as built by its last init_config.
+    :param group: Group.
+    :return: ConfigTree, empty if the config of the group is not initialized.
+    """
+    return ConfigTree.from_flat(group.layers.layers[DEFAULTS_LAYER])
+
+
+def defining_modules(group, root: dict) -> dict:
+    """
+    Hash the source of the modules defining the config of a group, see tree_cache.module_hash.
+    They are the root module and the modules of the registered classes and their bases,
+    known once the classes are imported, before any init_config.
+    :param group: Group.
+    :param root: config root.
+    :return: dict of module name to hex digest, None for a module without a readable source file.
+    """
+    names = set()
+    if isinstance(root.get("__name__"), str):
+        names.add(root["__name__"])
+    for cls in list(group.registered):
+        names.update(base.__module__ for base in cls.__mro__ if base.__module__ != "builtins")
+    return {name: module_hash(name) for name in sorted(names)}
+
+
+def source_fingerprint(sources: Iterable[str], group_name: str = "", modules: dict = None,
+                       defaults: ConfigTree = None) -> str:
+    """
+    Fingerprint the config files and the class defaults a generated module is built from.
+    :param sources: Paths of the config files.
+    :param group_name: Name of the group.
+    :param modules: Source hashes of the defining modules, see defining_modules,
+        so editing a class default regenerates the module.
+    :param defaults: Defaults of the group, see defaults_tree, used when the source of a module is unknown.
+    :return: Hex digest.
+    """
+    h = hashlib.blake2b(f"{CODEGEN_VERSION}:{group_name}".encode(), digest_size=16)
+    if modules is not None:
+        h.update(repr(sorted(modules.items())).encode())
+    if defaults is not None:
+        h.update(config_view(defaults).fingerprint().encode())
+    for source in sources:
+        with open(source, "rb") as f:
+            content = f.read()
+        h.update(len(content).to_bytes(8, "big"))
+        h.update(content)
+    return h.hexdigest()
+
+
+def group_fingerprint(group, root: dict, sources: Iterable[str] = ()) -> str:
+    """
+    Fingerprint the generated module of a group.
+    The class defaults are checked through the source of their modules, so no init_config is needed,
+    unless a module has no readable source, then the defaults of the group are built and fingerprinted.
+    :param group: Group.
+    :param root: config root.
+    :param sources: Paths of the config files.
+    :return: Hex digest.
+    """
+    modules = defining_modules(group, root)
+    if None not in modules.values():
+        return source_fingerprint(sources, group.name, modules)
+    if group.root is not root or not group.layers.layers[DEFAULTS_LAYER]:
+        group.init_config(root)
+    return source_fingerprint(sources, group.name, modules, defaults_tree(group))
+
+
+def value_source(value) -> str:
+    """
+    Get the Python source of a leaf value.
+    :param value: Leaf value, literals and containers of literals are supported.
+    :return: str.
+    """
+    value_type = type(value)
+    if value is None or value_type in (bool, int, str, bytes, complex):
+        return repr(value)
+    if value_type is float:
+        return repr(value) if math.isfinite(value) else f"float({str(value)!r})"
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{value_source(k)}: {value_source(v)}" for k, v in value.items()) + "}"
+    if value_type is list:
+        return "[" + ", ".join(value_source(item) for item in value) + "]"
+    if value_type is tuple:
+        return "(" + "".join(f"{value_source(item)}, " for item in value) + ")"
+    if value_type in (set, frozenset):
+        return f"{value_type.__name__}([" + ", ".join(value_source(item) for item in value) + "])"
+    raise TypeError(f"unsupported value type for code generation: {value_type}")
+
+
+def _is_class_name(name) -> bool:
+    return isinstance(name, str) and name.isidentifier() and not keyword.iskeyword(name) \
+        and not (name.startswith("__") and name.endswith("__"))
+
+
+def iter_class_source(name: str, tree: ConfigTree, depth: int = 0, group=None) -> Iterable[str]:
+    """
+    Generate the source of a frozen slotted class mirroring a tree.
+    Subtrees whose keys are all identifiers become nested classes, the others become dicts.
+    :param name: Class name.
+    :param tree: ConfigTree.
+    :param depth: Indentation depth.
+    :param group: Group used for the WARNING switch, unsupported values are skipped with a warning or raise.
+    :return: Iterable of lines.
+    """
+    indent = "    " * depth
+    yield f"{indent}class {name}(metaclass=_FrozenConfig):\n"
+    yield f"{indent}    __slots__ = ()\n"
+    for k, v in tree.items():
+        try:
+            if isinstance(v, ConfigTree) and all(_is_class_name(key) for key in v):
+                yield "\n"
+                yield from iter_class_source(k, v, depth + 1, group)
+                yield "\n"
+            else:
+                yield f"{indent}    {k} = {value_source(v)}\n"
+        except TypeError as e:
+            if group is None or group.WARNING:
+                warnings.warn(f"{k} of {name} is not generated: {e}", RuntimeWarning)
+            else:
+                raise e
+
+
+def generate_source(tree: ConfigTree, fingerprint: str, group_name: str = "", group=None) -> str:
+    """
+    Generate the source of a module of frozen slotted classes mirroring a tree.
+    :param tree: ConfigTree, usually the resolved tree of a group.
+    :param fingerprint: Fingerprint written in the module header, see source_fingerprint.
+    :param group_name: Name of the group.
+    :param group: Group used for the WARNING switch.
+    :return: str.
+    """
+    lines = [f"{_FINGERPRINT_HEADER}{fingerprint}\n",
+             "# Generated by config_at_once.codegen, do not edit.\n",
+             f"__config_fingerprint__ = {fingerprint!r}\n",
+             f"__config_group__ = {group_name!r}\n",
+             _PRELUDE]
+    for k, v in tree.items():
+        try:
+            if not _is_class_name(k):
+                raise TypeError(f"not a valid name: {k!r}")
+            if isinstance(v, ConfigTree) and all(_is_class_name(key) for key in v):
+                lines.extend(iter_class_source(k, v, 0, group))
+                lines.append("\n\n")
+            else:
+                lines.append(f"{k} = {value_source(v)}\n\n")
+        except TypeError as e:
+            if group is None or group.WARNING:
+                warnings.warn(f"{k} is not generated: {e}", RuntimeWarning)
+            else:
+                raise e
+    return "".join(lines).rstrip("\n") + "\n"
+
+
+def read_fingerprint(path: str) -> (str, None):
+    """
+    Read the fingerprint of a generated module from its first line, without importing it.
+    :param path: Path of the generated module.
+    :return: Fingerprint, None if the file does not exist or is not a generated module.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            header = f.readline()
+    except OSError:
+        return None
+    if not header.startswith(_FINGERPRINT_HEADER):
+        return None
+    return header[len(_FINGERPRINT_HEADER):].strip()
+
+
+def compile_group(group, path: str, sources: Iterable[str] = (), root: dict = None) -> str:
+    """
+    Write the resolved tree of a group as a generated module and byte-compile it.
+    Only the config leaves are written, see config_view.
+    The .pyc is hash checked, so a regenerated module is never shadowed by a stale .pyc.
+    :param group: Group, its config should be loaded.
+    :param path: Path of the generated module.
+    :param sources: Paths of the config files the tree is loaded from.
+    :param root: config root, default is the root of the last init_config.
+    :return: Fingerprint of the module.
+    """
+    fingerprint = group_fingerprint(group, group.root if root is None else root, sources)
+    source = generate_source(config_view(group.tree), fingerprint, group.name, group)
+    fd, tmp_path = tempfile.mkstemp(suffix=".tmp", prefix=os.path.basename(path) + ".",
+                                    dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(source)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    py_compile.compile(path, cfile=importlib.util.cache_from_source(path), doraise=True,
+                       invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH)
+    return fingerprint
+
+
+def _module_name(path: str) -> str:
+    digest = hashlib.blake2b(os.path.abspath(path).encode(), digest_size=4).hexdigest()
+    return f"_config_at_once_static_{os.path.splitext(os.path.basename(path))[0]}_{digest}"
+
+
+def import_compiled(path: str, fingerprint: str):
+    """
+    Import a generated module if it is up to date.
+    A module already imported with this fingerprint is reused from sys.modules.
+    :param path: Path of the generated module.
+    :param fingerprint: Expected fingerprint, see group_fingerprint.
+    :return: Module, None if the module is missing or stale.
+    """
+    module_name = _module_name(path)
+    module = sys.modules.get(module_name)
+    if module is not None and getattr(module, "__config_fingerprint__", None) == fingerprint:
+        return module
+    if read_fingerprint(path) != fingerprint:
+        return None
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    sys.modules[module_name] = module
+    return module
+
+
+def load_static(group, path: str, root: dict, sources: Iterable[str] = ()):
+    """
+    Import the generated module of a group, if it is missing or stale,
+    load the config normally with load_config, then regenerate the module.
+    The module is checked against the source of the modules defining the classes, see group_fingerprint,
+    so an up to date module costs no init_config.
+    :param group: Group.
+    :param path: Path of the generated module.
+    :param root: config root, usually be globals() or __dict__.
+    :param sources: Paths of the config files, the later files take precedence.
+    :return: Module.
+    """
+    sources = list(sources)
+    try:
+        fingerprint = group_fingerprint(group, root, sources)
+    except OSError:
+        fingerprint = None
+    module = None if fingerprint is None else import_compiled(path, fingerprint)
+    if module is not None:
+        return module
+    if group.root is not root or not group.layers.layers[DEFAULTS_LAYER]:
+        group.init_config(root)
+    if sources:
+        loaded = dict()
+        for source in sources:
+            loaded.update(group.rebuild_tree(load_file(source)).flatten())
+        group.load_config(ConfigTree.from_flat(loaded, group=group), root)
+    return import_compiled(path, compile_group(group, path, sources, root))
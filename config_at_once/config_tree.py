@@ -1,5 +1,114 @@
+import copy
+import hashlib
+import sys
+import weakref
 from typing import Callable, Iterable
 
+from .utils import values_differ
+
+_MISSING = object()
+_DIGEST_SIZE = 16
+# hashed by repr, which is exact for these types, e.g. 0.0 and -0.0 differ
+_REPR_TYPES = frozenset([bool, int, float, complex])
+
+
+def _digest(value) -> bytes:
+    """
+    Hash a value from a canonical encoding of its content.
+    Scalars, strings, bytes, lists, tuples, sets, dicts and numpy arrays are hashed by content, set items in sorted
+    digest order, arrays by dtype, shape and raw bytes. Other leaves are hashed by identity: equal objects
+    hash differently, and their digests change between processes.
+    """
+    if isinstance(value, ConfigTree):
+        return value._digest()
+    if isinstance(value, dict):
+        return _mapping_digest(value)
+    value_type = type(value)
+    h = hashlib.blake2b(f"{value_type.__module__}.{value_type.__qualname__}:".encode(), digest_size=_DIGEST_SIZE)
+    if value is None or value_type in _REPR_TYPES:
+        h.update(repr(value).encode())
+    elif value_type is str:
+        h.update(value.encode("utf-8", "surrogatepass"))
+    elif value_type is bytes:
+        h.update(value)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            h.update(_digest(item))
+    elif isinstance(value, (set, frozenset)):
+        for item_digest in sorted(_digest(item) for item in value):
+            h.update(item_digest)
+    elif _is_plain_ndarray(value):
+        h.update(f"{value.dtype.str}{value.shape}".encode())
+        h.update(value.tobytes())
+    else:
+        h.update(b"id:" + id(value).to_bytes(8, "big"))
+    return h.digest()
+
+
+def _is_plain_ndarray(value) -> bool:
+    # numpy is never imported here, if it is not imported yet, no array can exist
+    np = sys.modules.get("numpy")
+    return np is not None and isinstance(value, np.ndarray) and not value.dtype.hasobject
+
+
+def _mapping_digest(mapping: dict) -> bytes:
+    # sorted pair digests, so equal mappings have equal digests whatever their key order
+    h = hashlib.blake2b(b"dict", digest_size=_DIGEST_SIZE)
+    for pair in sorted(_digest(k) + _digest(v) for k, v in mapping.items()):
+        h.update(pair)
+    return h.digest()
+
+
+class ConfigPatch:
+    """
+    The difference between two ConfigTrees, as dotted leaf paths.
+
+    Attributes:
+        added: A dict of the values of the paths only in the new tree.
+        removed: A list of the paths only in the old tree.
+        changed: A dict of the new values of the paths in both trees whose values differ.
+    """
+
+    def __init__(self, added: dict = None, removed: list = None, changed: dict = None):
+        """
+        Initialize the ConfigPatch.
+        :param added: Values of the added paths.
+        :param removed: Removed paths.
+        :param changed: New values of the changed paths.
+        """
+        self.added: dict = dict() if added is None else added
+        self.removed: list = list() if removed is None else removed
+        self.changed: dict = dict() if changed is None else changed
+
+    def values(self) -> dict:
+        """
+        Get the values to set to apply the patch.
+        :return: dict of the added and changed values keyed by dotted path.
+        """
+        return {**self.added, **self.changed}
+
+    def paths(self) -> list:
+        """
+        Get every path touched by the patch.
+        :return: list of dotted paths.
+        """
+        return list(self.added) + self.removed + list(self.changed)
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __len__(self):
+        return len(self.added) + len(self.removed) + len(self.changed)
+
+    def __eq__(self, other):
+        if not isinstance(other, ConfigPatch):
+            return NotImplemented
+        return (self.added == other.added and sorted(self.removed) == sorted(other.removed)
+                and self.changed == other.changed)
+
+    def __repr__(self):
+        return f"ConfigPatch(added={self.added!r}, removed={self.removed!r}, changed={self.changed!r})"
+
 
 class ConfigTree(dict):
     """
@@ -11,8 +120,27 @@ class ConfigTree(dict):
     formats such as JSON, INI, XML, or YAML.
 
     Attributes:
-        group: An optional attribute representing the group associated with ConfigTree.
+        group: An optional attribute representing the group associated with ConfigTree,
+            only weakly referenced for a weak mode group, so its trees never keep it alive.
+        frozen: True for immutable trees, which set_by_path and pop_by_path copy before writing.
     """
+    frozen = False
+    _fingerprint: (bytes, None) = None
+    _parents: (dict, None) = None
+    _group_ref: (Callable, None) = None
+
+    @property
+    def group(self):
+        return None if self._group_ref is None else self._group_ref()
+
+    @group.setter
+    def group(self, group):
+        if group is None:
+            self._group_ref = None
+        elif getattr(group, "weak", False):
+            self._group_ref = weakref.ref(group)
+        else:
+            self._group_ref = lambda: group
 
     def __init__(self, __d=None, group=None):
         """
@@ -25,6 +153,92 @@ class ConfigTree(dict):
         if __d is not None:
             self.update(__d)
 
+    def _adopt(self, value):
+        if isinstance(value, ConfigTree) and not value.frozen:
+            if value._parents is None:
+                value._parents = dict()
+            value._parents[id(self)] = weakref.ref(self)
+
+    def _invalidate(self):
+        """
+        Drop the cached fingerprint of this node and of its ancestors.
+        A node without fingerprint has no ancestor with a fingerprint, so the walk stops there.
+        """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node._fingerprint is None:
+                continue
+            node._fingerprint = None
+            if node._parents:
+                for ref in list(node._parents.values()):
+                    parent = ref()
+                    if parent is not None:
+                        stack.append(parent)
+
+    def __setitem__(self, key, value):
+        self._adopt(value)
+        super().__setitem__(key, value)
+        self._invalidate()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._invalidate()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def update(self, __m=(), **kwargs):
+        items = dict(__m, **kwargs)
+        for value in items.values():
+            self._adopt(value)
+        super().update(items)
+        self._invalidate()
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key, *default):
+        value = super().pop(key, *default)
+        self._invalidate()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._invalidate()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._invalidate()
+
+    def __reduce__(self):
+        # the parent links and the cached fingerprint are rebuilt, the group is not pickled
+        state = {k: v for k, v in self.__dict__.items() if k not in ("_fingerprint", "_parents", "_group_ref")}
+        return self.__class__, (dict(self),), state or None
+
+    def __deepcopy__(self, memo):
+        tree = self.__class__(copy.deepcopy(dict(self), memo), group=self.group)
+        memo[id(self)] = tree
+        return tree
+
+    def _digest(self) -> bytes:
+        if self._fingerprint is None:
+            self._fingerprint = _mapping_digest(self)
+        return self._fingerprint
+
+    def fingerprint(self) -> str:
+        """
+        Get the content hash of the tree, equal trees have equal fingerprints.
+        The hash of every node is cached and only the nodes along the path of a mutation are recomputed,
+        so it is O(1) once computed. In-place mutations of leaf values, e.g. appending to a list, are not tracked.
+        :return: Hex digest.
+        """
+        return self._digest().hex()
+
     @staticmethod
     def config_path_join(*paths) -> str:
         return ".".join(paths)
@@ -45,6 +259,136 @@ class ConfigTree(dict):
         else:
             raise ValueError(f"path {path} no found")
 
+    def get_by_path(self, path: str, default=_MISSING):
+        """
+        Get the value at a dotted config path.
+        :param path: Dotted path relative to this tree, e.g. "Db.Pool.size".
+        :param default: Returned if the path does not exist, if not given, raise KeyError.
+        :return: Value at the path.
+        """
+        node = self
+        for name in self.config_path_split(path):
+            if not isinstance(node, ConfigTree) or name not in node:
+                if default is _MISSING:
+                    raise KeyError(path)
+                return default
+            node = node[name]
+        return node
+
+    def set_by_path(self, path: str, value):
+        """
+        Set the value at a dotted config path, missing intermediate nodes are created
+        and frozen nodes along the path are replaced by mutable copies.
+        :param path: Dotted path relative to this tree.
+        :param value: Value to set.
+        """
+        names = self.config_path_split(path)
+        self._writable_node(names[:-1], create=True)[names[-1]] = value
+
+    def _writable_node(self, names: list, create: bool) -> ("ConfigTree", None):
+        node = self
+        for name in names:
+            child = node.get(name)
+            if not isinstance(child, ConfigTree):
+                if not create:
+                    return None
+                child = ConfigTree(group=self.group)
+                node[name] = child
+            elif child.frozen:
+                child = ConfigTree(child, group=child.group)
+                node[name] = child
+            node = child
+        return node
+
+    def pop_by_path(self, path: str, default=_MISSING):
+        """
+        Remove the value at a dotted config path.
+        :param path: Dotted path relative to this tree.
+        :param default: Returned if the path does not exist, if not given, raise KeyError.
+        :return: Removed value.
+        """
+        names = self.config_path_split(path)
+        try:
+            self.get_by_path(path)
+        except KeyError:
+            if default is _MISSING:
+                raise
+            return default
+        return self._writable_node(names[:-1], create=False).pop(names[-1])
+
+    def flatten(self, prefix: str = None) -> dict:
+        """
+        Flatten the tree to a dict of leaf values keyed by dotted path.
+        :param prefix: Path prepended to every key.
+        :return: dict.
+        """
+        flat = dict()
+        self._flatten_into(flat, prefix)
+        return flat
+
+    def _flatten_into(self, flat: dict, prefix: (str, None)):
+        for k, v in self.items():
+            path = k if prefix is None else self.config_path_join(prefix, k)
+            if isinstance(v, ConfigTree):
+                v._flatten_into(flat, path)
+            else:
+                flat[path] = v
+
+    def diff(self, other: "ConfigTree") -> ConfigPatch:
+        """
+        Compute the patch from this tree to another.
+        Subtrees that are the same object, or whose cached fingerprints are equal, are skipped without walking them.
+        :param other: The new tree.
+        :return: ConfigPatch.
+        """
+        patch = ConfigPatch()
+        self._diff_into(other, None, patch)
+        return patch
+
+    def _diff_into(self, other: "ConfigTree", prefix: (str, None), patch: ConfigPatch):
+        if self is other:
+            return
+        if self._fingerprint is not None and self._fingerprint == other._fingerprint:
+            return
+        for k, v in self.items():
+            path = k if prefix is None else self.config_path_join(prefix, k)
+            new_v = other.get(k, _MISSING)
+            if isinstance(v, ConfigTree) and isinstance(new_v, ConfigTree):
+                v._diff_into(new_v, path, patch)
+                continue
+            if new_v is not _MISSING and not isinstance(v, ConfigTree) and not isinstance(new_v, ConfigTree):
+                if values_differ(v, new_v):
+                    patch.changed[path] = new_v
+                continue
+            if isinstance(v, ConfigTree):
+                patch.removed.extend(v.flatten(path))
+            else:
+                patch.removed.append(path)
+            if isinstance(new_v, ConfigTree):
+                patch.added.update(new_v.flatten(path))
+            elif new_v is not _MISSING:
+                patch.added[path] = new_v
+        for k, new_v in other.items():
+            if k not in self:
+                path = k if prefix is None else self.config_path_join(prefix, k)
+                if isinstance(new_v, ConfigTree):
+                    patch.added.update(new_v.flatten(path))
+                else:
+                    patch.added[path] = new_v
+
+    @classmethod
+    def from_flat(cls, flat: dict, group=None):
+        """
+        Build a ConfigTree from a dict of leaf values keyed by dotted path.
+        :param flat: Dict returned by flatten.
+        :param group: The group associated with the ConfigTree.
+        :return: A new ConfigTree instance.
+        """
+        tree = cls(group=group)
+        for path, value in flat.items():
+            tree.set_by_path(path, value)
+        return tree
+
     def remove_by_func(self, check_remove: Callable, name: bool = True, value: bool = True,
                        copy: bool = True):
         """
@@ -98,14 +442,30 @@ class ConfigTree(dict):
             tree = self.copy()
         else:
             tree = self
-
-        for k, v in dict.copy(tree).items():
-            if isinstance(v, ConfigTree):
-                v.remove_by_objects(allowed_objects, copy=False)
-            elif not isinstance(v, allowed_objects) or isinstance(v, ignored_objects):
-                tree.pop(k)
+        tree._remove_by_types(allowed_objects, ignored_objects, dict())
         return tree
 
+    def _remove_by_types(self, allowed_objects: tuple, ignored_objects: tuple, keep: dict):
+        # keep caches the decision per concrete type, so each leaf costs one dict lookup
+        for k, v in dict.copy(self).items():
+            decision = keep.get(type(v))
+            if decision is None:
+                decision = keep[type(v)] = "tree" if isinstance(v, ConfigTree) else \
+                    isinstance(v, allowed_objects) and not isinstance(v, ignored_objects)
+            if decision == "tree":
+                v._remove_by_types(allowed_objects, ignored_objects, keep)
+            elif not decision:
+                self.pop(k)
+
+    def memory_report(self, top: int = 10) -> dict:
+        """
+        Report the deep retained size of the heaviest subtrees and leaves, shared objects are counted once.
+        :param top: Number of paths.
+        :return: {"total": size of the tree, "top": list of (path, size) by decreasing size}.
+        """
+        from .memory import memory_report
+        return memory_report(self, top)
+
     def copy(self, group=None):
         """
         Create a copy of the current ConfigTree, but will not copy the elements.
@@ -0,0 +1,391 @@
+import json
+import logging
+import os
+import queue
+import socket
+import struct
+import threading
+
+from .encoders import DROP, encode_value, decode_value
+from .layers import FILE_LAYER
+from .utils import *
+
+logger = logging.getLogger(__name__)
+
+WIRE_MAGIC = b"CAOC"
+# 2: JSON payloads, 1 was marshal, whose format depends on the Python version
+# JSON is larger than a binary encoding, but it is safe to decode from any peer and stable across Python versions,
+# and frames only carry the changed paths
+WIRE_VERSION = 2
+
+# Frames queued per subscriber before it is considered too slow and dropped
+DEFAULT_MAX_PENDING = 64
+# Seconds a send to a subscriber may block before the subscriber is dropped
+DEFAULT_SEND_TIMEOUT = 5.0
+
+FRAME_FULL = 1
+FRAME_DELTA = 2
+
+# magic, wire version, frame kind, config version, payload length
+_HEADER = struct.Struct("!4sBBQI")
+_MISSING = object()
+
+
+def _wire_values(values: dict) -> dict:
+    values = {path: encode_value(value) for path, value in values.items()}
+    return {path: value for path, value in values.items() if value is not DROP}
+
+
+def encode_frame(kind: int, version: int, changes: dict, removed: Iterable[str] = ()) -> bytes:
+    """
+    Encode a config frame: a fixed header followed by a JSON payload.
+    Values are encoded as in the config files, see encoders.
+    :param kind: FRAME_FULL or FRAME_DELTA.
+    :param version: Config version of the publisher.
+    :param changes: Changed values keyed by dotted path, values that cannot be encoded are skipped.
+    :param removed: Removed dotted paths.
+    :return: bytes.
+    """
+    payload = json.dumps({"changes": _wire_values(changes), "removed": list(removed)},
+                         separators=(",", ":")).encode("utf-8")
+    return _HEADER.pack(WIRE_MAGIC, WIRE_VERSION, kind, version, len(payload)) + payload
+
+
+def decode_header(header: bytes) -> tuple:
+    """
+    Decode a frame header.
+    :param header: The first bytes of a frame.
+    :return: (kind, version, payload length).
+    """
+    magic, wire_version, kind, version, length = _HEADER.unpack(header)
+    if magic != WIRE_MAGIC:
+        raise ValueError(f"unexpected frame magic: {magic}")
+    if wire_version != WIRE_VERSION:
+        raise ValueError(f"unsupported wire version: {wire_version}")
+    return kind, version, length
+
+
+def decode_payload(payload: bytes) -> tuple:
+    """
+    Decode the payload of a frame.
+    :param payload: JSON payload.
+    :return: (changes, removed).
+    """
+    data = json.loads(payload)
+    if not isinstance(data, dict) or not isinstance(data.get("changes"), dict) \
+            or not isinstance(data.get("removed"), list):
+        raise ValueError("malformed frame payload")
+    return {path: decode_value(value) for path, value in data["changes"].items()}, data["removed"]
+
+
+def decode_frame(frame: bytes) -> tuple:
+    """
+    Decode a whole frame.
+    :param frame: bytes returned by encode_frame.
+    :return: (kind, version, changes, removed).
+    """
+    kind, version, length = decode_header(frame[:_HEADER.size])
+    changes, removed = decode_payload(frame[_HEADER.size:_HEADER.size + length])
+    return kind, version, changes, removed
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> (bytes, None):
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_frame(sock: socket.socket) -> (tuple, None):
+    """
+    Read a frame from a socket.
+    :param sock: Connected socket.
+    :return: (kind, version, changes, removed), or None if the connection is closed.
+    """
+    header = _recv_exactly(sock, _HEADER.size)
+    if header is None:
+        return None
+    kind, version, length = decode_header(header)
+    payload = _recv_exactly(sock, length)
+    if payload is None:
+        return None
+    changes, removed = decode_payload(payload)
+    return kind, version, changes, removed
+
+
+class _ClientWriter:
+    """
+    Sends the frames of one subscriber from its own thread, so a subscriber that stops reading never blocks
+    the publishing group. Frames are queued up to a bound, past it the subscriber is dropped.
+    """
+
+    def __init__(self, conn: socket.socket, max_pending: int, send_timeout: float):
+        self.conn = conn
+        self.conn.settimeout(send_timeout)
+        self.closed = False
+        self._queue = queue.Queue(max_pending)
+        self._thread = threading.Thread(target=self._send_loop, name="ConfigPublisher writer", daemon=True)
+        self._thread.start()
+
+    def send(self, frame: bytes) -> bool:
+        """
+        Queue a frame.
+        :param frame: Encoded frame.
+        :return: False if the subscriber is dropped.
+        """
+        if self.closed:
+            return False
+        try:
+            self._queue.put_nowait(frame)
+        except queue.Full:
+            logger.warning("dropping a config subscriber that does not keep up")
+            self.close()
+            return False
+        return True
+
+    def _send_loop(self):
+        while True:
+            frame = self._queue.get()
+            if frame is None:
+                break
+            try:
+                self.conn.sendall(frame)
+            except OSError:
+                break
+        self.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.conn.close()
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            # the writer fails on the closed socket instead
+            pass
+
+
+class ConfigPublisher:
+    """
+    Owns the config of a group and pushes it to ConfigSubscribers over a Unix domain socket.
+
+    A new subscriber first receives the full resolved tree, then every change of the group
+    is broadcast as a delta of the changed paths, tagged with an increasing version.
+    Each subscriber is written to by its own thread through a bounded queue, a subscriber that falls behind
+    by max_pending frames, or whose send blocks for send_timeout seconds, is disconnected.
+
+    Attributes:
+        group: The publishing group.
+        address: Filesystem path of the Unix domain socket.
+        version: Version of the last broadcast config.
+    """
+
+    def __init__(self, group, address: str, max_pending: int = DEFAULT_MAX_PENDING,
+                 send_timeout: float = DEFAULT_SEND_TIMEOUT):
+        """
+        Initialize the ConfigPublisher.
+        :param group: The publishing group.
+        :param address: Filesystem path of the Unix domain socket.
+        :param max_pending: Frames queued per subscriber before it is dropped.
+        :param send_timeout: Seconds a send may block before the subscriber is dropped.
+        """
+        self.group = group
+        self.address = address
+        self.max_pending = max_pending
+        self.send_timeout = send_timeout
+        self.version = 0
+        self._clients: list = list()
+        self._lock = threading.Lock()
+        self._server: (socket.socket, None) = None
+        self._thread: (threading.Thread, None) = None
+        self._unsubscribe: (Callable, None) = None
+        self._running = False
+
+    def start(self):
+        """
+        Listen on the socket and subscribe to the changes of the group.
+        :return: self.
+        """
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(self.address)
+        self._server.listen()
+        self._server.settimeout(0.1)
+        self._running = True
+        self._unsubscribe = self.group.subscribe("", self.broadcast)
+        self._thread = threading.Thread(target=self._accept_loop, name=f"ConfigPublisher({self.address})",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                conn, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            with self._lock:
+                writer = _ClientWriter(conn, self.max_pending, self.send_timeout)
+                if writer.send(encode_frame(FRAME_FULL, self.version, self.group.tree.flatten())):
+                    self._clients.append(writer)
+
+    def broadcast(self, paths: Iterable[str]):
+        """
+        Queue the current values of the changed paths to every subscriber, it never waits for a subscriber.
+        :param paths: Changed dotted paths.
+        """
+        changes, removed = dict(), list()
+        for path in paths:
+            value = self.group.tree.get_by_path(path, _MISSING)
+            if value is _MISSING:
+                removed.append(path)
+            else:
+                changes[path] = value
+        with self._lock:
+            self.version += 1
+            frame = encode_frame(FRAME_DELTA, self.version, changes, removed)
+            self._clients = [writer for writer in self._clients if writer.send(frame)]
+
+    def close(self):
+        """
+        Stop publishing and remove the socket file.
+        """
+        self._running = False
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            for writer in self._clients:
+                writer.close()
+            self._clients.clear()
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            if os.path.exists(self.address):
+                os.unlink(self.address)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class ConfigSubscriber:
+    """
+    Receives config frames from a ConfigPublisher and applies them to a group.
+
+    Attributes:
+        group: The subscribing group.
+        address: Filesystem path of the Unix domain socket.
+        layer: The layer of the group replaced by full frames and updated by deltas.
+        version: Version of the last applied frame.
+    """
+
+    def __init__(self, group, address: str, layer: str = FILE_LAYER):
+        """
+        Initialize the ConfigSubscriber.
+        :param group: The subscribing group.
+        :param address: Filesystem path of the Unix domain socket.
+        :param layer: The layer of the group the received values are loaded into.
+        """
+        self.group = group
+        self.address = address
+        self.layer = layer
+        self.version = -1
+        self._sock: (socket.socket, None) = None
+        self._thread: (threading.Thread, None) = None
+        self._applied = threading.Condition()
+
+    def start(self):
+        """
+        Connect to the publisher and apply the received frames in a background thread.
+        :return: self.
+        """
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.connect(self.address)
+        self._thread = threading.Thread(target=self._receive_loop, name=f"ConfigSubscriber({self.address})",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def _receive_loop(self):
+        while True:
+            try:
+                frame = read_frame(self._sock)
+            except OSError:
+                frame = None
+            except ValueError as e:
+                # the stream is out of sync after a bad frame, so the connection is dropped
+                logger.error("invalid config frame from %s: %s", self.address, e)
+                frame = None
+            if frame is None:
+                break
+            try:
+                self.apply_frame(*frame)
+            except Exception:
+                logger.exception("failed to apply config frame %s from %s", frame[1], self.address)
+
+    def apply_frame(self, kind: int, version: int, changes: dict, removed: Iterable[str]):
+        """
+        Apply a decoded frame to the group, frames older than the applied version are ignored.
+        :param kind: FRAME_FULL or FRAME_DELTA.
+        :param version: Config version of the frame.
+        :param changes: Changed values keyed by dotted path.
+        :param removed: Removed dotted paths.
+        """
+        if kind == FRAME_FULL:
+            self.group.update_layer(self.layer, changes, replace=True)
+        elif version > self.version:
+            self.group.update_layer(self.layer, changes, removed)
+        else:
+            return
+        with self._applied:
+            self.version = version
+            self._applied.notify_all()
+
+    def wait_for(self, version: int, timeout: float = None) -> bool:
+        """
+        Wait until a version is applied.
+        :param version: Config version.
+        :param timeout: Timeout in seconds.
+        :return: True if the version is applied, False on timeout.
+        """
+        with self._applied:
+            return self._applied.wait_for(lambda: self.version >= version, timeout)
+
+    def close(self):
+        """
+        Disconnect from the publisher.
+        """
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+            self._sock = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,235 @@
+import base64
+import datetime
+import decimal
+import enum
+import pathlib
+import sys
+import uuid
+
+from .config_tree import ConfigTree
+from .utils import *
+
+# Key of the dict replacing an encoded leaf, its value is the encoder name, the encoded value is under VALUE_KEY
+TYPE_MARKER = "__type__"
+VALUE_KEY = "value"
+
+KEEP = "keep"
+DROP = "drop"
+CONTAINER = "container"
+TREE_TAG = "tree"
+
+
+class Encoder:
+    """
+    Encodes the leaves of some types to serializable values and decodes them back.
+
+    Attributes:
+        name: Name written in the encoded leaf, e.g. "datetime".
+        types: Types handled by the encoder, subclasses included.
+        encode: Function returning a serializable value.
+        decode: Function rebuilding the leaf from the encoded value.
+    """
+
+    def __init__(self, name: str, types: Iterable[type], encode: Callable, decode: Callable):
+        """
+        Initialize the Encoder.
+        :param name: Name written in the encoded leaf.
+        :param types: Types handled by the encoder.
+        :param encode: encode(value) -> serializable value.
+        :param decode: decode(encoded value) -> value.
+        """
+        self.name = name
+        self.types = tuple(types)
+        self.encode = encode
+        self.decode = decode
+
+    def __repr__(self):
+        return f"<Encoder {self.name}>"
+
+
+# encoder name -> Encoder
+_encoders: dict = dict()
+# handled type -> Encoder
+_type_encoders: dict = dict()
+# concrete type -> KEEP, DROP, CONTAINER, TREE_TAG or an Encoder, decided on first use
+_decisions: dict = dict()
+
+_KEPT_TYPES = frozenset(json_serializable_objects).difference([dict, list, tuple])
+
+
+def register_encoder(name: str, types: Iterable[type], encode: Callable, decode: Callable) -> Encoder:
+    """
+    Register an encoder, registering the same name again replaces it.
+    :param name: Name written in the encoded leaf.
+    :param types: Types handled by the encoder, subclasses included.
+    :param encode: encode(value) -> serializable value.
+    :param decode: decode(encoded value) -> value.
+    :return: Encoder.
+    """
+    encoder = Encoder(name, types, encode, decode)
+    previous = _encoders.pop(name, None)
+    if previous is not None:
+        for t in previous.types:
+            if _type_encoders.get(t) is previous:
+                del _type_encoders[t]
+    _encoders[name] = encoder
+    for t in encoder.types:
+        _type_encoders[t] = encoder
+    _decisions.clear()
+    return encoder
+
+
+def unregister_encoder(name: str) -> (Encoder, None):
+    """
+    Unregister an encoder.
+    :param name: Name of the encoder.
+    :return: The removed Encoder, None if there was none.
+    """
+    encoder = _encoders.pop(name, None)
+    if encoder is not None:
+        for t in encoder.types:
+            if _type_encoders.get(t) is encoder:
+                del _type_encoders[t]
+        _decisions.clear()
+    return encoder
+
+
+def get_action(value_type: type):
+    """
+    Get what to do with the leaves of a type, the decision is cached per concrete type.
+    Encoders take precedence over the plain serializable types, so e.g. an IntEnum is encoded, not kept as an int.
+    :param value_type: Type of a leaf.
+    :return: KEEP, DROP, CONTAINER, TREE_TAG or an Encoder.
+    """
+    action = _decisions.get(value_type)
+    if action is not None:
+        return action
+    mro = value_type.__mro__
+    if issubclass(value_type, ConfigTree):
+        action = TREE_TAG
+    else:
+        action = next((_type_encoders[t] for t in mro if t in _type_encoders), None)
+        if action is None:
+            if any(t in _KEPT_TYPES for t in mro):
+                action = KEEP
+            elif issubclass(value_type, (dict, list, tuple)):
+                action = CONTAINER
+            else:
+                action = DROP
+    _decisions[value_type] = action
+    return action
+
+
+def encode_value(value):
+    """
+    Encode a leaf value.
+    :param value: Leaf value.
+    :return: Serializable value, or DROP if the value is not serializable.
+    """
+    action = _decisions.get(type(value)) or get_action(type(value))
+    if action is KEEP:
+        return value
+    if action is DROP:
+        return DROP
+    if action is CONTAINER or action is TREE_TAG:
+        if isinstance(value, dict):
+            items = ((k, encode_value(v)) for k, v in value.items())
+            return {k: v for k, v in items if v is not DROP}
+        items = [item for item in map(encode_value, value) if item is not DROP]
+        return tuple(items) if isinstance(value, tuple) else items
+    return {TYPE_MARKER: action.name, VALUE_KEY: action.encode(value)}
+
+
+def encode_tree(tree: ConfigTree) -> ConfigTree:
+    """
+    Encode the leaves of a tree for serialization, leaves without encoder that are not serializable are dropped.
+    :param tree: ConfigTree.
+    :return: A new ConfigTree instance.
+    """
+    result = ConfigTree(group=tree.group)
+    for k, v in tree.items():
+        if (_decisions.get(type(v)) or get_action(type(v))) is TREE_TAG:
+            result[k] = encode_tree(v)
+            continue
+        v = encode_value(v)
+        if v is not DROP:
+            result[k] = v
+    return result
+
+
+def decode_value(value):
+    """
+    Decode a loaded value, encoded leaves are rebuilt, other values are returned as is.
+    :param value: Loaded value.
+    :return: Decoded value.
+    """
+    if isinstance(value, dict):
+        if len(value) == 2 and VALUE_KEY in value and value.get(TYPE_MARKER) in _encoders:
+            return _encoders[value[TYPE_MARKER]].decode(value[VALUE_KEY])
+        return decode_data(value)
+    if isinstance(value, list):
+        return [decode_value(item) for item in value]
+    return value
+
+
+def decode_data(data: dict) -> dict:
+    """
+    Decode the encoded leaves of a loaded config dict in place.
+    :param data: Loaded config dict.
+    :return: data.
+    """
+    for k, v in data.items():
+        if isinstance(v, (dict, list)):
+            data[k] = decode_value(v)
+    return data
+
+
+def _encode_enum(member: enum.Enum) -> list:
+    cls = type(member)
+    return [cls.__module__, cls.__qualname__, member.name]
+
+
+def _decode_enum(encoded: list) -> enum.Enum:
+    # only modules already imported are looked up, loading a config never imports code
+    module_name, qualname, name = encoded
+    obj = sys.modules.get(module_name)
+    if obj is None:
+        raise ValueError(f"the module {module_name} of the enum {qualname} is not imported")
+    for attr_name in qualname.split("."):
+        obj = getattr(obj, attr_name)
+    return obj[name]
+
+
+def _encode_items(items: Iterable) -> list:
+    # the items of tuples and sets are encoded like leaves, so e.g. a set of tuples is rebuilt hashable
+    return [item for item in map(encode_value, items) if item is not DROP]
+
+
+def _encode_bytes(value) -> str:
+    return base64.b64encode(value).decode("ascii")
+
+
+def _decode_timedelta(encoded) -> datetime.timedelta:
+    # a number of seconds is still accepted, files written before the exact encoding use it
+    if isinstance(encoded, (int, float)):
+        return datetime.timedelta(seconds=encoded)
+    days, seconds, microseconds = encoded
+    return datetime.timedelta(days=days, seconds=seconds, microseconds=microseconds)
+
+
+register_encoder("datetime", [datetime.datetime], datetime.datetime.isoformat, datetime.datetime.fromisoformat)
+register_encoder("date", [datetime.date], datetime.date.isoformat, datetime.date.fromisoformat)
+register_encoder("time", [datetime.time], datetime.time.isoformat, datetime.time.fromisoformat)
+register_encoder("timedelta", [datetime.timedelta], lambda value: [value.days, value.seconds, value.microseconds],
+                 _decode_timedelta)
+register_encoder("decimal", [decimal.Decimal], str, decimal.Decimal)
+register_encoder("path", [pathlib.PurePath], str, pathlib.Path)
+register_encoder("uuid", [uuid.UUID], str, uuid.UUID)
+register_encoder("enum", [enum.Enum], _encode_enum, _decode_enum)
+register_encoder("tuple", [tuple], _encode_items, lambda encoded: tuple(map(decode_value, encoded)))
+register_encoder("set", [set], lambda value: _encode_items(sorted(value, key=repr)),
+                 lambda encoded: set(map(decode_value, encoded)))
+register_encoder("frozenset", [frozenset], lambda value: _encode_items(sorted(value, key=repr)),
+                 lambda encoded: frozenset(map(decode_value, encoded)))
+register_encoder("bytes", [bytes], _encode_bytes, base64.b64decode)
+register_encoder("bytearray", [bytearray], _encode_bytes, lambda encoded: bytearray(base64.b64decode(encoded)))
@@ -0,0 +1,73 @@
+import json
+import os
+
+from .config_tree import ConfigTree
+from .utils import *
+
+ENV_SEPARATOR = "__"
+
+_TRUE_STRINGS = frozenset(["1", "true", "yes", "on"])
+_FALSE_STRINGS = frozenset(["0", "false", "no", "off", ""])
+
+
+def build_env_index(paths: Iterable[str], prefix: str, separator: str = ENV_SEPARATOR) -> dict:
+    """
+    Build the index from environment variable name to dotted config path,
+    e.g. "MYAPP__DB__POOL__SIZE" for "Db.Pool.size" with prefix "MYAPP".
+    :param paths: Dotted config paths that can be overridden.
+    :param prefix: Prefix of the environment variables, an empty prefix means no prefix.
+    :param separator: Separator between the prefix and the path nodes.
+    :return: dict mapping environment variable name to dotted config path.
+    """
+    head = [prefix] if prefix else []
+    index = dict()
+    for path in paths:
+        index.setdefault(separator.join(head + [name.upper() for name in ConfigTree.config_path_split(path)]), path)
+    return index
+
+
+def collect_env(index: dict, environ: dict = None) -> dict:
+    """
+    Collect the raw values of the indexed environment variables.
+    Iterates over the smaller one of the index and the environment, so it stays one dict lookup per item.
+    :param index: dict returned by build_env_index.
+    :param environ: Environment variables, default is os.environ.
+    :return: dict mapping dotted config path to raw string value.
+    """
+    if environ is None:
+        environ = os.environ
+    if len(index) <= len(environ):
+        return {path: environ[key] for key, path in index.items() if key in environ}
+    return {index[key]: value for key, value in environ.items() if key in index}
+
+
+def coerce_env_value(raw: str, default):
+    """
+    Coerce a raw environment variable value to the type of the default value.
+    :param raw: Raw string value.
+    :param default: Default value of the path.
+    :return: Coerced value.
+    """
+    if isinstance(default, bool):
+        lowered = raw.strip().lower()
+        if lowered in _TRUE_STRINGS:
+            return True
+        if lowered in _FALSE_STRINGS:
+            return False
+        raise ValueError(f"invalid boolean value: {raw!r}")
+    if isinstance(default, str):
+        return raw
+    if isinstance(default, (int, float)):
+        return type(default)(raw)
+    if isinstance(default, (list, tuple, dict)):
+        value = json.loads(raw)
+        expected = dict if isinstance(default, dict) else list
+        if not isinstance(value, expected):
+            raise TypeError(f"expected {expected.__name__}, got {type(value).__name__}: {raw!r}")
+        return tuple(value) if isinstance(default, tuple) else value
+    if default is None:
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return raw
+    return type(default)(raw)
@@ -0,0 +1,119 @@
+import fnmatch
+import functools
+import re
+
+from .utils import *
+
+# Prefix of the patterns that are regular expressions rather than globs, e.g. "re:db_\d+"
+REGEX_PREFIX = "re:"
+
+_GLOB_CHARS = frozenset("*?[")
+
+
+def is_pattern(name: str) -> bool:
+    """
+    Check if a rule is a pattern rather than an exact attribute name.
+    :param name: Rule.
+    :return: True for a glob or a regular expression.
+    """
+    return name.startswith(REGEX_PREFIX) or not _GLOB_CHARS.isdisjoint(name)
+
+
+class AttrRule:
+    """
+    A compiled set of attribute name rules: exact names, globs like "*_cache" and regular expressions like "re:db_\\d+".
+
+    Exact names are looked up in a frozenset, all the patterns are combined into one regular expression.
+
+    Attributes:
+        names: A frozenset of the exact names.
+        regex: The combined regular expression of the patterns, None if there is no pattern.
+    """
+
+    def __init__(self, rules: Iterable[str] = ()):
+        """
+        Compile the rules.
+        :param rules: Exact names and patterns.
+        """
+        names, patterns = set(), []
+        for rule in rules:
+            if not is_pattern(rule):
+                names.add(rule)
+            elif rule.startswith(REGEX_PREFIX):
+                patterns.append(f"(?:{rule[len(REGEX_PREFIX):]})")
+            else:
+                patterns.append(f"(?:{fnmatch.translate(rule)})")
+        self.names: frozenset = frozenset(names)
+        self.regex = re.compile("|".join(patterns)) if patterns else None
+
+    def __bool__(self) -> bool:
+        return bool(self.names) or self.regex is not None
+
+    def matches(self, name: str) -> bool:
+        """
+        Check if a name matches one of the rules.
+        :param name: Attribute name.
+        :return: bool.
+        """
+        return name in self.names or (self.regex is not None and self.regex.fullmatch(name) is not None)
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_rules(rules: tuple) -> AttrRule:
+    """
+    Compile rules, the same rules are compiled once.
+    :param rules: tuple of exact names and patterns.
+    :return: AttrRule.
+    """
+    return AttrRule(rules)
+
+
+class AttrFilter:
+    """
+    Include and exclude rules of attribute names.
+
+    Attributes:
+        include: AttrRule a name must match, None to include every name.
+        exclude: AttrRule a name must not match.
+    """
+
+    def __init__(self, include: Iterable[str] = None, exclude: Iterable[str] = ()):
+        """
+        Initialize the AttrFilter.
+        :param include: Names and patterns of the included attributes, None to include every attribute.
+        :param exclude: Names and patterns of the excluded attributes.
+        """
+        self.include = None if include is None else compile_rules(tuple(include))
+        self.exclude = compile_rules(tuple(exclude))
+
+    def __call__(self, name: str) -> bool:
+        """
+        Check if an attribute name passes the filter.
+        :param name: Attribute name.
+        :return: bool.
+        """
+        return (self.include is None or self.include.matches(name)) and not self.exclude.matches(name)
+
+
+def class_attr_names(cls: type, attr_filter: AttrFilter = None, attr_exclude: Callable = None) -> list:
+    """
+    Get the configured attribute names of a class.
+    The class level "__config_include__" and "__config_exclude__" rules are applied first, then the group level ones.
+    An "__config_include__" of exact names only is used as is, in its order, like before patterns were supported.
+    :param cls: Class.
+    :param attr_filter: Group level AttrFilter.
+    :param attr_exclude: Function excluding a name if it returns True, e.g. Group.attr_exclude.
+    :return: list of attribute names.
+    """
+    include = getattr(cls, "__config_include__", None)
+    if include is None:
+        names = dir(cls)
+    elif any(is_pattern(rule) for rule in include):
+        rule = compile_rules(tuple(include))
+        names = [name for name in dir(cls) if rule.matches(name)]
+    else:
+        names = list(include)
+    exclude = compile_rules(tuple(getattr(cls, "__config_exclude__", ())))
+    return [name for name in names if not exclude.matches(name)
+            and not (attr_exclude is not None and attr_exclude(name))
+            and (attr_filter is None or attr_filter(name))]
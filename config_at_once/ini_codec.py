@@ -0,0 +1,101 @@
+import json
+
+from .config_tree import ConfigTree
+from .utils import *
+
+# Section of the values at the top level of the tree
+ROOT_SECTION = "__root__"
+
+_JSON_START = frozenset('"-0123456789[{tfn')
+
+
+def _looks_like_json(value: str) -> bool:
+    if not value or value[0] not in _JSON_START:
+        return False
+    try:
+        json.loads(value)
+    except ValueError:
+        return False
+    return True
+
+
+def encode_value(value) -> str:
+    """
+    Encode a value for an INI file. Plain strings are written as is,
+    everything else, and strings that would read back as another type, is written as JSON.
+    :param value: Leaf value.
+    :return: str.
+    """
+    if isinstance(value, str) and value == value.strip() and "\n" not in value and not _looks_like_json(value):
+        return value
+    return json.dumps(value)
+
+
+def decode_value(value: str):
+    """
+    Decode a value written by encode_value.
+    :param value: Stripped raw value.
+    :return: Decoded value.
+    """
+    if value and value[0] in _JSON_START:
+        try:
+            return json.loads(value)
+        except ValueError:
+            pass
+    return value
+
+
+def iter_lines(data: dict, section: str = None) -> Iterable[str]:
+    """
+    Generate the lines of an INI file, nested dicts become dotted section names.
+    :param data: Config dict.
+    :param section: Dotted section name of data, None for the top level.
+    :return: Iterable of lines.
+    """
+    leaves = [(k, v) for k, v in data.items() if not isinstance(v, dict)]
+    if leaves or (not data and section is not None):
+        yield f"[{ROOT_SECTION if section is None else section}]\n"
+        for key, value in leaves:
+            if any(c in key for c in "=:\n") or key.startswith("["):
+                raise ValueError(f"invalid ini key: {key!r}")
+            yield f"{key} = {encode_value(value)}\n"
+        yield "\n"
+    for key, value in data.items():
+        if isinstance(value, dict):
+            yield from iter_lines(value, key if section is None else ConfigTree.config_path_join(section, key))
+
+
+def dump(data: dict, f):
+    """
+    Stream a config dict to a text file in INI format.
+    :param data: Config dict.
+    :param f: Text file object.
+    """
+    f.writelines(iter_lines(data))
+
+
+def load(f) -> dict:
+    """
+    Read an INI file written by dump, rebuilding the nesting from the dotted section names in one pass.
+    :param f: Text file object.
+    :return: dict.
+    """
+    root = dict()
+    current = root
+    for line in f:
+        stripped = line.strip()
+        if not stripped or stripped[0] in "#;":
+            continue
+        if stripped[0] == "[" and stripped[-1] == "]":
+            section = stripped[1:-1].strip()
+            current = root
+            if section != ROOT_SECTION:
+                for name in ConfigTree.config_path_split(section):
+                    current = current.setdefault(name, dict())
+            continue
+        separators = [i for i in (stripped.find("="), stripped.find(":")) if i > 0]
+        if not separators:
+            raise ValueError(f"invalid ini line: {line!r}")
+        i = min(separators)
+        current[stripped[:i].strip()] = decode_value(stripped[i + 1:].strip())
+    return root
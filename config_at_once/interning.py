@@ -0,0 +1,103 @@
+import sys
+import weakref
+
+from .config_tree import ConfigTree
+from .snapshot import FrozenConfigTree
+from .utils import *
+
+
+def value_key(value):
+    """
+    Get a key that is equal only for interchangeable values: same types, element by element, and floats compared
+    by repr, so e.g. (1, 0) and (True, False), or 0.0 and -0.0, are not deduplicated.
+    :param value: Leaf value.
+    :return: Hashable key, None if the value is not hashable.
+    """
+    value_type = type(value)
+    if value_type is float or value_type is complex:
+        return value_type, repr(value)
+    if value_type is tuple or value_type is frozenset:
+        keys = [value_key(item) for item in value]
+        if None in keys:
+            return None
+        return value_type, tuple(keys) if value_type is tuple else frozenset(keys)
+    try:
+        hash(value)
+    except TypeError:
+        return None
+    return value_type, value
+
+
+class Interner:
+    """
+    Hash-conses config trees: structurally identical immutable subtrees become one shared FrozenConfigTree,
+    and identical leaf values become one object.
+
+    Shared subtrees are kept in a weak-value table, so they are dropped once no tree uses them.
+    Leaf values are only deduplicated within one intern_tree call, strings are interned with sys.intern.
+    Mutating a shared subtree through ConfigTree.set_by_path copies the nodes along the path first.
+    """
+
+    def __init__(self):
+        self._subtrees = weakref.WeakValueDictionary()
+        self._values: dict = dict()
+
+    def __len__(self) -> int:
+        return len(self._subtrees)
+
+    def intern_value(self, value):
+        """
+        Get the canonical object of a leaf value.
+        :param value: Leaf value.
+        :return: An equal value, shared with the previous equal values.
+        """
+        value_type = type(value)
+        if value_type is str:
+            return sys.intern(value)
+        if value_type is tuple:
+            value = tuple(self.intern_value(item) for item in value)
+        key = value_key(value)
+        if key is None:
+            return value
+        return self._values.setdefault(key, value)
+
+    def _key(self, value):
+        if isinstance(value, FrozenConfigTree):
+            return FrozenConfigTree, id(value)
+        return value_key(value)
+
+    def _intern_node(self, tree: ConfigTree, group) -> ConfigTree:
+        items = []
+        internable = True
+        for k, v in tree.items():
+            if isinstance(v, ConfigTree):
+                v = self._intern_node(v, group)
+            else:
+                v = self.intern_value(v)
+            items.append((self.intern_value(k), v))
+            internable = internable and self._key(v) is not None
+        if not internable:
+            return ConfigTree(dict(items), group=group)
+        key = tuple((value_key(k), self._key(v)) for k, v in items)
+        subtree = self._subtrees.get(key)
+        if subtree is None:
+            subtree = FrozenConfigTree(dict(items), group=group)
+            self._subtrees[key] = subtree
+        return subtree
+
+    def intern_tree(self, tree: ConfigTree, group=None) -> ConfigTree:
+        """
+        Deduplicate the subtrees and leaf values of a tree, the root stays a mutable ConfigTree.
+        :param tree: ConfigTree to intern.
+        :param group: Group of the interned tree, default is the group of tree.
+        :return: A new ConfigTree instance.
+        """
+        if group is None:
+            group = tree.group
+        try:
+            interned = self._intern_node(tree, group)
+        finally:
+            self._values.clear()
+        if isinstance(interned, FrozenConfigTree):
+            interned = ConfigTree(interned, group=group)
+        return interned
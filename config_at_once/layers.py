@@ -0,0 +1,182 @@
+from .config_tree import ConfigTree
+from .utils import *
+
+_MISSING = object()
+_ABSENT = object()
+
+DEFAULTS_LAYER = "defaults"
+FILE_LAYER = "file"
+ENV_LAYER = "env"
+OVERRIDES_LAYER = "overrides"
+
+# Ordered from the lowest to the highest priority
+LAYERS = [DEFAULTS_LAYER, FILE_LAYER, ENV_LAYER, OVERRIDES_LAYER]
+
+
+class LayeredConfig:
+    """
+    A stack of configuration layers, a value in a later layer overrides the same path in earlier layers.
+
+    Every layer is stored flat, keyed by dotted config path, so a lookup is a dict access per layer.
+    Resolved values are memoized per path, and changing a layer only invalidates the paths it touches.
+
+    Attributes:
+        layer_names: Names of the layers, ordered from the lowest to the highest priority.
+        layers: A dict mapping layer name to its flat values.
+        revisions: A dict mapping layer name to a counter incremented on every change of the layer.
+        group: An optional attribute representing the group associated with the layers.
+    """
+
+    def __init__(self, layer_names: Iterable[str] = None, group=None):
+        """
+        Initialize the LayeredConfig.
+        :param layer_names: Names of the layers, ordered from the lowest to the highest priority.
+        :param group: The group associated with the layers.
+        """
+        if layer_names is None:
+            layer_names = LAYERS
+        self.layer_names: list = list(layer_names)
+        self.layers: dict = {name: dict() for name in self.layer_names}
+        self.revisions: dict = {name: 0 for name in self.layer_names}
+        self.group = group
+        self._resolved: dict = dict()
+
+    def _get_layer(self, name: str) -> dict:
+        try:
+            return self.layers[name]
+        except KeyError:
+            raise ValueError(f"unknown layer: {name}")
+
+    def revision(self, name: str) -> int:
+        """
+        Get the revision of a layer, it changes whenever a value of the layer is set or removed.
+        :param name: Layer name.
+        :return: int.
+        """
+        self._get_layer(name)
+        return self.revisions[name]
+
+    def resolve(self, path: str, default=_MISSING):
+        """
+        Resolve the value of a path from the highest layer that contains it.
+        :param path: Dotted config path.
+        :param default: Returned if no layer contains the path, if not given, raise KeyError.
+        :return: Resolved value.
+        """
+        value = self._resolved.get(path, _MISSING)
+        if value is _MISSING:
+            for name in reversed(self.layer_names):
+                value = self.layers[name].get(path, _MISSING)
+                if value is not _MISSING:
+                    self._resolved[path] = value
+                    break
+            else:
+                if default is _MISSING:
+                    raise KeyError(path)
+                return default
+        return value
+
+    def source(self, path: str) -> (str, None):
+        """
+        Get the name of the layer the path is resolved from.
+        :param path: Dotted config path.
+        :return: Layer name or None.
+        """
+        for name in reversed(self.layer_names):
+            if path in self.layers[name]:
+                return name
+        return None
+
+    def __contains__(self, path: str) -> bool:
+        return self.resolve(path, _ABSENT) is not _ABSENT
+
+    def paths(self) -> list:
+        """
+        Get all paths, in the order they first appear from the lowest layer up.
+        :return: list of dotted config paths.
+        """
+        paths = dict()
+        for name in self.layer_names:
+            paths.update(dict.fromkeys(self.layers[name]))
+        return list(paths)
+
+    def tree(self, group=None) -> ConfigTree:
+        """
+        Build the resolved ConfigTree of all layers.
+        :param group: Group of the built ConfigTree, default is the group of the layers.
+        :return: A new ConfigTree instance.
+        """
+        if group is None:
+            group = self.group
+        return ConfigTree.from_flat({path: self.resolve(path) for path in self.paths()}, group=group)
+
+    def _change(self, name: str, values: dict, removed: Iterable[str] = ()) -> set:
+        layer = self._get_layer(name)
+        touched = [path for path in values if values_differ(layer.get(path, _ABSENT), values[path])]
+        touched.extend(path for path in removed if path in layer)
+        before = {path: self.resolve(path, _ABSENT) for path in touched}
+        if touched:
+            self.revisions[name] += 1
+        for path in removed:
+            layer.pop(path, None)
+        layer.update(values)
+        changed = set()
+        for path in touched:
+            self._resolved.pop(path, None)
+            if values_differ(before[path], self.resolve(path, _ABSENT)):
+                changed.add(path)
+        return changed
+
+    def set_layer(self, name: str, values: dict) -> set:
+        """
+        Replace the whole content of a layer.
+        :param name: Layer name.
+        :param values: A ConfigTree, or a dict of values keyed by dotted path.
+        :return: set of paths whose resolved value changed.
+        """
+        if isinstance(values, ConfigTree):
+            values = values.flatten()
+        removed = [path for path in self._get_layer(name) if path not in values]
+        return self._change(name, values, removed)
+
+    def update_layer(self, name: str, values: dict) -> set:
+        """
+        Update some values of a layer, other values of the layer are kept.
+        :param name: Layer name.
+        :param values: A ConfigTree, or a dict of values keyed by dotted path.
+        :return: set of paths whose resolved value changed.
+        """
+        if isinstance(values, ConfigTree):
+            values = values.flatten()
+        return self._change(name, values)
+
+    def remove_from_layer(self, name: str, paths: Iterable[str]) -> set:
+        """
+        Remove paths from a layer, they fall back to the lower layers.
+        :param name: Layer name.
+        :param paths: Dotted config paths to remove.
+        :return: set of paths whose resolved value changed.
+        """
+        return self._change(name, dict(), list(paths))
+
+    def clear_layer(self, name: str) -> set:
+        """
+        Remove every value of a layer.
+        :param name: Layer name.
+        :return: set of paths whose resolved value changed.
+        """
+        return self._change(name, dict(), list(self._get_layer(name)))
+
+    def remove_subtree(self, path: str) -> set:
+        """
+        Remove a path and every path below it from all layers.
+        :param path: Dotted config path.
+        :return: set of paths whose resolved value changed.
+        """
+        prefix = path + "."
+        changed = set()
+        for name in self.layer_names:
+            removed = [p for p in self.layers[name] if p == path or p.startswith(prefix)]
+            if removed:
+                changed.update(self._change(name, dict(), removed))
+        return changed
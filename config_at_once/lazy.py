@@ -0,0 +1,97 @@
+import threading
+import weakref
+
+from .utils import *
+
+_MISSING = object()
+
+
+class PendingValue:
+    """
+    A non-data descriptor holding a value not applied yet to a class attribute.
+    The first read applies every pending value of the class, which replaces the descriptors by plain attributes.
+    """
+    __slots__ = ("pending", "name", "value")
+
+    def __init__(self, pending, name: str, value):
+        self.pending = pending
+        self.name = name
+        self.value = value
+
+    def __get__(self, obj, objtype=None):
+        self.pending.apply()
+        return self.value
+
+
+class PendingClass:
+    """
+    The values of a class deferred by a lazy load, applied all at once on the first read of one of them.
+
+    Attributes:
+        cls: The configured class, only weakly referenced, None once it is collected.
+        values: A dict mapping attribute name to its PendingValue.
+    """
+
+    def __init__(self, cls: type, on_applied: Callable = None):
+        """
+        Initialize the PendingClass.
+        :param cls: The configured class.
+        :param on_applied: Called with the PendingClass once applied.
+        """
+        self._cls_ref = weakref.ref(cls)
+        self.values: dict = dict()
+        self.on_applied = on_applied
+        self._lock = threading.Lock()
+
+    @property
+    def cls(self) -> (type, None):
+        return self._cls_ref()
+
+    def defer(self, name: str, value):
+        """
+        Defer the assignment of a class attribute.
+        :param name: Attribute name.
+        :param value: The value to apply.
+        """
+        cls = self.cls
+        if cls is None:
+            return
+        with self._lock:
+            pending_value = self.values.get(name)
+            if pending_value is not None and cls.__dict__.get(name) is pending_value:
+                pending_value.value = value
+                return
+            pending_value = PendingValue(self, name, value)
+            self.values[name] = pending_value
+            type.__setattr__(cls, name, pending_value)
+
+    def apply(self):
+        """
+        Apply the pending values, values assigned meanwhile are kept.
+        """
+        cls = self.cls
+        with self._lock:
+            values, self.values = self.values, dict()
+            for name, pending_value in values.items():
+                if cls is not None and cls.__dict__.get(name) is pending_value:
+                    type.__setattr__(cls, name, pending_value.value)
+        if values and self.on_applied is not None:
+            self.on_applied(self)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def can_defer(obj, name: str) -> bool:
+    """
+    Check if an attribute can be deferred: a plain or pending class attribute, not a descriptor.
+    :param obj: Owner of the attribute.
+    :param name: Attribute name.
+    :return: bool.
+    """
+    if not isinstance(obj, type):
+        return False
+    current = obj.__dict__.get(name, _MISSING)
+    if current is _MISSING:
+        return False
+    return isinstance(current, PendingValue) or not hasattr(type(current), "__get__")
@@ -0,0 +1,121 @@
+import gc
+import sys
+import tracemalloc
+
+from .config_tree import ConfigTree
+from .utils import *
+
+_CONTAINERS = (list, tuple, set, frozenset)
+# objects owned by the program rather than by the config, never walked into
+_NOT_WALKED = (type, type(sys), type(len), type(lambda: None))
+
+
+def deep_sizeof(obj, seen: set = None, include: Callable = None) -> int:
+    """
+    Get the deep size of an object: the object and everything it references through containers and __dict__.
+    :param obj: Object.
+    :param seen: ids of the objects already counted, shared objects are counted once.
+    :param include: If given, only the objects for which include(obj) is True are counted, their contents still are.
+    :return: Size in bytes.
+    """
+    if seen is None:
+        seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        if include is None or include(obj):
+            size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, _CONTAINERS):
+            stack.extend(obj)
+        elif not isinstance(obj, _NOT_WALKED) and isinstance(getattr(obj, "__dict__", None), dict):
+            stack.append(obj.__dict__)
+    return size
+
+
+def subtree_sizes(tree: ConfigTree, include: Callable = None) -> dict:
+    """
+    Get the retained size of every subtree and leaf of a tree.
+    An object shared by several paths is only counted for the first path, in tree order.
+    :param tree: ConfigTree.
+    :param include: If given, only the objects for which include(obj) is True are counted.
+    :return: dict mapping dotted path to size in bytes, the root has the empty path.
+    """
+    sizes = dict()
+    _subtree_sizes(tree, "", set(), sizes, include)
+    return sizes
+
+
+def _subtree_sizes(tree: ConfigTree, prefix: str, seen: set, sizes: dict, include: Callable) -> int:
+    seen.add(id(tree))
+    size = sys.getsizeof(tree) if include is None or include(tree) else 0
+    for k, v in tree.items():
+        size += deep_sizeof(k, seen, include)
+        path = ConfigTree.config_path_join(prefix, k) if prefix else k
+        if isinstance(v, ConfigTree) and id(v) not in seen:
+            size += _subtree_sizes(v, path, seen, sizes, include)
+        else:
+            sizes[path] = deep_sizeof(v, seen, include)
+            size += sizes[path]
+    sizes[prefix] = size
+    return size
+
+
+def _report(sizes: dict, top: int) -> dict:
+    total = sizes.pop("", 0)
+    return {"total": total, "top": sorted(sizes.items(), key=lambda item: -item[1])[:top]}
+
+
+def memory_report(tree: ConfigTree, top: int = 10) -> dict:
+    """
+    Report the heaviest paths of a tree.
+    :param tree: ConfigTree.
+    :param top: Number of paths.
+    :return: {"total": size of the tree, "top": list of (path, size) by decreasing size}.
+    """
+    return _report(subtree_sizes(tree), top)
+
+
+def _existing_objects() -> dict:
+    # every gc tracked object and everything it references, kept alive so their ids are not reused during the load
+    objects = gc.get_objects()
+    existing = {id(obj): obj for obj in gc.get_referents(*objects)}
+    existing.update((id(obj), obj) for obj in objects)
+    return existing
+
+
+def allocation_report(load: Callable[[], ConfigTree], top: int = 10) -> dict:
+    """
+    Report the memory allocated by a load to each path of the loaded tree, using tracemalloc.
+    Only the objects allocated during the load are counted, e.g. interned strings and small ints are not.
+    If tracemalloc is already tracing, the objects existing before the load are found by walking the gc tracked
+    objects first, which is slow on large heaps.
+    :param load: Function returning the loaded tree, e.g. lambda: group.load_config(config_dict, root).
+    :param top: Number of paths.
+    :return: {"total": allocated size of the tree, "top": list of (path, size) by decreasing size}.
+    """
+    started = not tracemalloc.is_tracing()
+    existing = None
+    if started:
+        tracemalloc.start()
+    else:
+        existing = _existing_objects()
+    try:
+        tree = load()
+        if existing is None:
+            def include(obj) -> bool:
+                return tracemalloc.get_object_traceback(obj) is not None
+        else:
+            def include(obj) -> bool:
+                return id(obj) not in existing and tracemalloc.get_object_traceback(obj) is not None
+        return _report(subtree_sizes(tree, include), top)
+    finally:
+        existing = None
+        if started:
+            tracemalloc.stop()
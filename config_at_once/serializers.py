@@ -0,0 +1,368 @@
+import importlib
+import io
+import os.path
+
+from .config_tree import ConfigTree
+from .utils import *
+
+
+class Codec:
+    """
+    A serialization backend of a config file format.
+
+    Attributes:
+        name: Name of the backend, e.g. "orjson".
+        load: Function reading a file object, load(fp) -> dict, None if the backend can only write.
+        dump: Function writing a file object, dump(data, fp), None if the backend can only read.
+        binary: If True, the file object is opened in binary mode, else in text mode.
+    """
+
+    def __init__(self, name: str, load: Callable = None, dump: Callable = None, binary: bool = False):
+        """
+        Initialize the Codec.
+        :param name: Name of the backend.
+        :param load: load(fp) -> dict.
+        :param dump: dump(data, fp).
+        :param binary: If True, the file object is opened in binary mode.
+        """
+        self.name = name
+        self.load = load
+        self.dump = dump
+        self.binary = binary
+
+    def __repr__(self):
+        return f"<Codec {self.name}>"
+
+
+# format name -> list of (priority, backend name, factory), factories return a Codec or raise ImportError
+_backends: dict = dict()
+# filename extension -> format name
+_extensions: dict = dict()
+# (format name, "load" or "dump") -> Codec, resolved on first use
+_resolved: dict = dict()
+# (format name, backend name) -> Codec or the ImportError raised by its factory
+_created: dict = dict()
+# compression extension -> factory returning open(path, binary mode) of a compressed file object
+_compressions: dict = dict()
+
+
+def import_module(name: str):
+    """
+    Import a backend module, failures are reported as ImportError in the style of the Group save and load methods.
+    :param name: Module name.
+    :return: Module.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        raise ImportError(f"The module {name} is not installed")
+
+
+def register_format(name: str, extensions: Iterable[str]):
+    """
+    Register a config file format.
+    :param name: Format name, e.g. "json".
+    :param extensions: Filename extensions of the format, e.g. [".json"].
+    """
+    _backends.setdefault(name, [])
+    for extension in extensions:
+        _extensions[extension.lower()] = name
+
+
+def unregister_format(name: str):
+    """
+    Unregister a config file format, its extensions and its backends.
+    :param name: Format name.
+    """
+    _backends.pop(name, None)
+    for extension in [extension for extension, format_name in _extensions.items() if format_name == name]:
+        del _extensions[extension]
+    for cache in (_resolved, _created):
+        for key in [key for key in cache if key[0] == name]:
+            del cache[key]
+
+
+def register_backend(format_name: str, backend_name: str, factory: Callable[[], Codec], priority: int = 0):
+    """
+    Register a backend of a format, the available backend with the highest priority is used.
+    The factory is only called when the format is first used, so the backend module is imported lazily and once.
+    :param format_name: Format name.
+    :param backend_name: Backend name, registering the same name again replaces the backend.
+    :param factory: Function returning a Codec, raise ImportError if the backend is not available.
+    :param priority: Priority of the backend.
+    """
+    if format_name not in _backends:
+        raise ValueError(f"unknown format: {format_name}")
+    backends = [backend for backend in _backends[format_name] if backend[1] != backend_name]
+    backends.append((priority, backend_name, factory))
+    backends.sort(key=lambda backend: -backend[0])
+    _backends[format_name] = backends
+    _created.pop((format_name, backend_name), None)
+    for key in [(format_name, "load"), (format_name, "dump")]:
+        _resolved.pop(key, None)
+
+
+def register_compression(extension: str, factory: Callable[[], Callable]):
+    """
+    Register a compression of config files, e.g. ".gz" so "config.json.gz" is gzip compressed JSON.
+    :param extension: Filename extension of the compression.
+    :param factory: Function returning open(path, mode) for binary modes, raise ImportError if not available,
+        only called when a compressed file is first opened.
+    """
+    _compressions[extension.lower()] = factory
+
+
+def split_compression(path: str) -> tuple:
+    """
+    Split the compression extension of a file path.
+    :param path: File path.
+    :return: (path without the compression extension, compression extension or None).
+    """
+    stem, filename_extension = os.path.splitext(path)
+    if filename_extension.lower() in _compressions:
+        return stem, filename_extension.lower()
+    return path, None
+
+
+def get_format(path: str) -> str:
+    """
+    Get the format of a file by its extension, a compression extension is skipped, e.g. "json" for "a.json.gz".
+    :param path: File path.
+    :return: Format name.
+    """
+    filename_extension = os.path.splitext(split_compression(path)[0])[1]
+    try:
+        return _extensions[filename_extension.lower()]
+    except KeyError:
+        raise ValueError(f"Unexpected file extension: {filename_extension}")
+
+
+def open_file(path: str, mode: str = "r"):
+    """
+    Open a config file, compressed files are decompressed or compressed on the fly while streaming.
+    :param path: File path.
+    :param mode: "r", "w", "rb" or "wb", text modes use utf-8.
+    :return: File object.
+    """
+    compression = split_compression(path)[1]
+    if compression is None:
+        if "b" in mode:
+            return open(path, mode)
+        return open(path, mode, encoding="utf-8")
+    opener = _created.get(("compression", compression))
+    if opener is None:
+        opener = _created[("compression", compression)] = _compressions[compression]()
+    f = opener(path, mode[0] + "b")
+    if "b" in mode:
+        return f
+    return io.TextIOWrapper(f, encoding="utf-8")
+
+
+def get_codec(format_name: str, operation: str = "load") -> Codec:
+    """
+    Get the fastest available backend of a format.
+    :param format_name: Format name.
+    :param operation: "load" or "dump".
+    :return: Codec.
+    """
+    codec = _resolved.get((format_name, operation))
+    if codec is not None:
+        return codec
+    if format_name not in _backends:
+        raise ValueError(f"unknown format: {format_name}")
+    errors = []
+    for _, backend_name, factory in _backends[format_name]:
+        codec = _created.get((format_name, backend_name))
+        if codec is None:
+            try:
+                codec = factory()
+            except ImportError as e:
+                codec = e
+            _created[(format_name, backend_name)] = codec
+        if isinstance(codec, ImportError):
+            errors.append(str(codec))
+            continue
+        if getattr(codec, operation) is not None:
+            _resolved[(format_name, operation)] = codec
+            return codec
+    raise ImportError(f"no backend available to {operation} {format_name}: {'; '.join(errors)}")
+
+
+def load_file(path: str, format_name: str = None) -> dict:
+    """
+    Load a config file with the fastest available backend.
+    :param path: File path.
+    :param format_name: Format name, default is guessed from the extension.
+    :return: dict.
+    """
+    codec = get_codec(format_name or get_format(path), "load")
+    with open_file(path, "rb" if codec.binary else "r") as f:
+        return codec.load(f)
+
+
+def dump_file(data: dict, path: str, format_name: str = None):
+    """
+    Save a config dict to a file with the fastest available backend.
+    :param data: Config dict.
+    :param path: File path.
+    :param format_name: Format name, default is guessed from the extension.
+    """
+    codec = get_codec(format_name or get_format(path), "dump")
+    # encoded in memory first, so a value that fails to encode leaves the existing file untouched
+    buffer = io.BytesIO() if codec.binary else io.StringIO()
+    codec.dump(data, buffer)
+    with open_file(path, "wb" if codec.binary else "w") as f:
+        f.write(buffer.getvalue())
+
+
+def _orjson_codec() -> Codec:
+    orjson = import_module("orjson")
+    json = import_module("json")
+
+    def dump(data, f):
+        # orjson rejects some data the json module writes, e.g. ints of 64 bits or more, json writes them instead
+        try:
+            encoded = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            encoded = json.dumps(data).encode("utf-8")
+        f.write(encoded)
+
+    return Codec("orjson", lambda f: orjson.loads(f.read()), dump, binary=True)
+
+
+def _ujson_codec() -> Codec:
+    ujson = import_module("ujson")
+    return Codec("ujson", ujson.load, ujson.dump)
+
+
+def _json_codec() -> Codec:
+    json = import_module("json")
+    return Codec("json", json.load, json.dump)
+
+
+def _yaml_codec(c_bindings: bool) -> Callable[[], Codec]:
+    def factory() -> Codec:
+        yaml = import_module("yaml")
+        if c_bindings:
+            if not getattr(yaml, "__with_libyaml__", False):
+                raise ImportError("The module yaml is not built with libyaml")
+            loader, base_dumper = yaml.CSafeLoader, yaml.CSafeDumper
+        else:
+            loader, base_dumper = yaml.SafeLoader, yaml.SafeDumper
+        # a private subclass, so the dumpers of the other PyYAML users are left untouched
+        dumper = type(f"_Config{base_dumper.__name__}", (base_dumper,), dict())
+        dumper.add_multi_representer(ConfigTree, yaml.representer.SafeRepresenter.represent_dict)
+        return Codec("yaml.CSafeLoader" if c_bindings else "yaml.SafeLoader",
+                     lambda f: yaml.load(f, Loader=loader), lambda data, f: yaml.dump(data, f, Dumper=dumper))
+
+    return factory
+
+
+def _tomllib_codec() -> Codec:
+    return Codec("tomllib", import_module("tomllib").load, binary=True)
+
+
+def _tomli_codec() -> Codec:
+    return Codec("tomli", import_module("tomli").load, binary=True)
+
+
+def _tomli_w_codec() -> Codec:
+    return Codec("tomli_w", dump=import_module("tomli_w").dump, binary=True)
+
+
+def _toml_codec() -> Codec:
+    toml = import_module("toml")
+    return Codec("toml", toml.load, toml.dump)
+
+
+def _xml_codec() -> Codec:
+    from . import xml_codec
+    return Codec("xml_codec", xml_codec.load, xml_codec.dump, binary=True)
+
+
+def _xmltodict_codec() -> Codec:
+    xmltodict = import_module("xmltodict")
+    return Codec("xmltodict", xmltodict.parse, lambda data, f: xmltodict.unparse(data, f))
+
+
+def _ini_codec() -> Codec:
+    from . import ini_codec
+    return Codec("ini_codec", ini_codec.load, ini_codec.dump)
+
+
+def _configparser_codec() -> Codec:
+    configparser = import_module("configparser")
+
+    def load(f) -> dict:
+        config = configparser.ConfigParser()
+        config.read_file(f)
+        return {section: dict(config[section]) for section in config.sections()}
+
+    def dump(data, f):
+        config = configparser.ConfigParser()
+        config.read_dict(data)
+        config.write(f)
+
+    return Codec("configparser", load, dump)
+
+
+def _plain(data):
+    if isinstance(data, dict):
+        return {k: _plain(v) for k, v in data.items()}
+    if isinstance(data, list):
+        return [_plain(item) for item in data]
+    return data
+
+
+def _marshal_codec() -> Codec:
+    marshal = import_module("marshal")
+    return Codec("marshal", marshal.load, lambda data, f: marshal.dump(_plain(data), f), binary=True)
+
+
+def _gzip_open() -> Callable:
+    return import_module("gzip").open
+
+
+def _bz2_open() -> Callable:
+    return import_module("bz2").open
+
+
+def _lzma_open() -> Callable:
+    return import_module("lzma").open
+
+
+def _zstd_open() -> Callable:
+    try:
+        return import_module("compression.zstd").open
+    except ImportError:
+        return import_module("zstandard").open
+
+
+register_format("ini", INI_FILENAME_EXTENSIONS)
+register_format("json", JSON_FILENAME_EXTENSIONS)
+register_format("yaml", YAML_FILENAME_EXTENSIONS)
+register_format("toml", TOML_FILENAME_EXTENSIONS)
+register_format("xml", XML_FILENAME_EXTENSIONS)
+# Fast binary snapshots, only readable by the Python version that wrote them and unsafe on untrusted input,
+# no extension is mapped, so they are only read when format_name="marshal" is given explicitly
+register_format("marshal", [])
+
+register_backend("ini", "ini_codec", _ini_codec, priority=10)
+register_backend("ini", "configparser", _configparser_codec)
+register_backend("json", "orjson", _orjson_codec, priority=20)
+register_backend("json", "ujson", _ujson_codec, priority=10)
+register_backend("json", "json", _json_codec)
+register_backend("yaml", "yaml.CSafeLoader", _yaml_codec(c_bindings=True), priority=10)
+register_backend("yaml", "yaml.SafeLoader", _yaml_codec(c_bindings=False))
+register_backend("toml", "tomllib", _tomllib_codec, priority=20)
+register_backend("toml", "tomli", _tomli_codec, priority=15)
+register_backend("toml", "tomli_w", _tomli_w_codec, priority=10)
+register_backend("toml", "toml", _toml_codec)
+register_backend("xml", "xml_codec", _xml_codec, priority=10)
+register_backend("xml", "xmltodict", _xmltodict_codec)
+register_backend("marshal", "marshal", _marshal_codec)
+
+register_compression(".gz", _gzip_open)
+register_compression(".bz2", _bz2_open)
+register_compression(".xz", _lzma_open)
+register_compression(".zst", _zstd_open)
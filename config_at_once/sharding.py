@@ -0,0 +1,212 @@
+import json
+import os
+import threading
+from urllib.parse import quote
+
+from .config_tree import ConfigTree
+from .encoders import encode_tree, decode_data
+from .layers import FILE_LAYER
+from .serializers import load_file, dump_file
+from .utils import *
+
+_MISSING = object()
+
+MANIFEST_NAME = "__manifest__.json"
+MANIFEST_VERSION = 1
+
+
+class _ShardHook:
+    """
+    A descriptor put in place of a class attribute until the shard of the class is loaded.
+    The first read loads the shard, which replaces every hook of the shard by the loaded value.
+    """
+    __slots__ = ("store", "shard", "name", "value")
+
+    def __init__(self, store, shard: str, name: str, value):
+        self.store = store
+        self.shard = shard
+        self.name = name
+        self.value = value
+
+    def __get__(self, obj, objtype=None):
+        self.store.load_shard(self.shard)
+        return getattr(objtype if obj is None else obj, self.name)
+
+
+class ShardedStore:
+    """
+    Stores the config of a group in a directory, one file per top-level key of the tree plus a small manifest.
+
+    Loading only reads the manifest, a shard is parsed and applied the first time an attribute of its class is read,
+    or when load_shard is called. Saving rewrites only the shards whose content changed.
+    Several groups may share a directory, a store only removes the shards it loaded or wrote itself.
+
+    Attributes:
+        group: The stored group.
+        directory: Path of the directory.
+        extension: Filename extension of the shards, which chooses their format.
+        manifest: A dict mapping shard name to {"file": filename, "fingerprint": content hash}.
+        pending: Names of the shards not loaded yet.
+        owned: Names of the shards loaded or written by this store.
+    """
+
+    def __init__(self, group, directory: str, extension: str = ".json", layer: str = FILE_LAYER):
+        """
+        Initialize the ShardedStore.
+        :param group: The stored group.
+        :param directory: Path of the directory.
+        :param extension: Filename extension of the shards, e.g. ".json" or ".yaml".
+        :param layer: The layer the shards are loaded into.
+        """
+        self.group = group
+        self.directory = directory
+        self.extension = extension
+        self.layer = layer
+        self.manifest: dict = dict()
+        self.pending: set = set()
+        self.owned: set = set()
+        self._hooks: dict = dict()
+        self._root: (dict, None) = None
+        self._lock = threading.RLock()
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.directory, MANIFEST_NAME)
+
+    def shard_path(self, shard: str) -> str:
+        """
+        Get the path of a shard file.
+        :param shard: Shard name, a top-level key of the tree.
+        :return: str.
+        """
+        entry = self.manifest.get(shard)
+        filename = entry["file"] if entry is not None else quote(shard, safe="") + self.extension
+        return os.path.join(self.directory, filename)
+
+    def read_manifest(self) -> dict:
+        """
+        Read the manifest of the directory, an empty manifest if there is none.
+        :return: dict mapping shard name to its entry.
+        """
+        if not os.path.exists(self.manifest_path):
+            return dict()
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") != MANIFEST_VERSION:
+            raise ValueError(f"unsupported manifest version: {manifest.get('version')}")
+        return manifest["shards"]
+
+    def _write_manifest(self):
+        tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "shards": self.manifest}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def save(self) -> list:
+        """
+        Write the shards whose content changed since the last save, shards not loaded yet are left untouched.
+        The owned shards that left the tree are removed, the shards of other stores are never removed.
+        :return: list of the names of the written and removed shards.
+        """
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            # read again, another store sharing the directory may have written its shards since
+            self.manifest = self.read_manifest()
+            written = []
+            for shard, value in self.group.tree.items():
+                if shard in self.pending:
+                    continue
+                encoded = encode_tree(ConfigTree({shard: value}))
+                fingerprint = encoded.fingerprint()
+                entry = self.manifest.get(shard)
+                path = self.shard_path(shard)
+                if entry is not None and entry["fingerprint"] == fingerprint and os.path.exists(path):
+                    continue
+                dump_file(encoded, path)
+                self.manifest[shard] = {"file": os.path.basename(path), "fingerprint": fingerprint}
+                self.owned.add(shard)
+                written.append(shard)
+            for shard in [shard for shard in self.owned if shard not in self.group.tree]:
+                self.owned.discard(shard)
+                entry = self.manifest.pop(shard, None)
+                if entry is None:
+                    continue
+                written.append(shard)
+                if os.path.exists(os.path.join(self.directory, entry["file"])):
+                    os.unlink(os.path.join(self.directory, entry["file"]))
+            if written or not os.path.exists(self.manifest_path):
+                self._write_manifest()
+            return written
+
+    def load(self, root: dict = None, lazy: bool = True):
+        """
+        Read the manifest and hook the classes of the shards, so each shard is loaded when first used.
+        :param root: config root, default is the root of the last init_config or load_config.
+        :param lazy: If False, load every shard now.
+        :return: self.
+        """
+        with self._lock:
+            self._root = root if root is not None else self.group.root
+            self.manifest = self.read_manifest()
+            self.pending = set(self.manifest)
+            for shard in list(self.manifest):
+                if not lazy or not self._install_hooks(shard):
+                    self.load_shard(shard)
+            return self
+
+    def _install_hooks(self, shard: str) -> bool:
+        if self._root is None or shard not in self._root or not isinstance(self.group.tree.get(shard), ConfigTree):
+            return False
+        hooks = []
+        for path in self.group.tree[shard].flatten(shard):
+            names = ConfigTree.config_path_split(path)
+            obj = self._root[names[0]]
+            try:
+                for attr_name in names[1:-1]:
+                    obj = getattr(obj, attr_name)
+            except AttributeError:
+                continue
+            if not isinstance(obj, type):
+                continue
+            current = obj.__dict__.get(names[-1], _MISSING)
+            if current is _MISSING or hasattr(type(current), "__get__"):
+                continue
+            hook = _ShardHook(self, shard, names[-1], current)
+            type.__setattr__(obj, names[-1], hook)
+            hooks.append((obj, hook))
+        self._hooks[shard] = hooks
+        return bool(hooks)
+
+    def _remove_hooks(self, shard: str):
+        for cls, hook in self._hooks.pop(shard, ()):
+            if cls.__dict__.get(hook.name) is hook:
+                type.__setattr__(cls, hook.name, hook.value)
+
+    def load_shard(self, shard: str) -> bool:
+        """
+        Parse a shard and apply it to the group, if it is not loaded yet.
+        :param shard: Shard name.
+        :return: True if the shard is loaded by this call.
+        """
+        with self._lock:
+            if shard not in self.pending:
+                return False
+            self.pending.discard(shard)
+            self.owned.add(shard)
+            self._remove_hooks(shard)
+            data = decode_data(load_file(self.shard_path(shard)))
+            values = self.group.rebuild_tree(data).flatten()
+            prefix = shard + "."
+            removed = [path for path in self.group.layers.layers[self.layer]
+                       if (path == shard or path.startswith(prefix)) and path not in values]
+            changed = self.group.layers.update_layer(self.layer, values)
+            changed.update(self.group.layers.remove_from_layer(self.layer, removed))
+            self.group.commit_paths(changed, self._root)
+            return True
+
+    def load_all(self):
+        """
+        Load every pending shard.
+        """
+        for shard in list(self.pending):
+            self.load_shard(shard)
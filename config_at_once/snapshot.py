@@ -0,0 +1,92 @@
+from .config_tree import ConfigTree
+from .utils import *
+
+_REMOVED = object()
+_UNCHANGED = object()
+
+
+class FrozenConfigTree(ConfigTree):
+    """
+    An immutable ConfigTree, used as a snapshot that readers can hold without locking.
+
+    Mutating methods raise TypeError, copy returns a mutable ConfigTree.
+    """
+    frozen = True
+
+    def __init__(self, __d=None, group=None):
+        """
+        Initialize the FrozenConfigTree.
+        :param __d: Initial dictionary for the FrozenConfigTree, nested ConfigTrees should already be frozen.
+        :param group: The group associated with the FrozenConfigTree.
+        """
+        dict.__init__(self)
+        self.group = group
+        if __d is not None:
+            dict.update(self, __d)
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError(f"{self.__class__.__name__} is immutable")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    pop = popitem = clear = update = setdefault = _readonly
+
+    def copy(self, group=None):
+        """
+        Create a mutable copy of the FrozenConfigTree.
+        :param group: Group of copied ConfigTree.
+        :return: A new ConfigTree instance.
+        """
+        return ConfigTree({k: v.copy() if isinstance(v, ConfigTree) else v for k, v in self.items()}, group=group)
+
+
+def freeze(tree: ConfigTree, group=None) -> FrozenConfigTree:
+    """
+    Deeply freeze a ConfigTree, frozen subtrees are shared instead of copied.
+    :param tree: ConfigTree to freeze.
+    :param group: Group of the frozen tree, default is the group of tree.
+    :return: FrozenConfigTree.
+    """
+    if isinstance(tree, FrozenConfigTree):
+        return tree
+    if group is None:
+        group = tree.group
+    return FrozenConfigTree({k: freeze(v, group) if isinstance(v, ConfigTree) else v for k, v in tree.items()},
+                            group=group)
+
+
+def evolve(tree: FrozenConfigTree, changes: dict = None, removed: Iterable[str] = ()) -> FrozenConfigTree:
+    """
+    Build a new snapshot with some paths changed, only the nodes along the changed paths are copied,
+    every other subtree is shared with the old snapshot.
+    :param tree: The old snapshot.
+    :param changes: New values keyed by dotted path.
+    :param removed: Dotted paths to remove.
+    :return: The new snapshot.
+    """
+    patch = dict()
+    for path, value in (changes or dict()).items():
+        patch[tuple(ConfigTree.config_path_split(path))] = value
+    for path in removed:
+        patch[tuple(ConfigTree.config_path_split(path))] = _REMOVED
+    if not patch:
+        return tree
+    return _evolve(tree, patch)
+
+
+def _evolve(node: ConfigTree, patch: dict) -> FrozenConfigTree:
+    by_name = dict()
+    for names, value in patch.items():
+        by_name.setdefault(names[0], dict())[names[1:]] = value
+    new = dict(node)
+    for name, sub_patch in by_name.items():
+        value = sub_patch.pop((), _UNCHANGED)
+        if value is _REMOVED:
+            new.pop(name, None)
+        elif value is not _UNCHANGED:
+            new[name] = freeze(value, node.group) if isinstance(value, ConfigTree) else value
+        if sub_patch:
+            child = new.get(name)
+            if not isinstance(child, ConfigTree):
+                child = FrozenConfigTree(group=node.group)
+            new[name] = _evolve(child, sub_patch)
+    return FrozenConfigTree(new, group=node.group)
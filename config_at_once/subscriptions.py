@@ -0,0 +1,98 @@
+from .config_tree import ConfigTree
+from .utils import *
+
+
+class _TrieNode:
+    __slots__ = ("children", "subscribers")
+
+    def __init__(self):
+        self.children: dict = dict()
+        self.subscribers: list = list()
+
+
+class SubscriptionTrie:
+    """
+    Stores change subscribers in a trie of dotted config path nodes.
+
+    Matching a changed path only walks the nodes along that path, so the cost of a dispatch
+    depends on the number and the depth of the changed paths, not on the number of subscribers.
+    """
+
+    def __init__(self):
+        self._root = _TrieNode()
+
+    def _walk(self, path: str, create: bool = False) -> (_TrieNode, None):
+        node = self._root
+        if not path:
+            return node
+        for name in ConfigTree.config_path_split(path):
+            child = node.children.get(name)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[name] = _TrieNode()
+            node = child
+        return node
+
+    def subscribe(self, path: str, callback: Callable) -> Callable:
+        """
+        Subscribe to the changes of a path and everything below it.
+        :param path: Dotted config path, an empty path subscribes to every change.
+        :param callback: Called as callback(changed_paths) with the changed dotted paths under the path.
+        :return: A function that removes the subscription.
+        """
+        subscription = (path, callback)
+        node = self._walk(path, create=True)
+        if subscription not in node.subscribers:
+            node.subscribers.append(subscription)
+        return lambda: self.unsubscribe(path, callback)
+
+    def unsubscribe(self, path: str, callback: Callable) -> bool:
+        """
+        Remove a subscription.
+        :param path: Dotted config path given to subscribe.
+        :param callback: Callback given to subscribe.
+        :return: True if the subscription existed, False otherwise.
+        """
+        node = self._walk(path)
+        if node is None or (path, callback) not in node.subscribers:
+            return False
+        node.subscribers.remove((path, callback))
+        return True
+
+    def match(self, changed_paths: Iterable[str]) -> dict:
+        """
+        Group changed paths by the subscriptions they concern.
+        A subscription matches the changed paths below it, and the changed paths above it,
+        since replacing a whole subtree changes everything under it.
+        :param changed_paths: Changed dotted config paths.
+        :return: dict mapping (path, callback) subscriptions to the list of their changed paths.
+        """
+        batches = dict()
+        for changed_path in changed_paths:
+            node = self._root
+            for subscription in node.subscribers:
+                batches.setdefault(subscription, []).append(changed_path)
+            for name in ConfigTree.config_path_split(changed_path):
+                node = node.children.get(name)
+                if node is None:
+                    break
+                for subscription in node.subscribers:
+                    batches.setdefault(subscription, []).append(changed_path)
+            else:
+                stack = list(node.children.values())
+                while stack:
+                    descendant = stack.pop()
+                    for subscription in descendant.subscribers:
+                        batches.setdefault(subscription, []).append(changed_path)
+                    stack.extend(descendant.children.values())
+        return batches
+
+    def __len__(self) -> int:
+        count = 0
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            count += len(node.subscribers)
+            stack.extend(node.children.values())
+        return count
@@ -0,0 +1,122 @@
+from .config_tree import ConfigTree
+from .utils import *
+
+_MISSING = object()
+
+
+class TracedValue:
+    """
+    A non-data descriptor holding a config value in place of a class attribute and counting its reads.
+
+    Attributes:
+        value: The config value.
+        count: Number of reads through the class or its instances.
+    """
+    __slots__ = ("value", "count")
+
+    def __init__(self, value):
+        self.value = value
+        self.count = 0
+
+    def __get__(self, obj, objtype=None):
+        self.count += 1
+        return self.value
+
+    def __repr__(self):
+        return f"<TracedValue {self.value!r} read {self.count} times>"
+
+
+class AccessTracer:
+    """
+    Counts the reads of the config values of a group, to find the hot keys and the keys never read.
+
+    Each leaf of the tree held by a configured class is replaced by a TracedValue, reads cost one method call.
+    Values applied by the group while tracing update the TracedValue instead of replacing it.
+
+    Attributes:
+        group: The traced group.
+        traced: A dict mapping dotted path to its TracedValue.
+    """
+
+    def __init__(self, group):
+        """
+        Initialize the AccessTracer.
+        :param group: The traced group.
+        """
+        self.group = group
+        self.traced: dict = dict()
+        self._installed: list = list()
+
+    def install(self, root: dict = None):
+        """
+        Install the counting descriptors on the configured classes.
+        Functions, properties and other descriptors are not traced.
+        :param root: config root, default is the root of the last init_config or load_config.
+        :return: self.
+        """
+        if root is None:
+            root = self.group.root
+        if root is None:
+            raise ValueError(f"no config root for group {self.group.name}, call init_config first or pass root")
+        for path in self.group.tree.flatten():
+            names = ConfigTree.config_path_split(path)
+            if len(names) < 2 or names[0] not in root:
+                continue
+            obj = root[names[0]]
+            try:
+                for attr_name in names[1:-1]:
+                    obj = getattr(obj, attr_name)
+            except AttributeError:
+                continue
+            if not isinstance(obj, type):
+                continue
+            current = obj.__dict__.get(names[-1], _MISSING)
+            if isinstance(current, TracedValue):
+                self.traced.setdefault(path, current)
+                continue
+            if current is _MISSING or hasattr(type(current), "__get__"):
+                continue
+            traced = TracedValue(current)
+            type.__setattr__(obj, names[-1], traced)
+            self.traced[path] = traced
+            self._installed.append((obj, names[-1], traced))
+        return self
+
+    def uninstall(self):
+        """
+        Restore the plain class attributes, descriptors replaced meanwhile are left untouched.
+        """
+        for cls, attr_name, traced in self._installed:
+            if cls.__dict__.get(attr_name) is traced:
+                type.__setattr__(cls, attr_name, traced.value)
+        self._installed.clear()
+
+    def reset(self):
+        """
+        Reset the read counts.
+        """
+        for traced in self.traced.values():
+            traced.count = 0
+
+    def counts(self) -> dict:
+        """
+        Get the read counts.
+        :return: dict mapping dotted path to read count.
+        """
+        return {path: traced.count for path, traced in self.traced.items()}
+
+    def report(self, top: int = 10) -> dict:
+        """
+        Report the hot keys and the keys never read.
+        :param top: Number of hot keys.
+        :return: {"hot": list of (path, count) by decreasing count, "unread": sorted list of paths}.
+        """
+        counts = self.counts()
+        hot = sorted(((path, count) for path, count in counts.items() if count), key=lambda item: -item[1])
+        return {"hot": hot[:top], "unread": sorted(path for path, count in counts.items() if not count)}
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.uninstall()
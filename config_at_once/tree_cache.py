@@ -0,0 +1,252 @@
+import hashlib
+import marshal
+import os
+import sys
+
+from .config_tree import ConfigTree
+from .utils import *
+
+# Bumped when the cache layout changes
+TREE_CACHE_VERSION = 2
+
+_TREE = 0
+_ALIAS = 1
+
+# Immutable leaves stored in the cache, the other leaves are read from their class on every start
+_CACHED_TYPES = frozenset([bool, int, float, str, bytes, type(None)])
+
+# Set on the classes by the group itself, so never part of a namespace snapshot
+_GROUP_ATTRS = frozenset(["__config_path__"])
+
+# marshal version 2 writes neither references nor interned flags, so equal values always dump to equal bytes,
+# and unlike ==, it tells 1, 1.0 and True apart and finds nan equal to itself
+_SNAPSHOT_VERSION = 2
+
+
+def _is_cached(value) -> bool:
+    if type(value) is tuple:
+        return all(_is_cached(item) for item in value)
+    return type(value) in _CACHED_TYPES
+
+
+def module_hash(module_name: str) -> (str, None):
+    """
+    Hash the source of an imported module.
+    :param module_name: Module name.
+    :return: Hex digest, None if the module is not imported or has no source file.
+    """
+    module = sys.modules.get(module_name)
+    path = getattr(module, "__file__", None)
+    if path is None:
+        return None
+    try:
+        with open(path, "rb") as f:
+            return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+    except OSError:
+        return None
+
+
+def cache_path(group, root: dict, directory: str) -> str:
+    """
+    Get the cache file of the default tree of a group for a config root.
+    The name depends on the library version, the group name and rules and the root module,
+    the source hashes of the defining modules are checked when the file is read.
+    :param group: Group.
+    :param root: config root.
+    :param directory: Cache directory.
+    :return: str.
+    """
+    from . import __version__
+    attr_filter = group.attr_filter
+    rules = [attr_filter.include, attr_filter.exclude]
+    rules = [None if rule is None else (sorted(rule.names), rule.regex and rule.regex.pattern) for rule in rules]
+    key = repr((TREE_CACHE_VERSION, __version__, group.name, root.get("__name__"), rules))
+    digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+    return os.path.join(directory, f"{group.name}-{digest}.marshal")
+
+
+def _snapshot(base: type) -> tuple:
+    namespace = vars(base)
+    names = tuple(name for name, value in namespace.items() if name not in _GROUP_ATTRS and _is_cached(value))
+    return frozenset(namespace), names, marshal.dumps(tuple(map(namespace.__getitem__, names)), _SNAPSHOT_VERSION)
+
+
+def _same_namespace(base: type, snapshot) -> bool:
+    keys, names, values = snapshot
+    namespace = vars(base)
+    return namespace.keys() == keys \
+        and marshal.dumps(tuple(map(namespace.__getitem__, names)), _SNAPSHOT_VERSION) == values
+
+
+def _owner(cls: type, name: str) -> (type, None):
+    return next((base for base in cls.__mro__ if name in vars(base)), None)
+
+
+class _CacheWriter:
+    """
+    Turns a built tree into nested per-class records.
+    A record is (base indexes of the class MRO, items, live names, children), where items are the leaves
+    in tree order, the live leaves and the children holding None until they are read from the classes,
+    and children are (name, _TREE, record) or (name, _ALIAS, index of the aliased class in visiting order).
+    """
+
+    def __init__(self):
+        self.bases: list = list()
+        self.modules: dict = dict()
+        self._base_indexes: dict = dict()
+        self._visited: dict = dict()
+
+    def _base_index(self, base: type) -> int:
+        index = self._base_indexes.get(base)
+        if index is None:
+            index = self._base_indexes[base] = len(self.bases)
+            self.bases.append(_snapshot(base))
+            if base.__module__ not in self.modules:
+                self.modules[base.__module__] = module_hash(base.__module__)
+        return index
+
+    def children(self, tree: ConfigTree, resolve: Callable) -> list:
+        children = []
+        for name, value in tree.items():
+            if not isinstance(value, ConfigTree):
+                continue
+            if id(value) in self._visited:
+                children.append((name, _ALIAS, self._visited[id(value)]))
+            else:
+                self._visited[id(value)] = len(self._visited)
+                children.append((name, _TREE, self.record(resolve(name), value)))
+        return children
+
+    def record(self, cls: type, tree: ConfigTree) -> tuple:
+        mro = tuple(self._base_index(base) for base in cls.__mro__[:-1])
+        items, live = dict(), []
+        for name, value in tree.items():
+            owner = None if isinstance(value, ConfigTree) else _owner(cls, name)
+            # a cached leaf must be a plain attribute, checked with the namespace of its owner
+            if owner is not None and _is_cached(value) and vars(owner)[name] is value:
+                items[name] = value
+            else:
+                items[name] = None
+                if not isinstance(value, ConfigTree):
+                    live.append(name)
+        return mro, items, live, self.children(tree, lambda name: getattr(cls, name))
+
+
+def dump_tree_cache(group, root: dict, tree: ConfigTree, directory: str) -> bool:
+    """
+    Write the default tree of a group to the cache, as a nested record per class, see _CacheWriter.
+    The namespace of every class and base is snapshotted, the immutable attributes by value, the others by name.
+    :param group: Group, its config should just be initialized.
+    :param root: config root.
+    :param tree: The built default tree.
+    :param directory: Cache directory.
+    :return: True if written, False if a defining module has no source to hash.
+    """
+    writer = _CacheWriter()
+    if isinstance(root.get("__name__"), str):
+        writer.modules[root["__name__"]] = module_hash(root["__name__"])
+    children = writer.children(tree, root.__getitem__)
+    if None in writer.modules.values():
+        return False
+    os.makedirs(directory, exist_ok=True)
+    path = cache_path(group, root, directory)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(marshal.dumps({"modules": writer.modules, "bases": writer.bases, "children": children,
+                               "aliases": dict(group.config_aliases)}))
+    os.replace(tmp_path, path)
+    return True
+
+
+class _StaleCache(Exception):
+    pass
+
+
+class _CacheReader:
+    """
+    Rebuilds a tree from the records of _CacheWriter, each subtree in one update.
+    Every class and base is checked once against its namespace snapshot.
+    """
+
+    def __init__(self, group, bases: list):
+        self.group = group
+        self.bases = bases
+        self.classes: list = list()
+        self._checked: list = [None] * len(bases)
+        self._trees: list = list()
+
+    def _check(self, cls: type, mro: list):
+        bases = cls.__mro__[:-1]
+        if len(bases) != len(mro):
+            raise _StaleCache()
+        for base, index in zip(bases, mro):
+            checked = self._checked[index]
+            if checked is None:
+                if not _same_namespace(base, self.bases[index]):
+                    raise _StaleCache()
+                self._checked[index] = base
+            elif checked is not base:
+                raise _StaleCache()
+
+    def children(self, children: list, resolve: Callable, prefix: str) -> dict:
+        trees = dict()
+        for name, kind, payload in children:
+            if kind == _ALIAS:
+                trees[name] = self._trees[payload]
+                continue
+            index = len(self._trees)
+            self._trees.append(None)
+            trees[name] = self._trees[index] = self.tree(resolve(name), payload, f"{prefix}.{name}")
+        return trees
+
+    def tree(self, cls: type, record, path: str) -> ConfigTree:
+        mro, items, live, children = record
+        self._check(cls, mro)
+        self.classes.append((cls, path))
+        items = dict(items)
+        for name in live:
+            items[name] = getattr(cls, name)
+        items.update(self.children(children, lambda name: getattr(cls, name), path))
+        tree = ConfigTree(group=self.group)
+        tree.update(items)
+        return tree
+
+
+def load_tree_cache(group, root: dict, directory: str) -> (ConfigTree, None):
+    """
+    Read the default tree of a group from the cache, if its defining modules did not change.
+    The "__config_path__" of the classes and the config_aliases of the group are restored as by a build,
+    and the leaves not stored in the cache are read from their classes.
+    Each class and base is compared once with its namespace snapshot, so attributes added or removed at runtime
+    and defaults computed from other modules, e.g. imported constants or environment variables,
+    invalidate the cache when they change. No dir() of a class is needed.
+    :param group: Group.
+    :param root: config root.
+    :param directory: Cache directory.
+    :return: ConfigTree, None if there is no valid cache.
+    """
+    try:
+        # read at once, marshal.load reads a file object in many small calls
+        with open(cache_path(group, root, directory), "rb") as f:
+            cache = marshal.loads(f.read())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    try:
+        if any(module_hash(name) != digest for name, digest in cache["modules"].items()):
+            return None
+        reader = _CacheReader(group, cache["bases"])
+        tree = ConfigTree(group=group)
+        tree.update(reader.children(cache["children"], root.__getitem__, group.name))
+        aliases = cache["aliases"]
+    except _StaleCache:
+        return None
+    except (KeyError, IndexError, AttributeError, TypeError, ValueError):
+        # a malformed cache file is ignored and rewritten by the next build
+        return None
+    if not isinstance(aliases, dict):
+        return None
+    for cls, cls_path in reader.classes:
+        cls.__config_path__ = cls_path
+        group._track_class(cls, cls_path)
+    group.config_aliases = aliases
+    return tree
@@ -11,6 +11,8 @@ JSON_FILENAME_EXTENSIONS = [".json"]
 YAML_FILENAME_EXTENSIONS = [".yaml", ".yml"]
 TOML_FILENAME_EXTENSIONS = [".toml"]
 XML_FILENAME_EXTENSIONS = [".xml"]
+# Snapshots of the command line, not a supported config file: marshal is only safe on trusted input
+MARSHAL_FILENAME_EXTENSIONS = [".marshal"]
 
 SUPPORTED_FILE_EXTENSIONS = [
     INI_FILENAME_EXTENSIONS,
@@ -19,3 +21,22 @@ SUPPORTED_FILE_EXTENSIONS = [
     TOML_FILENAME_EXTENSIONS,
     XML_FILENAME_EXTENSIONS
 ]
+
+json_serializable_objects: list = [bool, int, float, str, dict, list, tuple, type(None)]
+
+
+def values_differ(a, b) -> bool:
+    """
+    Check if two config values differ, values whose comparison fails or is ambiguous are considered different.
+    :param a: A value.
+    :param b: Another value.
+    :return: True if the values differ, False otherwise.
+    """
+    if a is b:
+        return False
+    if type(a) is not type(b):
+        return True
+    try:
+        return not bool(a == b)
+    except Exception:
+        return True
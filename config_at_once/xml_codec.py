@@ -0,0 +1,123 @@
+import re
+from xml.etree.ElementTree import iterparse
+from xml.sax.saxutils import escape, quoteattr
+
+from .utils import *
+
+ROOT_TAG = "config"
+ITEM_TAG = "item"
+
+_NAME_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_.-]*$")
+
+_TYPE_NAMES = {bool: "bool", int: "int", float: "float", type(None): "none", list: "list", tuple: "list"}
+_DECODERS = {
+    "int": int,
+    "float": float,
+    "bool": lambda text: text == "true",
+    "none": lambda text: None,
+}
+
+
+def _is_xml_name(name: str) -> bool:
+    return bool(_NAME_RE.match(name)) and not name[:3].lower() == "xml"
+
+
+def _open_tag(name, type_name: str = None) -> str:
+    if isinstance(name, str) and _is_xml_name(name):
+        tag = name
+    else:
+        tag = f"{ITEM_TAG} key={quoteattr(str(name))}" if name is not None else ITEM_TAG
+    if type_name is not None:
+        tag += f' type="{type_name}"'
+    return tag
+
+
+def iter_chunks(name, value, depth: int = 0) -> Iterable[str]:
+    """
+    Generate the XML of an element incrementally.
+    Nested dicts map to child elements, other values to typed leaf elements.
+    :param name: Element name, a key that is not a valid XML name is kept in a key attribute, None for a list item.
+    :param value: Element value.
+    :param depth: Indentation depth.
+    :return: Iterable of str.
+    """
+    indent = "  " * depth
+    tag_name = name if isinstance(name, str) and _is_xml_name(name) else ITEM_TAG
+    if isinstance(value, dict):
+        if not value:
+            yield f"{indent}<{_open_tag(name, 'dict')}/>\n"
+            return
+        yield f"{indent}<{_open_tag(name)}>\n"
+        for k, v in value.items():
+            yield from iter_chunks(k, v, depth + 1)
+        yield f"{indent}</{tag_name}>\n"
+    elif isinstance(value, (list, tuple)):
+        yield f"{indent}<{_open_tag(name, 'list')}>\n"
+        for item in value:
+            yield from iter_chunks(None, item, depth + 1)
+        yield f"{indent}</{tag_name}>\n"
+    elif isinstance(value, str):
+        yield f"{indent}<{_open_tag(name)}>{escape(value)}</{tag_name}>\n"
+    else:
+        type_name = _TYPE_NAMES.get(type(value))
+        if type_name is None:
+            raise TypeError(f"unsupported xml value type: {type(value)}")
+        text = "" if value is None else ("true" if value is True else "false" if value is False else repr(value))
+        yield f"{indent}<{_open_tag(name, type_name)}>{text}</{tag_name}>\n"
+
+
+def dump(data: dict, f):
+    """
+    Stream a config dict to a binary file as XML, under a single root element.
+    :param data: Config dict.
+    :param f: Binary file object.
+    """
+    f.write(b'<?xml version="1.0" encoding="utf-8"?>\n')
+    f.write(f"<{ROOT_TAG}>\n".encode("utf-8"))
+    for k, v in data.items():
+        for chunk in iter_chunks(k, v, 1):
+            f.write(chunk.encode("utf-8"))
+    f.write(f"</{ROOT_TAG}>\n".encode("utf-8"))
+
+
+def load(f) -> dict:
+    """
+    Read an XML config with iterparse, every element is cleared and detached once read,
+    so memory stays flat with respect to the document size.
+    :param f: Binary file object.
+    :return: dict.
+    """
+    # entries of [element, collected children or None for a leaf, is list]
+    stack = []
+    result = None
+    for event, elem in iterparse(f, events=("start", "end")):
+        if event == "start":
+            type_name = elem.get("type")
+            if type_name == "list":
+                stack.append([elem, [], True])
+            elif type_name is None or type_name == "dict":
+                stack.append([elem, dict(), False])
+            else:
+                stack.append([elem, None, False])
+            continue
+        elem, children, _ = stack.pop()
+        type_name = elem.get("type")
+        if children is None:
+            value = _DECODERS.get(type_name, str)(elem.text or "")
+        elif not children and type_name is None:
+            value = elem.text or ""
+        else:
+            value = children
+        if not stack:
+            result = value
+            break
+        parent, siblings, is_list = stack[-1]
+        if is_list:
+            siblings.append(value)
+        else:
+            siblings[elem.get("key", elem.tag)] = value
+        elem.clear()
+        parent.remove(elem)
+    if not isinstance(result, dict):
+        return dict()
+    return result
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from config_at_once import *
+from config_at_once.arrays import sidecar_directory
+
+_arrays_group = Group("arrays_group")
+
+
+@_arrays_group.add
+class Calibration:
+    name = "default"
+    curve = None
+
+
+def test_no_arrays(tmp_path):
+    tree = ConfigTree({"a": ConfigTree({"b": [1, 2]})})
+    assert extract_arrays(tree, str(tmp_path / "config.json")) is tree
+    data = {"a": {"b": [1, 2]}}
+    assert restore_arrays(data, str(tmp_path / "config.json")) == {"a": {"b": [1, 2]}}
+
+
+def test_group_arrays_sidecar(tmp_path):
+    np = pytest.importorskip("numpy")
+    path = str(tmp_path / "config.json")
+    _arrays_group.init_config(globals(), mode=TREE)
+    curve = np.linspace(0, 1, 10000)
+    _arrays_group.set_override("Calibration.curve", curve)
+
+    _arrays_group.save_to_file(path)
+    with open(path) as f:
+        saved = json.load(f)
+    assert saved["Calibration"]["curve"] == {ARRAY_MARKER: "config.arrays/Calibration.curve.npy"}
+    assert (tmp_path / "config.arrays" / "Calibration.curve.npy").exists()
+    assert sidecar_directory(path) == str(tmp_path / "config.arrays")
+
+    _arrays_group.clear_override()
+    _arrays_group.load_from_file(path, globals())
+    assert isinstance(Calibration.curve, np.memmap)
+    assert np.array_equal(Calibration.curve, curve)
@@ -0,0 +1,75 @@
+import pytest
+
+from config_at_once import *
+
+_bulk_group = Group("bulk_group")
+
+
+@_bulk_group.add
+class Connection:
+    timeout = 5
+
+    def connect(self):
+        return self.timeout
+
+    @property
+    def address(self):
+        return "localhost"
+
+    @_bulk_group.add
+    class Retry:
+        attempts = 3
+
+
+class Session:
+    def __init__(self):
+        self.timeout = 1
+        self.retry = type("Retry", (), {})()
+
+
+class ReadOnlySession:
+    def __init__(self):
+        self.retry = type("Retry", (), {})()
+
+    @property
+    def timeout(self):
+        return 1
+
+    @timeout.setter
+    def timeout(self, value):
+        raise AttributeError("read only")
+
+
+def test_apply_plan():
+    plan = ApplyPlan(ConfigTree({"timeout": 10, "retry": ConfigTree({"attempts": 7})}))
+    assert len(plan) == 2
+    sessions = [Session() for _ in range(10)]
+    sessions.insert(3, ReadOnlySession())
+    failures = apply_many(plan, sessions)
+    assert [target for target, _ in failures] == [sessions[3]]
+    assert all(s.timeout == 10 and s.retry.attempts == 7 for i, s in enumerate(sessions) if i != 3)
+
+    sessions = [Session() for _ in range(1000)]
+    assert apply_many(plan, iter(sessions), max_workers=4, chunk_size=64) == []
+    assert all(s.timeout == 10 for s in sessions)
+
+
+def test_group_bulk_apply():
+    _bulk_group.init_config(globals(), mode=TREE)
+    _bulk_group.load_config({"Connection": {"timeout": 30}}, globals(), mode=TREE)
+    instances = [type("Conn", (), {"Retry": None})() for _ in range(5)]
+    for instance in instances:
+        instance.Retry = Session()
+    assert _bulk_group.bulk_apply("Connection", instances) == []
+    assert all(i.timeout == 30 and i.Retry.attempts == 3 for i in instances)
+
+    connections = [Connection() for _ in range(3)]
+    assert _bulk_group.bulk_apply("Connection", connections) == []
+    assert all(c.connect() == 30 and c.address == "localhost" for c in connections)
+    assert all("connect" not in vars(c) for c in connections)
+
+    with pytest.warns(RuntimeWarning):
+        failures = _bulk_group.bulk_apply("Connection", [object()])
+    assert len(failures) == 1
+    with pytest.raises(TypeError):
+        _bulk_group.bulk_apply("Connection.timeout", instances)
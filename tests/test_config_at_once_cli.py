@@ -0,0 +1,67 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from config_at_once import *
+from config_at_once.__main__ import main, output_path, load_snapshot
+
+_cli_group = Group("cli_group")
+
+
+@_cli_group.add
+class CliDb:
+    host = "localhost"
+    port = 5432
+    ratio = 0.5
+
+
+def _write(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+    return str(path)
+
+
+def test_output_path():
+    assert output_path("a/b.json.gz", ".yaml") == "a/b.yaml"
+    assert output_path("a/b.json", ".ini.xz", "out") == os.path.join("out", "b.ini.xz")
+
+
+def test_convert_and_snapshot(tmp_path, capsys):
+    files = [_write(tmp_path / f"c{i}.json", {"CliDb": {"host": f"h{i}", "port": i}}) for i in range(3)]
+    out = str(tmp_path / "out")
+    assert main(["convert", *files, "--to", ".xml.gz", "--output-dir", out, "--jobs", "2"]) == 0
+    assert sorted(os.listdir(out)) == ["c0.xml.gz", "c1.xml.gz", "c2.xml.gz"]
+    assert load_file(os.path.join(out, "c2.xml.gz")) == {"CliDb": {"host": "h2", "port": 2}}
+
+    assert main(["snapshot", files[0], "--jobs", "1"]) == 0
+    assert load_snapshot(str(tmp_path / "c0.marshal")) == {"CliDb": {"host": "h0", "port": 0}}
+    with pytest.raises(ValueError, match="Unexpected file extension"):
+        load_file(str(tmp_path / "c0.marshal"))
+    assert main(["convert", files[0], "--to", ".json"]) == 1
+    assert "already" in capsys.readouterr().err
+
+
+def test_validate(tmp_path, capsys):
+    good = _write(tmp_path / "good.json", {"CliDb": {"host": "h", "ratio": 1}})
+    bad = _write(tmp_path / "bad.json", {"CliDb": {"port": "x", "user": "u"}})
+    spec = "tests.test_config_at_once_cli:_cli_group"
+    _cli_group.init_config(globals(), mode=TREE)
+    _cli_group.set_override("CliDb.port", 1)
+    assert main(["validate", good, "--group", spec, "--jobs", "1"]) == 0
+    assert CliDb.port == 1 and _cli_group.resolve("CliDb.port") == 1
+    _cli_group.clear_override()
+    assert main(["validate", good, bad, "--group", spec, "--jobs", "1"]) == 1
+    err = capsys.readouterr().err
+    assert "CliDb.port: expected int, got str" in err and "CliDb.user: unknown key" in err
+
+
+def test_bench_entry_point(tmp_path):
+    path = _write(tmp_path / "c.json", {"CliDb": {"host": "h"}})
+    result = subprocess.run([sys.executable, "-m", "config_at_once", "bench", path, "--repeat", "2",
+                             "--group", "tests.test_config_at_once_cli:_cli_group"],
+                            capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(__file__)))
+    assert result.returncode == 0, result.stderr
+    assert "parse: min" in result.stdout and "apply: min" in result.stdout
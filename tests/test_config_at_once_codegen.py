@@ -0,0 +1,105 @@
+import importlib
+import json
+import sys
+import warnings
+
+import pytest
+
+from config_at_once import *
+from config_at_once.codegen import generate_source, read_fingerprint
+
+_codegen_group = Group("codegen_group")
+
+
+@_codegen_group.add
+class StaticDb:
+    host = "localhost"
+    ratio = float("inf")
+    tags = ("a", "b")
+    options = {"ssl": True}
+
+    def connect(self):
+        return self.host
+
+    @_codegen_group.add
+    class Pool:
+        size = 5
+
+
+def test_generate_source():
+    tree = ConfigTree({"Db": ConfigTree({"host": "h", "Pool": ConfigTree({"size": 1, "ids": {1, 2}}),
+                                         "headers": ConfigTree({"X-Id": "1"})}), "debug": None})
+    namespace = dict()
+    exec(generate_source(tree, "abc"), namespace)
+    assert namespace["__config_fingerprint__"] == "abc"
+    assert namespace["Db"].Pool.size == 1 and namespace["Db"].Pool.ids == {1, 2}
+    assert namespace["Db"].headers == {"X-Id": "1"}
+    assert namespace["debug"] is None
+    with pytest.raises(AttributeError):
+        namespace["Db"].host = "other"
+    with pytest.warns(RuntimeWarning):
+        generate_source(ConfigTree({"func": print}), "abc")
+
+
+def test_group_load_static(tmp_path):
+    source = tmp_path / "config.json"
+    module_path = str(tmp_path / "static_config.py")
+    source.write_text(json.dumps({"StaticDb": {"host": "db.local", "Pool": {"size": 10}}}))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        static = _codegen_group.load_static(module_path, globals(), [str(source)])
+    assert not hasattr(static.StaticDb, "connect")
+    assert static.StaticDb.host == "db.local" and static.StaticDb.Pool.size == 10
+    assert static.StaticDb.ratio == float("inf") and static.StaticDb.tags == ("a", "b")
+    assert read_fingerprint(module_path) == static.__config_fingerprint__
+
+    StaticDb.host = "not reloaded"
+    static = _codegen_group.load_static(module_path, globals(), [str(source)])
+    assert static.StaticDb.host == "db.local"
+    assert StaticDb.host == "not reloaded"
+
+    source.write_text(json.dumps({"StaticDb": {"host": "db.other", "Pool": {"size": 20}}}))
+    static = _codegen_group.load_static(module_path, globals(), [str(source)])
+    assert static.StaticDb.host == "db.other" and static.StaticDb.Pool.size == 20
+    assert StaticDb.host == "db.other"
+
+    assert _codegen_group.load_static(module_path, globals(), [str(source)]) is static
+
+
+_DEFINING_MODULE = """
+from config_at_once import Group
+
+group = Group("codegen_module_group")
+
+
+@group.add
+class ModuleDb:
+    host = {host!r}
+"""
+
+
+def _import_defining_module(tmp_path, host):
+    (tmp_path / "codegen_defining.py").write_text(_DEFINING_MODULE.format(host=host))
+    sys.modules.pop("codegen_defining", None)
+    importlib.invalidate_caches()
+    return importlib.import_module("codegen_defining")
+
+
+def test_load_static_checks_module_source(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(sys, "dont_write_bytecode", True)
+    module_path = str(tmp_path / "static_module.py")
+    defining = _import_defining_module(tmp_path, "localhost")
+    static = defining.group.load_static(module_path, vars(defining))
+    assert static.ModuleDb.host == "localhost"
+
+    # a new start with an unchanged source imports the module without building the defaults
+    defining = _import_defining_module(tmp_path, "localhost")
+    assert defining.group.load_static(module_path, vars(defining)) is static
+    assert defining.group.root is None
+
+    defining = _import_defining_module(tmp_path, "db.edited")
+    static = defining.group.load_static(module_path, vars(defining))
+    assert static.ModuleDb.host == "db.edited"
+    sys.modules.pop("codegen_defining", None)
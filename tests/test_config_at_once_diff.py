@@ -0,0 +1,64 @@
+from config_at_once import *
+
+_diff_group = Group("diff_group")
+
+
+@_diff_group.add
+class DiffDb:
+    host = "localhost"
+    port = 5432
+
+    @_diff_group.add
+    class Pool:
+        size = 5
+
+
+def test_tree_diff():
+    shared = ConfigTree({"size": 5})
+    old = ConfigTree({"Db": ConfigTree({"host": "a", "port": 1, "Pool": shared, "gone": ConfigTree({"x": 1})}),
+                      "debug": False})
+    new = ConfigTree({"Db": ConfigTree({"host": "b", "port": 1, "Pool": shared, "gone": 2}),
+                      "Cache": ConfigTree({"ttl": 3})})
+    patch = old.diff(new)
+    assert patch == ConfigPatch(added={"Db.gone": 2, "Cache.ttl": 3}, removed=["Db.gone.x", "debug"],
+                                changed={"Db.host": "b"})
+    assert not new.diff(new)
+
+    copy = ConfigTree({"Db": ConfigTree({"Pool": ConfigTree({"size": 5})})})
+    copy.fingerprint()
+    same = ConfigTree({"Db": ConfigTree({"Pool": ConfigTree({"size": 5})})})
+    same.fingerprint()
+    assert not copy.diff(same)
+
+
+def test_group_incremental_load():
+    _diff_group.init_config(globals(), mode=TREE)
+    config = {"DiffDb": {"host": "db.local", "port": 6432, "Pool": {"size": 10}}}
+    _diff_group.load_config(config, globals(), mode=TREE, incremental=True)
+    assert DiffDb.host == "db.local" and DiffDb.Pool.size == 10
+
+    changes = []
+    _diff_group.subscribe("DiffDb", changes.append)
+    DiffDb.host = "untouched"
+    config = {"DiffDb": {"host": "db.local", "Pool": {"size": 20}}}
+    _diff_group.load_config(config, globals(), mode=TREE, incremental=True)
+    assert DiffDb.Pool.size == 20
+    assert DiffDb.port == 5432
+    assert DiffDb.host == "untouched"
+    assert changes == [["DiffDb.Pool.size", "DiffDb.port"]]
+    assert _diff_group.tree["DiffDb"]["port"] == 5432
+
+
+def test_group_incremental_load_sees_layer_changes():
+    _diff_group.init_config(globals(), mode=TREE)
+    config = {"DiffDb": {"host": "db.local", "Pool": {"size": 10}}}
+    _diff_group.load_config(config, globals(), mode=TREE, incremental=True)
+    _diff_group.update_layer(FILE_LAYER, {"DiffDb.host": "pushed", "DiffDb.port": 1})
+    assert DiffDb.host == "pushed" and DiffDb.port == 1
+
+    _diff_group.load_config(config, globals(), mode=TREE, incremental=True, lazy=True)
+    assert _diff_group.tree["DiffDb"]["host"] == "db.local"
+    assert "host" in vars(DiffDb) and vars(DiffDb)["host"] != "db.local"
+    assert DiffDb.host == "db.local"
+    assert DiffDb.port == 5432
+    assert _diff_group.layers.layers[FILE_LAYER] == {"DiffDb.host": "db.local", "DiffDb.Pool.size": 10}
@@ -0,0 +1,105 @@
+import socket
+
+import pytest
+
+from config_at_once import *
+from config_at_once.distribution import *
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix domain sockets are not available")
+
+_publisher_group = Group("publisher_group")
+_subscriber_group = Group("subscriber_group")
+
+
+@_publisher_group.add
+class PublishedDb:
+    host = "localhost"
+    port = 5432
+
+
+@_subscriber_group.add
+class SubscribedDb:
+    host = "localhost"
+    port = 5432
+
+
+def test_frame_round_trip():
+    frame = encode_frame(FRAME_DELTA, 3, {"Db.port": 1, "Db.hook": print, "Db.tags": {"a"}}, ["Db.host"])
+    assert decode_frame(frame) == (FRAME_DELTA, 3, {"Db.port": 1, "Db.tags": {"a"}}, ["Db.host"])
+    with pytest.raises(ValueError, match="unexpected frame magic"):
+        decode_frame(b"XXXX" + frame[4:])
+    with pytest.raises(ValueError):
+        decode_frame(frame[:-1])
+
+
+def test_publisher_pushes_to_subscriber(tmp_path):
+    publisher_root = {"Db": PublishedDb}
+    subscriber_root = {"Db": SubscribedDb}
+    _publisher_group.init_config(publisher_root, mode=TREE)
+    _subscriber_group.init_config(subscriber_root, mode=TREE)
+    _publisher_group.set_override("Db.port", 6432)
+
+    address = str(tmp_path / "config.sock")
+    with ConfigPublisher(_publisher_group, address) as publisher:
+        with ConfigSubscriber(_subscriber_group, address) as subscriber:
+            assert subscriber.wait_for(0, timeout=5)
+            assert SubscribedDb.port == 6432
+
+            _publisher_group.load_config({"Db": {"host": "db.local"}}, publisher_root, mode=TREE)
+            assert subscriber.wait_for(publisher.version, timeout=5)
+            assert SubscribedDb.host == "db.local"
+            assert _subscriber_group.resolve("Db.host") == "db.local"
+
+            stale = subscriber.version
+            subscriber.apply_frame(FRAME_DELTA, stale, {"Db.host": "stale"}, [])
+            assert SubscribedDb.host == "db.local"
+
+
+def test_subscriber_survives_failed_frame(tmp_path, caplog):
+    publisher_root = {"Db": PublishedDb}
+    subscriber_root = {"Db": SubscribedDb}
+    _publisher_group.init_config(publisher_root, mode=TREE)
+    _subscriber_group.init_config(subscriber_root, mode=TREE)
+
+    address = str(tmp_path / "config.sock")
+    with ConfigPublisher(_publisher_group, address) as publisher:
+        with ConfigSubscriber(_subscriber_group, address) as subscriber:
+            assert subscriber.wait_for(0, timeout=5)
+            apply_frame = subscriber.apply_frame
+            failures = []
+
+            def failing_apply_frame(*frame):
+                if not failures:
+                    failures.append(frame)
+                    raise RuntimeError("apply failed")
+                apply_frame(*frame)
+
+            subscriber.apply_frame = failing_apply_frame
+            _publisher_group.set_override("Db.port", 1)
+            _publisher_group.set_override("Db.port", 2)
+            assert subscriber.wait_for(publisher.version, timeout=5)
+            assert SubscribedDb.port == 2
+            assert len(failures) == 1
+            assert "failed to apply config frame" in caplog.text
+
+
+def test_slow_subscriber_is_dropped(tmp_path):
+    import time
+
+    publisher_root = {"Db": PublishedDb}
+    _publisher_group.init_config(publisher_root, mode=TREE)
+    address = str(tmp_path / "config.sock")
+    with ConfigPublisher(_publisher_group, address, max_pending=2) as publisher:
+        slow = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        slow.connect(address)
+        try:
+            deadline = time.monotonic() + 5
+            while not publisher._clients and time.monotonic() < deadline:
+                time.sleep(0.01)
+            start = time.monotonic()
+            for i in range(20):
+                _publisher_group.set_override("Db.host", str(i) * 1_000_000)
+            assert time.monotonic() - start < 5
+            assert publisher._clients == []
+        finally:
+            slow.close()
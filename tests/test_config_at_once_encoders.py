@@ -0,0 +1,88 @@
+import datetime
+import decimal
+import enum
+import json
+import pathlib
+
+import pytest
+
+from config_at_once import *
+from config_at_once.encoders import DROP, KEEP, encode_value, decode_value, get_action
+
+_encoders_group = Group("encoders_group")
+
+
+class Level(enum.IntEnum):
+    LOW = 1
+    HIGH = 2
+
+
+@_encoders_group.add
+class Job:
+    started = datetime.datetime(2024, 5, 1, 12, 30)
+    timeout = datetime.timedelta(minutes=5)
+    window = datetime.timedelta(days=40000, microseconds=7)
+    price = decimal.Decimal("9.99")
+    workdir = pathlib.Path("/var/lib/job")
+    level = Level.HIGH
+    tags = {"a"}
+    frozen_tags = frozenset(["b"])
+    retries = 3
+    handler = print
+
+
+@pytest.fixture
+def complex_encoder():
+    yield register_encoder("complex", [complex], lambda value: [value.real, value.imag],
+                           lambda value: complex(*value))
+    unregister_encoder("complex")
+
+
+def test_decision_cache(complex_encoder):
+    assert get_action(int) is KEEP and get_action(bool) is KEEP
+    assert get_action(Level).name == "enum"
+    assert get_action(type(pathlib.Path("."))).name == "path"
+    assert encode_value(print) is DROP
+    assert encode_value([1, print, decimal.Decimal("1")]) == [1, {"__type__": "decimal", "value": "1"}]
+    assert encode_value(1 + 2j) == {"__type__": "complex", "value": [1.0, 2.0]}
+
+
+def test_unregister_encoder(complex_encoder):
+    assert unregister_encoder("complex") is complex_encoder
+    assert encode_value(1 + 2j) is DROP
+    assert unregister_encoder("complex") is None
+
+
+def test_exact_values():
+    window = datetime.timedelta(days=40000, seconds=1, microseconds=7)
+    assert decode_value(encode_value(window)) == window
+    assert decode_value({"__type__": "timedelta", "value": 300.0}) == datetime.timedelta(minutes=5)
+    assert type(decode_value(encode_value(frozenset([1])))) is frozenset
+    nested = {(1, datetime.date(2024, 1, 2)), ("a", ())}
+    assert decode_value(json.loads(json.dumps(encode_value(nested)))) == nested
+    assert type(decode_value(encode_value(bytearray(b"\x00")))) is bytearray
+    assert type(decode_value(encode_value(b"\x00"))) is bytes
+
+
+def test_remove_by_objects():
+    tree = ConfigTree({"a": 1, "b": print, "c": ConfigTree({"d": "x", "e": object()})})
+    assert tree.remove_by_objects([int, str]) == {"a": 1, "c": {"d": "x"}}
+    assert tree.remove_by_objects([int, str], ignored_objects=[bool]) == {"a": 1, "c": {"d": "x"}}
+
+
+@pytest.mark.parametrize("extension", [".json", ".ini", ".xml"])
+def test_group_round_trip(tmp_path, extension):
+    path = str(tmp_path / f"config{extension}")
+    defaults = _encoders_group.init_config(globals(), mode=TREE).copy()
+    _encoders_group.save_to_file(path)
+    Job.started = Job.price = Job.level = Job.tags = Job.window = Job.frozen_tags = None
+    _encoders_group.load_from_file(path, globals())
+    assert Job.started == defaults["Job"]["started"]
+    assert Job.timeout == datetime.timedelta(minutes=5)
+    assert Job.price == decimal.Decimal("9.99")
+    assert Job.workdir == pathlib.Path("/var/lib/job")
+    assert Job.level is Level.HIGH
+    assert Job.tags == {"a"}
+    assert Job.window == datetime.timedelta(days=40000, microseconds=7)
+    assert type(Job.frozen_tags) is frozenset
+    assert Job.retries == 3 and Job.handler is print
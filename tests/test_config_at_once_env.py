@@ -0,0 +1,46 @@
+import pytest
+
+from config_at_once import *
+
+_env_group = Group("env_group")
+
+
+@_env_group.add
+class EnvDb:
+    host = "localhost"
+    debug = False
+    hosts = ["a"]
+
+    @_env_group.add
+    class Pool:
+        size = 5
+
+
+def test_coerce_env_value():
+    assert coerce_env_value("7", 5) == 7
+    assert coerce_env_value("off", True) is False
+    assert coerce_env_value("[1, 2]", (0,)) == (1, 2)
+    assert coerce_env_value("null", None) is None
+    with pytest.raises(TypeError):
+        coerce_env_value('{"a": 1}', [])
+
+
+def test_build_env_index():
+    index = build_env_index(["Db.Pool.size"], "MYAPP")
+    assert index == {"MYAPP__DB__POOL__SIZE": "Db.Pool.size"}
+    assert collect_env(index, {"MYAPP__DB__POOL__SIZE": "8", "PATH": "/bin"}) == {"Db.Pool.size": "8"}
+
+
+def test_group_load_env():
+    _env_group.init_config(globals(), mode=TREE)
+    environ = {"MYAPP__ENVDB__POOL__SIZE": "20", "MYAPP__ENVDB__DEBUG": "yes", "MYAPP__ENVDB__HOSTS": '["b", "c"]',
+               "MYAPP__ENVDB__UNKNOWN": "1", "HOME": "/root"}
+    values = _env_group.load_env("MYAPP", environ)
+    assert values == {"EnvDb.Pool.size": 20, "EnvDb.debug": True, "EnvDb.hosts": ["b", "c"]}
+    assert EnvDb.Pool.size == 20 and EnvDb.debug is True and EnvDb.hosts == ["b", "c"]
+
+    _env_group.set_override("EnvDb.Pool.size", 30)
+    with pytest.warns(RuntimeWarning, match="EnvDb.Pool.size"):
+        _env_group.load_env("MYAPP", {"MYAPP__ENVDB__POOL__SIZE": "bad"})
+    assert EnvDb.Pool.size == 30
+    assert EnvDb.debug is False
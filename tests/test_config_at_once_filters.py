@@ -0,0 +1,63 @@
+from config_at_once import *
+from config_at_once.filters import compile_rules
+
+_filters_group = Group("filters_group", exclude=["*_cache", r"re:tmp\d+"])
+
+
+@_filters_group.add
+class FilteredDb:
+    __config_exclude__ = ["password"]
+    host = "localhost"
+    password = "secret"
+    query_cache = {}
+    tmp1 = 1
+    tmp_dir = "/tmp"
+
+
+@_filters_group.add
+class FilteredService:
+    __config_include__ = ["db_*", "name"]
+    name = "service"
+    db_host = "localhost"
+    db_port = 5432
+    cache_size = 10
+
+
+def test_attr_rule():
+    rule = AttrRule(["host", "*_cache", r"re:db_\d+"])
+    assert rule.names == frozenset(["host"])
+    assert rule.matches("host") and rule.matches("query_cache") and rule.matches("db_1")
+    assert not rule.matches("db_x") and not rule.matches("hostname") and not rule.matches("query_cache_size")
+    assert not AttrRule() and compile_rules(("a", "b*")) is compile_rules(("a", "b*"))
+    assert AttrFilter(include=["db_*"], exclude=["db_password"])("db_host")
+    assert not AttrFilter(include=["db_*"], exclude=["db_password"])("db_password")
+
+
+def test_group_attr_rules():
+    tree = _filters_group.init_config(globals(), mode=TREE)
+    assert set(tree["FilteredDb"]) == {"host", "tmp_dir"}
+    assert set(tree["FilteredService"]) == {"name", "db_host", "db_port"}
+
+    names = _filters_group.config_attr_names(FilteredDb)
+    assert _filters_group.config_attr_names(FilteredDb) is names
+    FilteredDb.port = 5432
+    try:
+        assert "port" in _filters_group.config_attr_names(FilteredDb)
+    finally:
+        del FilteredDb.port
+    assert set(_filters_group.init_config(globals(), mode=TREE)["FilteredDb"]) == {"host", "tmp_dir"}
+
+    FilteredDb.__config_exclude__.append("host")
+    try:
+        assert "host" in _filters_group.config_attr_names(FilteredDb)
+        _filters_group.invalidate_attr_names(FilteredDb)
+        assert "host" not in _filters_group.config_attr_names(FilteredDb)
+    finally:
+        FilteredDb.__config_exclude__.remove("host")
+    _filters_group.add(FilteredDb)
+    assert "host" in _filters_group.config_attr_names(FilteredDb)
+
+    _filters_group.set_attr_rules(exclude=["tmp*"])
+    tree = _filters_group.init_config(globals(), mode=TREE)
+    assert set(tree["FilteredDb"]) == {"host", "query_cache"}
+    _filters_group.set_attr_rules(exclude=["*_cache", r"re:tmp\d+"])
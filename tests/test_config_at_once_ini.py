@@ -0,0 +1,27 @@
+import configparser
+import io
+
+from config_at_once import *
+from config_at_once import ini_codec
+
+
+def test_ini_round_trip_nested():
+    data = {"debug": True, "Db": {"host": "localhost", "port": 5432, "name": "123", "motd": "a\nb",
+                                  "Pool": {"size": 5, "hosts": ["a", "b"], "empty": None}}}
+    f = io.StringIO()
+    ini_codec.dump(data, f)
+    text = f.getvalue()
+    assert "[Db.Pool]\nsize = 5\n" in text
+    assert "host = localhost\n" in text
+    assert ini_codec.load(io.StringIO(text)) == data
+
+    parser = configparser.ConfigParser()
+    parser.read_string(text)
+    assert parser["Db"]["host"] == "localhost"
+
+
+def test_ini_is_the_default_backend(tmp_path):
+    assert get_codec("ini", "dump").name == "ini_codec"
+    path = str(tmp_path / "config.ini")
+    dump_file(ConfigTree({"Db": ConfigTree({"Pool": ConfigTree({"size": 5})})}), path)
+    assert load_file(path) == {"Db": {"Pool": {"size": 5}}}
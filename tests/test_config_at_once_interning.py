@@ -0,0 +1,63 @@
+import gc
+
+from config_at_once import *
+
+_interning_group = Group("interning_group", intern=True)
+
+
+@_interning_group.add
+class ServiceA:
+    @_interning_group.add
+    class Retry:
+        attempts = 3
+        backoff = "exponential"
+
+
+@_interning_group.add
+class ServiceB:
+    @_interning_group.add
+    class Retry:
+        attempts = 3
+        backoff = "exponential"
+
+
+def test_interner_shares_identical_subtrees():
+    interner = Interner()
+    tree = ConfigTree({f"tenant{i}": ConfigTree({"retry": ConfigTree({"policy": "expo" + "nential", "codes": (1, 2)}),
+                                                 "hosts": ["a"]}) for i in range(100)})
+    interned = interner.intern_tree(tree)
+    assert interned == tree
+    assert interned["tenant0"]["retry"] is interned["tenant99"]["retry"]
+    assert interned["tenant0"] is not interned["tenant99"]
+    assert interned["tenant0"]["retry"]["codes"] is interned["tenant99"]["retry"]["codes"]
+    assert len(interner) == 1
+    del interned
+    gc.collect()
+    assert len(interner) == 0
+
+
+def test_group_interning_and_copy_on_write():
+    _interning_group.init_config(globals(), mode=TREE)
+    retry = {"attempts": 5, "backoff": "linear"}
+    _interning_group.load_config({"ServiceA": {"Retry": dict(retry)}, "ServiceB": {"Retry": dict(retry)}},
+                                 globals(), mode=TREE)
+    tree = _interning_group.tree
+    assert tree["ServiceA"]["Retry"] is tree["ServiceB"]["Retry"]
+
+    _interning_group.set_override("ServiceA.Retry.attempts", 7)
+    assert tree["ServiceA"]["Retry"]["attempts"] == 7
+    assert tree["ServiceB"]["Retry"]["attempts"] == 5
+    assert ServiceA.Retry.attempts == 7 and ServiceB.Retry.attempts == 5
+
+
+def test_interner_keeps_types_and_signed_zeros():
+    interner = Interner()
+    tree = ConfigTree({"a": ConfigTree({"v": (1, 0), "z": -0.0}), "b": ConfigTree({"v": (True, False), "z": 0.0}),
+                       "c": ConfigTree({"v": (True, False), "z": float("nan")})})
+    interned = interner.intern_tree(tree)
+    assert type(interned["b"]["v"][0]) is bool and type(interned["a"]["v"][0]) is int
+    assert str(interned["a"]["z"]) == "-0.0" and str(interned["b"]["z"]) == "0.0"
+    assert interned["a"] is not interned["b"]
+    assert interned["b"]["v"] is interned["c"]["v"]
+    zeros = interner.intern_tree(ConfigTree({"d": ConfigTree({"z": 0.0}), "e": ConfigTree({"z": -0.0})}))
+    assert zeros["d"] is not zeros["e"] and str(zeros["e"]["z"]) == "-0.0"
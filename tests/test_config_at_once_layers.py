@@ -0,0 +1,41 @@
+from config_at_once import *
+
+_layers_group = Group("layers_group")
+
+
+@_layers_group.add
+class LayeredDb:
+    host = "localhost"
+    port = 5432
+
+
+def test_layered_config_precedence():
+    layers = LayeredConfig()
+    layers.set_layer(DEFAULTS_LAYER, {"Db.host": "localhost", "Db.port": 5432})
+    assert layers.update_layer(FILE_LAYER, {"Db.port": 6432}) == {"Db.port"}
+    assert layers.resolve("Db.port") == 6432
+    assert layers.update_layer(OVERRIDES_LAYER, {"Db.port": 7432}) == {"Db.port"}
+    assert layers.update_layer(ENV_LAYER, {"Db.port": 1}) == set()
+    assert layers.resolve("Db.port") == 7432
+    assert layers.source("Db.port") == OVERRIDES_LAYER
+    assert layers.clear_layer(OVERRIDES_LAYER) == {"Db.port"}
+    assert layers.resolve("Db.port") == 1
+    assert layers.tree() == {"Db": {"host": "localhost", "port": 1}}
+
+
+def test_group_override_and_reload():
+    _layers_group.init_config(globals(), mode=TREE)
+    _layers_group.load_config({"LayeredDb": {"host": "db.local", "port": 6432}}, globals(), mode=TREE)
+    assert LayeredDb.host == "db.local"
+
+    _layers_group.set_override("LayeredDb.port", 7432)
+    assert LayeredDb.port == 7432
+    assert _layers_group.tree["LayeredDb"]["port"] == 7432
+
+    _layers_group.load_config({"LayeredDb": {"port": 6432}}, globals(), mode=TREE)
+    assert LayeredDb.port == 7432
+    assert LayeredDb.host == "localhost"
+
+    _layers_group.clear_override("LayeredDb.port")
+    assert LayeredDb.port == 6432
+    assert _layers_group.resolve("LayeredDb.port") == 6432
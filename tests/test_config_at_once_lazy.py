@@ -0,0 +1,51 @@
+from config_at_once import *
+from config_at_once.lazy import PendingValue
+
+_lazy_group = Group("lazy_group")
+
+
+@_lazy_group.add
+class LazyDb:
+    host = "localhost"
+    port = 5432
+
+    @_lazy_group.add
+    class Pool:
+        size = 5
+
+    @property
+    def url(self):
+        return f"{self.host}:{self.port}"
+
+
+@_lazy_group.add
+class LazyCache:
+    ttl = 60
+
+
+def test_lazy_load():
+    _lazy_group.init_config(globals(), mode=TREE)
+    config = {"LazyDb": {"host": "db.local", "Pool": {"size": 10}}, "LazyCache": {"ttl": 120}}
+    _lazy_group.load_config(config, globals(), mode=TREE, lazy=True)
+    assert isinstance(LazyDb.__dict__["host"], PendingValue)
+    assert isinstance(LazyDb.Pool.__dict__["size"], PendingValue)
+    assert _lazy_group.tree["LazyDb"]["host"] == "db.local"
+
+    assert LazyDb().url == "db.local:5432"
+    assert LazyDb.__dict__["host"] == "db.local"
+    assert isinstance(LazyDb.Pool.__dict__["size"], PendingValue)
+    assert LazyDb.Pool.size == 10 and LazyDb.Pool.__dict__["size"] == 10
+
+    assert isinstance(LazyCache.__dict__["ttl"], PendingValue)
+    _lazy_group.apply_pending()
+    assert LazyCache.__dict__["ttl"] == 120
+    assert len(_lazy_group._pending) == 0
+
+
+def test_lazy_load_then_override():
+    _lazy_group.init_config(globals(), mode=TREE)
+    _lazy_group.load_config({"LazyCache": {"ttl": 30}}, globals(), mode=TREE, lazy=True)
+    _lazy_group.set_override("LazyCache.ttl", 90)
+    assert LazyCache.__dict__["ttl"] == 90
+    _lazy_group.clear_override()
+    assert LazyCache.ttl == 30
@@ -0,0 +1,56 @@
+import tracemalloc
+
+from config_at_once import *
+from config_at_once.memory import deep_sizeof
+
+_memory_group = Group("memory_group")
+
+
+@_memory_group.add
+class Model:
+    name = "small"
+    weights = [0.0]
+
+    @_memory_group.add
+    class Vocab:
+        words = ["a"]
+
+
+def test_deep_sizeof_counts_shared_once():
+    shared = list(range(1000))
+    assert deep_sizeof([shared, shared]) < 2 * deep_sizeof(shared)
+    seen = set()
+    deep_sizeof(shared, seen)
+    assert deep_sizeof(shared, seen) == 0
+
+
+def test_tree_memory_report():
+    big = [float(i) for i in range(10000)]
+    tree = ConfigTree({"a": ConfigTree({"big": big, "small": 1}), "b": ConfigTree({"alias": big})})
+    report = tree.memory_report(top=2)
+    assert [path for path, _ in report["top"]] == ["a", "a.big"]
+    assert report["total"] >= report["top"][0][1] + tree.memory_report()["top"][-1][1]
+    assert dict(tree.memory_report(top=10)["top"])["b.alias"] < 100
+
+
+def test_group_memory_report():
+    _memory_group.init_config(globals(), mode=TREE)
+    report = _memory_group.memory_report(top=3)
+    assert report["total"] > 0 and len(report["top"]) == 3
+
+    config = {"Model": {"weights": [float(i) for i in range(5000)], "Vocab": {"words": ["w"]}}}
+    report = _memory_group.memory_report(top=1, config_dict=config, root=globals())
+    assert report["top"][0][0] == "Model"
+    assert len(Model.weights) == 5000
+
+
+def test_allocation_report_while_tracing():
+    _memory_group.init_config(globals(), mode=TREE)
+    tracemalloc.start()
+    try:
+        config = {"Model": {"weights": [float(i) for i in range(5000)]}}
+        report = _memory_group.memory_report(top=10, config_dict=config, root=globals())
+    finally:
+        tracemalloc.stop()
+    assert Model.weights is config["Model"]["weights"]
+    assert dict(report["top"]).get("Model.weights", 0) < deep_sizeof(config["Model"]["weights"]) // 10
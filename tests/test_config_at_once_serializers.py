@@ -0,0 +1,111 @@
+import pytest
+
+from config_at_once import *
+from config_at_once import serializers
+
+_serializers_group = Group("serializers_group")
+
+
+@_serializers_group.add
+class SerializedDb:
+    host = "localhost"
+    ports = (5432, 5433)
+
+    @_serializers_group.add
+    class Pool:
+        size = 5
+
+
+def test_fastest_backend_is_selected():
+    assert get_codec("json", "load") is get_codec("json", "load")
+    try:
+        import orjson
+        assert get_codec("json", "dump").name == "orjson"
+    except ImportError:
+        pass
+    try:
+        import tomllib
+        assert get_codec("toml", "load").name == "tomllib"
+    except ImportError:
+        pass
+
+
+@pytest.fixture
+def upper_format():
+    register_format("upper", [".upper"])
+    yield "upper"
+    unregister_format("upper")
+
+
+def test_register_backend_fallback(tmp_path, upper_format):
+    register_backend("upper", "missing", lambda: serializers.import_module("no_such_module"), priority=10)
+    register_backend("upper", "plain", lambda: Codec("plain", lambda f: {"value": f.read().lower()},
+                                                     lambda data, f: f.write(data["value"].upper())))
+    path = str(tmp_path / "config.upper")
+    dump_file({"value": "abc"}, path)
+    with open(path) as f:
+        assert f.read() == "ABC"
+    assert load_file(path) == {"value": "abc"}
+    assert get_codec("upper").name == "plain"
+    with pytest.raises(ValueError, match="Unexpected file extension"):
+        load_file(str(tmp_path / "config.unknown"))
+
+
+def test_yaml_dumper_is_private():
+    yaml = pytest.importorskip("yaml")
+    get_codec("yaml", "dump")
+    assert ConfigTree not in yaml.SafeDumper.yaml_multi_representers
+    assert ConfigTree not in getattr(yaml, "CSafeDumper", yaml.SafeDumper).yaml_multi_representers
+
+
+@pytest.mark.parametrize("extension", [".json", ".yaml"])
+def test_group_file_round_trip(tmp_path, extension):
+    SerializedDb.Pool.size = 5
+    _serializers_group.init_config(globals(), mode=TREE)
+    _serializers_group.set_override("SerializedDb.Pool.size", 9)
+    path = str(tmp_path / f"config{extension}")
+    _serializers_group.save_to_file(path)
+    _serializers_group.clear_override()
+    assert SerializedDb.Pool.size == 5
+    _serializers_group.load_from_file(path)
+    assert SerializedDb.Pool.size == 9
+    assert type(SerializedDb.ports) is tuple and SerializedDb.ports == (5432, 5433)
+
+
+@pytest.mark.parametrize("extension", [".json.gz", ".ini.bz2", ".xml.xz"])
+def test_compressed_files(tmp_path, extension):
+    import bz2
+    import gzip
+    import lzma
+    path = str(tmp_path / f"config{extension}")
+    _serializers_group.init_config(globals(), mode=TREE)
+    _serializers_group.set_override("SerializedDb.host", "x" * 10000)
+    _serializers_group.save_to_file(path)
+    opener = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}[extension[extension.rfind("."):]]
+    with opener(path, "rb") as f:
+        assert b"x" * 10000 in f.read()
+    assert (tmp_path / f"config{extension}").stat().st_size < 1000
+
+    _serializers_group.clear_override()
+    _serializers_group.load_from_file(path, globals())
+    assert SerializedDb.host == "x" * 10000
+    _serializers_group.load_config({"SerializedDb": {"host": "localhost"}}, globals(), mode=TREE)
+
+
+def test_unknown_compression_inner_extension(tmp_path):
+    with pytest.raises(ValueError):
+        dump_file({"a": 1}, str(tmp_path / "config.gz"))
+
+
+def test_json_dump_edge_values(tmp_path):
+    path = str(tmp_path / "config.json")
+    dump_file({"big": 2 ** 70, "keys": {1: "x"}}, path)
+    assert load_file(path) == {"big": 2 ** 70, "keys": {"1": "x"}}
+
+
+def test_failed_dump_keeps_file(tmp_path):
+    path = str(tmp_path / "config.json")
+    dump_file({"a": 1}, path)
+    with pytest.raises(TypeError):
+        dump_file({"a": object()}, path)
+    assert load_file(path) == {"a": 1}
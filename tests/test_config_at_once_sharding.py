@@ -0,0 +1,82 @@
+import json
+import os
+
+from config_at_once import *
+from config_at_once.sharding import MANIFEST_NAME
+
+_sharding_group = Group("sharding_group")
+
+
+@_sharding_group.add
+class ShardDb:
+    host = "localhost"
+
+    @_sharding_group.add
+    class Pool:
+        size = 5
+
+
+@_sharding_group.add
+class ShardCache:
+    ttl = 60
+
+
+def test_sharded_directory(tmp_path):
+    directory = str(tmp_path / "config")
+    _sharding_group.init_config(globals(), mode=TREE)
+    _sharding_group.set_override("ShardDb.Pool.size", 10)
+    assert sorted(_sharding_group.save_to_directory(directory)) == ["ShardCache", "ShardDb"]
+    assert sorted(os.listdir(directory)) == sorted([MANIFEST_NAME, "ShardCache.json", "ShardDb.json"])
+    assert _sharding_group.save_to_directory(directory) == []
+
+    _sharding_group.set_override("ShardCache.ttl", 120)
+    assert _sharding_group.save_to_directory(directory) == ["ShardCache"]
+
+    with open(os.path.join(directory, "ShardDb.json")) as f:
+        assert json.load(f) == {"ShardDb": {"host": "localhost", "Pool": {"size": 10}}}
+
+    ShardDb.Pool.size, ShardCache.ttl = 5, 60
+    _sharding_group.init_config(globals(), mode=TREE)
+    store = _sharding_group.load_from_directory(directory, globals())
+    assert store.pending == {"ShardDb", "ShardCache"}
+    assert ShardDb.Pool.size == 10
+    assert store.pending == {"ShardCache"}
+    assert _sharding_group.tree["ShardCache"]["ttl"] == 60
+    assert _sharding_group.save_to_directory(directory) == []
+
+    assert store.load_shard("ShardCache") and not store.load_shard("ShardCache")
+    assert ShardCache.ttl == 120 and ShardCache.__dict__["ttl"] == 120
+
+
+class SharedJobs:
+    workers = 4
+
+
+class SharedQueue:
+    size = 100
+
+
+class SharedAudit:
+    enabled = True
+
+
+def test_groups_share_directory(tmp_path):
+    directory = str(tmp_path / "shared")
+    jobs_group, audit_group = Group("jobs_group"), Group("audit_group")
+    jobs_group.add(SharedJobs)
+    jobs_group.add(SharedQueue)
+    audit_group.add(SharedAudit)
+    jobs_group.init_config({"SharedJobs": SharedJobs, "SharedQueue": SharedQueue}, mode=TREE)
+    audit_group.init_config({"SharedAudit": SharedAudit}, mode=TREE)
+
+    assert sorted(jobs_group.save_to_directory(directory)) == ["SharedJobs", "SharedQueue"]
+    assert audit_group.save_to_directory(directory) == ["SharedAudit"]
+    jobs_group.set_override("SharedJobs.workers", 8)
+    assert jobs_group.save_to_directory(directory) == ["SharedJobs"]
+    with open(os.path.join(directory, MANIFEST_NAME)) as f:
+        assert sorted(json.load(f)["shards"]) == ["SharedAudit", "SharedJobs", "SharedQueue"]
+
+    jobs_group.init_config({"SharedJobs": SharedJobs}, mode=TREE)
+    assert jobs_group.save_to_directory(directory) == ["SharedQueue"]
+    assert sorted(os.listdir(directory)) == sorted([MANIFEST_NAME, "SharedAudit.json", "SharedJobs.json"])
+    SharedJobs.workers = 4
@@ -0,0 +1,62 @@
+import threading
+
+import pytest
+
+from config_at_once import *
+
+_snapshot_group = Group("snapshot_group", snapshot=True)
+
+
+@_snapshot_group.add
+class SnapshotPair:
+    left = 0
+    right = 0
+
+    @_snapshot_group.add
+    class Other:
+        value = "default"
+
+
+def test_frozen_config_tree():
+    frozen = freeze(ConfigTree({"a": ConfigTree({"b": 1}), "c": 2}))
+    with pytest.raises(TypeError):
+        frozen["c"] = 3
+    with pytest.raises(TypeError):
+        frozen["a"].pop("b")
+    evolved = evolve(frozen, {"a.b": 5, "d.e": None}, ["c"])
+    assert evolved == {"a": {"b": 5}, "d": {"e": None}}
+    assert frozen == {"a": {"b": 1}, "c": 2}
+    assert type(frozen.copy()) is ConfigTree
+
+
+def test_group_snapshot_is_shared_and_consistent():
+    _snapshot_group.init_config(globals(), mode=TREE)
+    before = _snapshot_group.snapshot()
+    _snapshot_group.set_override("SnapshotPair.left", 1)
+    after = _snapshot_group.snapshot()
+    assert before["SnapshotPair"]["left"] == 0 and after["SnapshotPair"]["left"] == 1
+    assert after["SnapshotPair"]["Other"] is before["SnapshotPair"]["Other"]
+    _snapshot_group.clear_override()
+
+    inconsistent = []
+    stop = threading.Event()
+
+    def reader():
+        while not stop.is_set():
+            pair = _snapshot_group.snapshot()["SnapshotPair"]
+            if pair["left"] != pair["right"]:
+                inconsistent.append((pair["left"], pair["right"]))
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    for i in range(200):
+        _snapshot_group.load_config({"SnapshotPair": {"left": i, "right": i}}, globals(), mode=TREE)
+    stop.set()
+    thread.join()
+    assert not inconsistent
+    assert SnapshotPair.left == SnapshotPair.right == 199
+
+
+def test_snapshot_mode_disabled():
+    with pytest.raises(ValueError, match="snapshot mode is not enabled"):
+        Group("no_snapshot_group").snapshot()
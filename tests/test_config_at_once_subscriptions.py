@@ -0,0 +1,41 @@
+from config_at_once import *
+
+_subscriptions_group = Group("subscriptions_group")
+
+
+@_subscriptions_group.add
+class SubscribedDb:
+    host = "localhost"
+
+    @_subscriptions_group.add
+    class Pool:
+        size = 5
+        timeout = 1.0
+
+
+def test_subscription_trie_match():
+    trie = SubscriptionTrie()
+    trie.subscribe("Db.Pool", print)
+    trie.subscribe("Db.Pool.size", len)
+    trie.subscribe("Cache", repr)
+    batches = trie.match(["Db.Pool.size", "Db.Pool.timeout", "Db.host", "Db"])
+    assert batches == {("Db.Pool", print): ["Db.Pool.size", "Db.Pool.timeout", "Db"],
+                       ("Db.Pool.size", len): ["Db.Pool.size", "Db"]}
+    assert trie.unsubscribe("Cache", repr)
+    assert len(trie) == 2
+
+
+def test_group_subscribe():
+    _subscriptions_group.init_config(globals(), mode=TREE)
+    pool_changes, all_changes = [], []
+    _subscriptions_group.subscribe("SubscribedDb.Pool", pool_changes.append)
+    unsubscribe = _subscriptions_group.subscribe("", all_changes.append)
+
+    _subscriptions_group.load_config({"SubscribedDb": {"host": "db.local", "Pool": {"size": 10, "timeout": 1.0}}},
+                                     globals(), mode=TREE)
+    assert pool_changes == [["SubscribedDb.Pool.size"]]
+    assert all_changes == [["SubscribedDb.Pool.size", "SubscribedDb.host"]]
+
+    unsubscribe()
+    _subscriptions_group.set_override("SubscribedDb.host", "other")
+    assert len(pool_changes) == 1 and len(all_changes) == 1
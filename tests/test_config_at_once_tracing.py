@@ -0,0 +1,43 @@
+from config_at_once import *
+
+_tracing_group = Group("tracing_group")
+
+
+@_tracing_group.add
+class TracedDb:
+    host = "localhost"
+    port = 5432
+
+    @_tracing_group.add
+    class Pool:
+        size = 5
+        timeout = 1.0
+
+    def connect(self):
+        return self.host
+
+
+def test_access_tracer():
+    _tracing_group.init_config(globals(), mode=TREE)
+    tracer = _tracing_group.trace_access()
+    assert isinstance(TracedDb.__dict__["host"], TracedValue)
+    assert "TracedDb.connect" not in tracer.traced
+
+    for _ in range(3):
+        assert TracedDb.Pool.size == 5
+    assert TracedDb().connect() == "localhost"
+    report = tracer.report()
+    assert report["hot"] == [("TracedDb.Pool.size", 3), ("TracedDb.host", 1)]
+    assert report["unread"] == ["TracedDb.Pool.timeout", "TracedDb.port"]
+
+    _tracing_group.set_override("TracedDb.Pool.size", 8)
+    assert isinstance(TracedDb.Pool.__dict__["size"], TracedValue)
+    assert TracedDb.Pool.size == 8
+    assert tracer.counts()["TracedDb.Pool.size"] == 4
+
+    tracer.reset()
+    assert tracer.report()["hot"] == []
+    tracer.uninstall()
+    assert TracedDb.__dict__["host"] == "localhost"
+    assert TracedDb.Pool.__dict__["size"] == 8
+    _tracing_group.clear_override()
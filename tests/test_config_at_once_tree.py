@@ -77,3 +77,116 @@ def test_tree_load_config():
     json_str = json.dumps(_test_group.tree.remove_by_objects(json_serializable_objects))
     _test_group.load_config(json.loads(json_str), globals(), mode=TREE)
     assert TestClass.default_value == "Modified"
+
+
+def test_tree_shared_class_is_built_once():
+    local_test_group = Group("local_test_group")
+
+    @local_test_group.add
+    class Retry:
+        attempts = 3
+
+    @local_test_group.add
+    class ServiceA:
+        retry = Retry
+
+    @local_test_group.add
+    class ServiceB:
+        retry = Retry
+
+    local_test_group.init_config({"ServiceA": ServiceA, "ServiceB": ServiceB}, mode=TREE)
+    assert local_test_group.tree["ServiceA"]["retry"] is local_test_group.tree["ServiceB"]["retry"]
+    assert Retry.__config_path__ == "local_test_group.ServiceA.retry"
+    assert local_test_group.config_aliases == {"local_test_group.ServiceB.retry": "local_test_group.ServiceA.retry"}
+
+
+def test_tree_cycle_raise():
+    local_test_group = Group("local_test_group")
+
+    @local_test_group.add
+    class Parent:
+        pass
+
+    @local_test_group.add
+    class Child:
+        parent = Parent
+
+    Parent.child = Child
+    with pytest.raises(ValueError, match="cyclic config reference"):
+        local_test_group.init_config({"Parent": Parent}, mode=TREE)
+
+
+def test_tree_mode_group_shared_class_is_built_once():
+    from config_at_once._TreeMode import Group as TreeModeGroup
+
+    local_test_group = TreeModeGroup("local_test_group.json", "local_test_group")
+
+    @local_test_group.add
+    class Retry:
+        attempts = 3
+
+    @local_test_group.add
+    class ServiceA:
+        retry = Retry
+
+    @local_test_group.add
+    class ServiceB:
+        retry = Retry
+
+    treed_obj = dict()
+    tree_a = local_test_group._build_local_config_tree("ServiceA", ServiceA, treed_obj=treed_obj)
+    tree_b = local_test_group._build_local_config_tree("ServiceB", ServiceB, treed_obj=treed_obj)
+    assert tree_a["retry"] is tree_b["retry"]
+    assert Retry.__config_path__ == "local_test_group.ServiceA.retry"
+    assert local_test_group.config_aliases == {"local_test_group.ServiceB.retry": "local_test_group.ServiceA.retry"}
+
+
+def test_tree_fingerprint():
+    tree = ConfigTree({"Db": ConfigTree({"Pool": ConfigTree({"size": 5}), "host": "localhost"}), "debug": False})
+    same = ConfigTree({"debug": False, "Db": {"host": "localhost", "Pool": {"size": 5}}})
+    fingerprint = tree.fingerprint()
+    assert fingerprint == same.fingerprint()
+    sibling = tree["Db"]["Pool"]._fingerprint
+
+    tree["Db"]["host"] = "db.local"
+    assert tree["Db"]["Pool"]._fingerprint == sibling
+    assert tree._fingerprint is None
+    assert tree.fingerprint() != fingerprint
+
+    tree.set_by_path("Db.host", "localhost")
+    assert tree.fingerprint() == fingerprint
+    tree["Db"]["Pool"]["size"] = 5.0
+    assert tree.fingerprint() != fingerprint
+
+
+def test_tree_pickle_round_trip():
+    import copy
+    import pickle
+
+    _test_group.init_config(globals(), mode=TREE)
+    tree = _test_group.tree
+    tree.fingerprint()
+    loaded = pickle.loads(pickle.dumps(tree))
+    assert loaded == tree
+    assert type(loaded["TestClass"]) is ConfigTree
+    assert loaded.group is None
+    assert loaded.fingerprint() == tree.fingerprint()
+    loaded["TestClass"]["default_value"] = "Changed"
+    assert loaded.fingerprint() != tree.fingerprint()
+
+    copied = copy.deepcopy(tree)
+    assert copied == tree and copied["TestClass"] is not tree["TestClass"]
+    assert copied.group is _test_group
+
+
+def test_tree_fingerprint_canonical():
+    import subprocess
+    import sys
+
+    assert ConfigTree({"z": 0.0}).fingerprint() != ConfigTree({"z": -0.0}).fingerprint()
+    assert ConfigTree({"v": (1, 0)}).fingerprint() != ConfigTree({"v": (True, False)}).fingerprint()
+    code = "from config_at_once import ConfigTree; print(ConfigTree({'s': {'a', 'b', 'c', 'd'}}).fingerprint())"
+    fingerprints = {subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                                   env={"PYTHONHASHSEED": str(seed)}).stdout for seed in range(3)}
+    assert len(fingerprints) == 1
+    assert ConfigTree({"s": {"a", "b", "c", "d"}}).fingerprint() + "\n" in fingerprints
@@ -0,0 +1,116 @@
+import pytest
+
+from config_at_once import *
+from config_at_once import tree_cache
+
+_cache_group = Group("cache_group")
+
+
+@_cache_group.add
+class CachedDb:
+    host = "localhost"
+    ports = (5432, 5433)
+    options = {"ssl": True}
+
+    @_cache_group.add
+    class Pool:
+        size = 5
+
+    def connect(self):
+        return self.host
+
+
+@_cache_group.add
+class CachedReplica(CachedDb):
+    host = "replica"
+
+
+def test_tree_cache(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    built = _cache_group.init_config(globals(), mode=TREE, cache_dir=cache_dir)
+    aliases = dict(_cache_group.config_aliases)
+    assert aliases == {"cache_group.CachedReplica.Pool": "cache_group.CachedDb.Pool"}
+    CachedDb.Pool.__config_path__ = None
+
+    def no_build(*args, **kwargs):
+        raise AssertionError("the tree should be read from the cache")
+
+    monkeypatch.setattr(_cache_group, "build_local_tree", no_build)
+    cached = _cache_group.init_config(globals(), mode=TREE, cache_dir=cache_dir)
+    assert cached == built
+    assert cached["CachedDb"]["options"] is CachedDb.options
+    assert cached["CachedDb"]["connect"] is CachedDb.connect
+    assert cached["CachedReplica"]["Pool"] is cached["CachedDb"]["Pool"]
+    assert CachedDb.Pool.__config_path__ == "cache_group.CachedDb.Pool"
+    assert _cache_group.config_aliases == aliases
+
+    _cache_group.load_config({"CachedDb": {"Pool": {"size": 9}}}, globals(), mode=TREE)
+    assert CachedDb.Pool.size == 9
+    CachedDb.Pool.size = 5
+
+    monkeypatch.setattr(tree_cache, "module_hash", lambda name: "changed")
+    with pytest.raises(AssertionError):
+        _cache_group.init_config(globals(), mode=TREE, cache_dir=cache_dir)
+
+
+def test_tree_cache_checks_values(tmp_path):
+    import marshal
+    import types
+
+    settings = types.ModuleType("cache_settings")
+    settings.PORT = 1
+    cache_dir = str(tmp_path / "cache")
+    group = Group("computed_group")
+
+    def make_root():
+        @group.add
+        class Db:
+            port = settings.PORT
+
+        return {"Db": Db}
+
+    root = make_root()
+    assert group.init_config(root, mode=TREE, cache_dir=cache_dir)["Db"]["port"] == 1
+    settings.PORT = 2
+    root = make_root()
+    assert group.init_config(root, mode=TREE, cache_dir=cache_dir)["Db"]["port"] == 2
+
+    path = tree_cache.cache_path(group, root, cache_dir)
+    for malformed in [{"entries": []}, [1, 2], {"modules": {}, "entries": [], "aliases": None}]:
+        with open(path, "wb") as f:
+            marshal.dump(malformed, f)
+        assert tree_cache.load_tree_cache(group, root, cache_dir) is None
+
+
+def test_tree_cache_hit_is_faster_than_build(tmp_path):
+    import time
+
+    group = Group("many_classes_group")
+    root = {"__name__": __name__}
+    for i in range(300):
+        namespace = {f"attr_{j}": j for j in range(10)}
+        namespace.update(name=f"service_{i}", ratio=0.5, tags=("a", "b"), options={"retries": 3})
+        namespace["Pool"] = group.add(type("Pool", (), {"size": i, "enabled": True}))
+        root[f"Service{i}"] = group.add(type(f"Service{i}", (), namespace))
+    cache_dir = str(tmp_path / "cache")
+    built = group.init_config(root, mode=TREE, cache_dir=cache_dir)
+
+    def best_of(func):
+        timings = []
+        for _ in range(5):
+            start = time.perf_counter()
+            result = func()
+            timings.append(time.perf_counter() - start)
+        return min(timings), result
+
+    def build():
+        # a new process starts without the cached attribute names
+        group.invalidate_attr_names()
+        classes = dict()
+        return {k: group.build_local_tree(v, True, classes) for k, v in root.items() if k != "__name__"}
+
+    build_time, _ = best_of(build)
+    cache_time, cached = best_of(lambda: tree_cache.load_tree_cache(group, root, cache_dir))
+    assert cached == built
+    assert cached["Service7"]["options"] is root["Service7"].options
+    assert cache_time < build_time
@@ -0,0 +1,92 @@
+import gc
+import weakref
+
+from config_at_once import *
+
+_weak_group = Group("weak_group", weak=True)
+
+
+@_weak_group.add
+class Plugins:
+    enabled = True
+
+
+def _make_plugin():
+    @_weak_group.add
+    class Exporter:
+        interval = 10
+
+    Plugins.Exporter = Exporter
+    return Exporter
+
+
+def _make_factory_plugin():
+    @_weak_group.add
+    class Factory:
+        size = 3
+
+        @classmethod
+        def create(cls):
+            return cls()
+
+        def describe(self):
+            return super().__repr__()
+
+    Plugins.Factory = Factory
+
+
+def test_tree_group_is_weak():
+    group = Group("temporary_group", weak=True)
+    tree = ConfigTree({"a": 1}, group=group)
+    assert tree.group is group
+    del group
+    gc.collect()
+    assert tree.group is None
+
+    group = Group("temporary_group")
+    tree = ConfigTree({"a": 1}, group=group)
+    del group
+    gc.collect()
+    assert tree.group.name == "temporary_group"
+
+
+def test_weak_registry_prunes_collected_classes():
+    _make_plugin()
+    assert len(_weak_group.registered) == 2
+    _weak_group.init_config(globals(), mode=TREE)
+    assert _weak_group.tree["Plugins"]["Exporter"]["interval"] == 10
+    _weak_group.set_override("Plugins.Exporter.interval", 20)
+
+    removed = []
+    _weak_group.subscribe("Plugins", removed.append)
+    del Plugins.Exporter
+    gc.collect()
+    assert len(_weak_group.registered) == 1
+
+    _weak_group.load_config({"Plugins": {"enabled": False}}, globals(), mode=TREE)
+    assert "Exporter" not in _weak_group.tree["Plugins"]
+    assert "Plugins.Exporter.interval" not in _weak_group.layers
+    assert removed[0] == ["Plugins.Exporter.interval"]
+    assert Plugins.enabled is False
+
+
+def test_weak_registry_collects_classes_with_methods():
+    _make_factory_plugin()
+    _weak_group.init_config(globals(), mode=TREE)
+    assert _weak_group.tree["Plugins"]["Factory"] == {"size": 3}
+    del Plugins.Factory
+    gc.collect()
+    _weak_group.load_config({"Plugins": {"enabled": True}}, globals(), mode=TREE)
+    assert "Factory" not in _weak_group.tree["Plugins"]
+    assert "Plugins.Factory.size" not in _weak_group.layers
+
+
+def test_weak_registry_collects_classes_with_pending_values():
+    exporter = weakref.ref(_make_plugin())
+    _weak_group.init_config(globals(), mode=TREE)
+    _weak_group.load_config({"Plugins": {"Exporter": {"interval": 30}}}, globals(), mode=TREE, lazy=True)
+    assert type(vars(Plugins.Exporter)["interval"]).__name__ == "PendingValue"
+    del Plugins.Exporter
+    gc.collect()
+    assert exporter() is None
+    _weak_group.apply_pending()
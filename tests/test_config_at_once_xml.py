@@ -0,0 +1,23 @@
+import io
+
+from config_at_once import *
+from config_at_once import xml_codec
+
+
+def test_xml_round_trip_typed_values():
+    data = {"debug": True, "Db": {"host": "a < b & c", "port": 5432, "ratio": 0.5, "empty": "", "none": None,
+                                  "hosts": ["a", 1, {"x": False}], "no nodes": {}, "1st": "key attribute",
+                                  "Pool": {"size": 5}}}
+    f = io.BytesIO()
+    xml_codec.dump(data, f)
+    text = f.getvalue().decode("utf-8")
+    assert '<port type="int">5432</port>' in text
+    assert '<item key="no nodes" type="dict"/>' in text
+    assert xml_codec.load(io.BytesIO(f.getvalue())) == data
+
+
+def test_xml_is_the_default_backend(tmp_path):
+    assert get_codec("xml", "load").name == "xml_codec"
+    path = str(tmp_path / "config.xml")
+    dump_file(ConfigTree({"Db": ConfigTree({"hosts": ("a", "b")})}), path)
+    assert load_file(path) == {"Db": {"hosts": ["a", "b"]}}